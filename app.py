@@ -1,253 +1,1243 @@
+import importlib
+import io
+import itertools
+import json
 import os
+import threading
+import time
 import uuid
-from flask import Flask, request, jsonify, send_from_directory, render_template
+from contextlib import ExitStack
+from typing import TYPE_CHECKING, List
+from urllib.parse import urlencode
+from flask import Flask, Request, Response, g, request, jsonify, send_from_directory, render_template, stream_with_context
 from werkzeug.utils import secure_filename
-import pandas as pd
 
-from bias.metrics import compute_bias_report
-from bias.mitigate import reweigh_dataset, resample_dataset, adjust_values
+# pandas, NumPy and the analysis modules are imported by the functions that
+# use them, so a cold start (a serverless instance or a fresh gunicorn
+# worker) only pays for Flask and the light service modules until the first
+# request, or warm_up, needs them. See benchmarks/bench_startup.py.
+from bias.instrument import stage
+from service.cache import DatasetCache, ReportCache, file_sha256, report_key
+from service.jobs import JobCancelled, JobQueue
+from service.metrics import DEFAULT_ROW_BUCKETS, MetricsRegistry
+from service.registry import DatasetRegistry
+from service.storage import StorageManager, owner
+from service.timing import PROFILERS, RequestProfiler, StageTimer, current_timer
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 APP_ROOT = os.path.dirname(os.path.abspath(__file__))
 # Use writable /tmp on Vercel; otherwise default to project directory
-if os.environ.get('VERCEL'):
+if os.environ.get('BIAS_BUSTER_DATA_DIR'):
+    BASE_DIR = os.environ['BIAS_BUSTER_DATA_DIR']
+elif os.environ.get('VERCEL'):
     BASE_DIR = "/tmp/bias-buster"
 else:
     BASE_DIR = APP_ROOT
 UPLOAD_DIR = os.path.join(BASE_DIR, 'uploads')
 OUTPUT_DIR = os.path.join(BASE_DIR, 'outputs')
 ALLOWED_EXTENSIONS = {'.csv'}
+# SQLite registry shared by all worker processes on this host
+REGISTRY_DB = os.environ.get('BIAS_BUSTER_REGISTRY_DB', os.path.join(BASE_DIR, 'registry.sqlite3'))
+# Largest accepted upload in bytes (0 = unlimited)
+MAX_UPLOAD_BYTES = int(os.environ.get('BIAS_BUSTER_MAX_UPLOAD_BYTES', 1024 * 1024 * 1024))
+# Byte budget for parsed DataFrames kept in memory per worker process
+DATASET_CACHE_BYTES = int(os.environ.get('BIAS_BUSTER_CACHE_BYTES', 512 * 1024 * 1024))
+# Computed reports kept per worker process, and their lifetime in seconds
+REPORT_CACHE_ENTRIES = int(os.environ.get('BIAS_BUSTER_REPORT_CACHE_ENTRIES', 1024))
+REPORT_CACHE_TTL = float(os.environ.get('BIAS_BUSTER_REPORT_CACHE_TTL', 3600))
+# Uploads and their outputs expire after this many idle seconds (0 = kept),
+# and the least recently used are evicted past the byte quota (0 = none;
+# on Vercel it defaults to most of the 512 MB /tmp)
+STORAGE_TTL = float(os.environ.get('BIAS_BUSTER_STORAGE_TTL', 24 * 3600))
+STORAGE_MAX_BYTES = int(os.environ.get('BIAS_BUSTER_STORAGE_MAX_BYTES',
+                                       384 * 1024 * 1024 if os.environ.get('VERCEL') else 0))
+STORAGE_SWEEP_SECONDS = float(os.environ.get('BIAS_BUSTER_STORAGE_SWEEP_SECONDS', 60))
+# Rows in the uniform sample drawn while an upload streams in, read back by
+# /analyze preview reports (0 = no sample; previews then sample the file)
+PREVIEW_ROWS = int(os.environ.get('BIAS_BUSTER_PREVIEW_ROWS', 20_000))
+MAX_PREVIEW_ROWS = 1_000_000
+SAMPLE_SUFFIX = '.sample.csv'
+# Rows per chunk for streaming (out-of-core) analysis
+STREAM_CHUNK_ROWS = int(os.environ.get('BIAS_BUSTER_STREAM_CHUNK_ROWS', 1_000_000))
+# Process-pool size and rows per partition for parallel execution (1 = serial)
+PARALLEL_WORKERS = int(os.environ.get('BIAS_BUSTER_WORKERS', 1))
+PARTITION_ROWS = int(os.environ.get('BIAS_BUSTER_PARTITION_ROWS', 2_000_000))
+MAX_BOOTSTRAP_REPLICATES = 100_000
+# Report configurations accepted by one /analyze/batch call
+MAX_BATCH_SPECS = 256
+# Thresholds per /analyze/sweep curve: default when the score has more
+# distinct values, and the most a request may ask for
+SWEEP_POINTS = 256
+MAX_SWEEP_POINTS = 10_000
+# Calibration bins per group for /analyze/fairness: default and most allowed
+CALIBRATION_BINS = 10
+MAX_CALIBRATION_BINS = 1_000
+# Concurrent background jobs per worker process for async /analyze and /mitigate
+JOB_WORKERS = int(os.environ.get('BIAS_BUSTER_JOB_WORKERS', 2))
+# Threads per worker process building columnar copies of new uploads
+INGEST_WORKERS = int(os.environ.get('BIAS_BUSTER_INGEST_WORKERS', 1))
+# Rows encoded per chunk when streaming an export
+EXPORT_CHUNK_ROWS = int(os.environ.get('BIAS_BUSTER_EXPORT_CHUNK_ROWS', 50_000))
+# Honour ?profile=cprofile|pyinstrument on requests (for local profiling only)
+PROFILING_ENABLED = os.environ.get('BIAS_BUSTER_PROFILING') == '1'
+PROFILE_DIR = os.path.join(OUTPUT_DIR, 'profiles')
+# /mitigate fields carried into a streamed export's spec
+EXPORT_SPEC_KEYS = ('file_id', 'sensitive', 'target', 'positive_label', 'method', 'resample_output', 'reweigh_output',
+                    'adjustment_method', 'modify_original', 'threshold', 'score_columns', 'score_weights')
+
+# Run warm_up in a background thread at import, so a new worker that is
+# still idle is ready before its first request arrives
+WARMUP_ON_START = os.environ.get('BIAS_BUSTER_WARMUP') == '1'
+# Modules imported lazily by the request handlers, loaded up front by warm_up
+WARMUP_MODULES = ('pandas', 'numpy', 'bias.metrics', 'bias.mitigate', 'bias.parallel', 'bias.sampling',
+                  'bias.selection', 'bias.streaming', 'service.columnar', 'service.export', 'service.ingest',
+                  'service.profiling')
+
+_dirs_ready = False
+
+
+def ensure_dirs() -> None:
+    """Create the upload and output directories; checked once per process."""
+    global _dirs_ready
+    if not _dirs_ready:
+        os.makedirs(UPLOAD_DIR, exist_ok=True)
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        _dirs_ready = True
+
+
+class IngestRequest(Request):
+    """Request whose uploaded CSV parts stream through an IngestSink."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if filename and allowed_file(filename):
+            from service.ingest import IngestSink
+            from service.profiling import CsvProfiler
+
+            ensure_dirs()
+            return IngestSink(UPLOAD_DIR, MAX_UPLOAD_BYTES or None, CsvProfiler(sample_rows=PREVIEW_ROWS))
+        return super()._get_file_stream(total_content_length, content_type, filename, content_length)
 
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 app = Flask(__name__, template_folder='templates', static_folder='static')
+app.request_class = IngestRequest
+if MAX_UPLOAD_BYTES:
+    # Reject oversized bodies up front; headroom covers the multipart framing
+    app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_BYTES + 64 * 1024
+
+# Persistent registry of uploaded files, shared across workers and restarts
+REGISTRY = DatasetRegistry(REGISTRY_DB)
+# Parsed uploads keyed by file_id, so repeated analyses skip the CSV parse
+DATASET_CACHE = DatasetCache(DATASET_CACHE_BYTES)
+# Bias reports keyed by dataset content hash and report parameters
+REPORT_CACHE = ReportCache(REPORT_CACHE_ENTRIES, REPORT_CACHE_TTL)
+# Upload and output files: TTL, quota and LRU eviction on a sweeper thread
+STORAGE = StorageManager(REGISTRY, (UPLOAD_DIR, OUTPUT_DIR), ttl_seconds=STORAGE_TTL, max_bytes=STORAGE_MAX_BYTES,
+                         interval_seconds=STORAGE_SWEEP_SECONDS, on_evict=DATASET_CACHE.invalidate)
+# Background jobs for async requests (status polled via /jobs/<job_id>); their
+# state is kept in the registry database so a poll can land on any worker
+JOBS = JobQueue(JOB_WORKERS, store=REGISTRY)
+# Post-upload ingest work, on its own threads so it never queues behind (or
+# holds up) user jobs
+INGEST = JobQueue(INGEST_WORKERS, name='ingest')
 
-# In-memory registry of uploaded files for this server session
-REGISTRY = {}
+# Prometheus metrics served at /metrics, labelled with the worker's pid
+METRICS = MetricsRegistry()
+REQUEST_SECONDS = METRICS.histogram('bias_buster_request_seconds', 'Wall time per request or async job.',
+                                    ('endpoint', 'method', 'status'))
+STAGE_SECONDS = METRICS.histogram('bias_buster_stage_seconds', 'Wall time per processing stage.',
+                                  ('endpoint', 'method', 'stage'))
+DATASET_ROWS = METRICS.histogram('bias_buster_dataset_rows', 'Rows in the dataset a request processed.',
+                                 ('endpoint',), DEFAULT_ROW_BUCKETS)
+METRICS.collected('bias_buster_dataset_cache_events_total', 'Dataset cache hits, misses and evictions.', 'counter',
+                  lambda: [({'event': event}, DATASET_CACHE.stats()[key])
+                           for event, key in (('hit', 'hits'), ('miss', 'misses'), ('eviction', 'evictions'))])
+METRICS.collected('bias_buster_dataset_cache_bytes', 'Bytes held by the dataset cache.', 'gauge',
+                  lambda: [({}, DATASET_CACHE.stats()['bytes'])])
+METRICS.collected('bias_buster_report_cache_events_total', 'Report cache hits, misses, evictions and expirations.',
+                  'counter',
+                  lambda: [({'event': event}, REPORT_CACHE.stats()[key])
+                           for event, key in (('hit', 'hits'), ('miss', 'misses'), ('eviction', 'evictions'),
+                                              ('expiration', 'expirations'))])
+METRICS.collected('bias_buster_jobs', 'Background jobs by state.', 'gauge',
+                  lambda: [({'state': state}, n) for state, n in JOBS.stats().items()])
+METRICS.collected('bias_buster_ingest_jobs', 'Post-upload ingest jobs by state.', 'gauge',
+                  lambda: [({'state': state}, n) for state, n in INGEST.stats().items()])
+METRICS.collected('bias_buster_registered_datasets', 'Uploads in the registry.', 'gauge',
+                  lambda: [({}, len(REGISTRY))])
+METRICS.collected('bias_buster_storage_bytes', 'Bytes held in the upload and output directories.', 'gauge',
+                  lambda: [({}, STORAGE.stats()['bytes'])])
+METRICS.collected('bias_buster_storage_evicted_bytes_total', 'Bytes removed by storage expiry and eviction.',
+                  'counter', lambda: [({}, STORAGE.stats()['evicted_bytes'])])
+METRICS.collected('bias_buster_storage_evictions_total', 'Stored entries removed, by reason.', 'counter',
+                  lambda: [({'reason': reason}, STORAGE.stats()[key])
+                           for reason, key in (('ttl', 'expirations'), ('quota', 'quota_evictions'))])
 
 
 def allowed_file(filename: str):
     return os.path.splitext(filename)[1].lower() in ALLOWED_EXTENSIONS
 
 
+def _read_upload(meta: dict, columns=None, categorical=()) -> 'pd.DataFrame':
+    import pandas as pd
+    from service.columnar import read_columnar
+    from service.profiling import read_hints
+
+    if meta.get('columnar_path') and os.path.exists(meta['columnar_path']):
+        with stage('read_arrow'):
+            return read_columnar(meta['columnar_path'], columns=columns)
+    with stage('read_csv'):
+        if columns is not None and meta.get('dtypes'):
+            try:
+                return pd.read_csv(meta['path'], usecols=columns,
+                                   dtype=read_hints(meta['dtypes'], columns, categorical))
+            except (TypeError, ValueError):
+                # The upload-time dtype guess disagrees with the parser
+                app.logger.warning('dtype hints rejected for %s; inferring', meta['path'])
+        return pd.read_csv(meta['path'], usecols=columns)
+
+
+def load_dataset(file_id: str, columns=None, categorical=()) -> 'pd.DataFrame':
+    """
+    Parsed DataFrame for a registered upload (shared; do not mutate).
+
+    With ``columns``, a frame that is not already cached is loaded as a
+    projection instead of parsing and caching the whole file: straight from
+    the memory-mapped columnar copy, or from the CSV with the dtypes
+    recorded at upload as hints and ``categorical`` string columns read as
+    categories.
+    """
+    meta = dataset_meta(file_id)
+    STORAGE.touch(file_id)
+    _label_request(rows=meta.get('n_rows'))
+    try:
+        if columns is not None:
+            df = DATASET_CACHE.get(file_id)
+            if df is not None:
+                return df[columns]
+            return _read_upload(meta, columns=columns, categorical=categorical)
+        return DATASET_CACHE.get_or_load(file_id, lambda: _read_upload(meta))
+    except FileNotFoundError:
+        raise _dataset_gone() from None
+
+
+def _dataset_gone() -> 'RequestError':
+    return RequestError({'error': 'Dataset has expired or been removed; upload it again'}, 404)
+
+
+def dataset_meta(file_id: str) -> dict:
+    """
+    Registry entry of a dataset the request already validated. Storage
+    eviction (in any worker) can remove it in between, which raises a 404
+    RequestError rather than a KeyError.
+    """
+    meta = REGISTRY.get(file_id)
+    if meta is None:
+        raise _dataset_gone()
+    return meta
+
+
+def _label_request(method=None, rows=None) -> None:
+    # Metric labels for the request or job being timed
+    timer = current_timer()
+    if timer is not None:
+        if method is not None:
+            timer.method = method
+        if rows is not None:
+            timer.rows = rows
+
+
+def _observe(endpoint: str, timer: StageTimer, status: int) -> None:
+    method = timer.method or ''
+    REQUEST_SECONDS.observe(timer.elapsed(), endpoint=endpoint, method=method, status=status)
+    for name, seconds in timer.stages.items():
+        STAGE_SECONDS.observe(seconds, endpoint=endpoint, method=method, stage=name)
+    if timer.rows is not None:
+        DATASET_ROWS.observe(timer.rows, endpoint=endpoint)
+
+
+@app.before_request
+def _start_timing():
+    g.timer = StageTimer()
+    g.timing = ExitStack()
+    g.timing.enter_context(g.timer.active())
+    kind = request.args.get('profile')
+    if kind and PROFILING_ENABLED:
+        try:
+            g.profiler = RequestProfiler(kind if kind in PROFILERS else 'cprofile')
+            g.profiler.start()
+        except ValueError as e:
+            # Unknown/unavailable profiler, or another profile already running
+            app.logger.warning('Profiling skipped: %s', e)
+            g.profiler = None
+
+
+@app.after_request
+def _finish_timing(response):
+    timer = g.get('timer')
+    if timer is None:
+        return response
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        path = profiler.stop(PROFILE_DIR)
+        response.headers['X-Profile'] = f'/download/profiles/{os.path.basename(path)}'
+    response.headers['Server-Timing'] = timer.server_timing()
+    endpoint = request.endpoint
+    if endpoint not in (None, 'static', 'metrics'):
+        status = response.status_code
+        if response.is_streamed:
+            # Streamed bodies are produced after this hook; observe on close
+            response.call_on_close(lambda: _observe(endpoint, timer, status))
+        else:
+            _observe(endpoint, timer, status)
+    return response
+
+
+@app.before_request
+def _start_storage():
+    # The sweeper starts with the first request, in the serving process
+    STORAGE.start()
+
+
+@app.teardown_request
+def _stop_timing(exc):
+    timing = g.pop('timing', None)
+    if timing is not None:
+        timing.close()
+
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
 
+@app.errorhandler(413)
+def upload_too_large(e):
+    return jsonify({'error': 'Uploaded file is too large', 'details': e.description}), 413
+
+
+def build_columnar(file_id: str, csv_path: str, dtypes: dict, job=None):
+    """Background ingest stage: chunked CSV -> Arrow copy, then registry update."""
+    from service.columnar import columnar_path, write_columnar_from_csv
+
+    _progress(job, 'columnar', 0.1)
+    path = write_columnar_from_csv(csv_path, columnar_path(csv_path), dtypes, STREAM_CHUNK_ROWS)
+    if path is None:
+        app.logger.warning('Columnar ingest unavailable for %s; falling back to CSV reads', file_id)
+    elif file_id in REGISTRY:
+        REGISTRY.update(file_id, columnar_path=path)
+        STORAGE.added(path)
+    else:
+        # The upload was evicted while its copy was being built
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        path = None
+    return {'file_id': file_id, 'columnar_path': path}, 200
+
+
+def _write_sample(csv_path: str, sample):
+    # The upload-time reservoir sample, next to the upload; None without one
+    if sample is None or not len(sample):
+        return None
+    path = os.path.splitext(csv_path)[0] + SAMPLE_SUFFIX
+    try:
+        with stage('sample'):
+            sample.to_csv(path, index=False)
+    except OSError as e:
+        app.logger.warning('Could not write the preview sample for %s: %s', csv_path, e)
+        return None
+    return path
+
+
 @app.route('/upload', methods=['POST'])
 def upload():
     app.logger.info('Upload endpoint hit')
-    app.logger.info(f'Request files: {request.files}')
-    
-    # Ensure upload directory exists
+
+    # Parsing the form streams the file part to disk through an IngestSink,
+    # which validates and profiles the CSV as the bytes arrive
     try:
-        app.logger.info(f'Ensuring upload directory exists: {UPLOAD_DIR}')
-        os.makedirs(UPLOAD_DIR, exist_ok=True)
-        # Test if directory is writable
-        test_file = os.path.join(UPLOAD_DIR, '.test')
-        app.logger.info('Testing directory write permissions...')
-        with open(test_file, 'w') as f:
-            f.write('test')
-        os.remove(test_file)
-        app.logger.info('Directory write test successful')
-    except Exception as e:
-        error_msg = f'Failed to create/write to upload directory {UPLOAD_DIR}: {str(e)}'
-        app.logger.error(error_msg)
-        return jsonify({'error': f'Server error: Could not create upload directory. {str(e)}'}), 500
-
-    if 'file' not in request.files:
+        with stage('ingest'):
+            files = request.files
+    except OSError as e:
+        app.logger.error(f'Failed to write upload to {UPLOAD_DIR}: {str(e)}')
+        return jsonify({'error': f'Server error: Could not write to upload directory. {str(e)}'}), 500
+
+    if 'file' not in files:
         return jsonify({'error': 'No file part'}), 400
         
-    f = request.files['file']
+    f = files['file']
     if f.filename == '':
         return jsonify({'error': 'No file selected'}), 400
         
     if not allowed_file(f.filename):
         return jsonify({'error': 'Only .csv files are supported'}), 400
 
+    # Secure the filename and create a unique path
+    filename = secure_filename(f.filename)
+    if not filename:  # In case secure_filename returns empty
+        return jsonify({'error': 'Invalid file name'}), 400
+
+    sink = f.stream
+    profiler = sink.finish()
+    if sink.bytes_written == 0:
+        return jsonify({'error': 'Uploaded file is empty'}), 400
+    if profiler.error:
+        return jsonify({
+            'error': 'Invalid CSV file',
+            'details': profiler.error
+        }), 400
+
+    file_id = str(uuid.uuid4())
+    save_path = os.path.join(UPLOAD_DIR, f"{file_id}_{filename}")
     try:
-        # Secure the filename and create a unique path
-        filename = secure_filename(f.filename)
-        if not filename:  # In case secure_filename returns empty
-            return jsonify({'error': 'Invalid file name'}), 400
-            
-        file_id = str(uuid.uuid4())
-        save_name = f"{file_id}_{filename}"
-        save_path = os.path.join(UPLOAD_DIR, save_name)
-        
-        # Save the file
-        f.save(save_path)
-        
-        # Verify the file was saved and is not empty
-        if not os.path.exists(save_path) or os.path.getsize(save_path) == 0:
-            if os.path.exists(save_path):
-                os.remove(save_path)
-            return jsonify({'error': 'Uploaded file is empty'}), 400
-            
-        # Try reading the CSV to validate it
-        try:
-            df = pd.read_csv(save_path)
-            if df.empty:
-                raise ValueError('The CSV file is empty')
-                
-        except Exception as e:
-            if os.path.exists(save_path):
-                os.remove(save_path)
-            return jsonify({
-                'error': 'Invalid CSV file',
-                'details': str(e)
-            }), 400
-            
-    except Exception as e:
+        sink.commit(save_path)
+    except OSError as e:
         app.logger.error(f'Error during file upload: {str(e)}')
-        if 'save_path' in locals() and os.path.exists(save_path):
-            os.remove(save_path)
         return jsonify({
             'error': 'Failed to process uploaded file',
             'details': str(e)
         }), 500
 
     # Save metadata
-    REGISTRY[file_id] = {
+    meta = {
         'path': save_path,
         'filename': filename,
-        'n_rows': int(df.shape[0]),
-        'n_cols': int(df.shape[1]),
-        'columns': list(df.columns.astype(str)),
+        'n_rows': profiler.n_rows,
+        'n_cols': len(profiler.columns),
+        'columns': profiler.columns,
+        'dtypes': profiler.dtypes(),
+        'profiles': profiler.profiles(),
+        'columnar_path': None,
+        'content_hash': sink.content_hash,
+        'sample_path': _write_sample(save_path, profiler.sample()),
     }
+    with stage('register'):
+        REGISTRY[file_id] = meta
+    for path in (save_path, meta['sample_path']):
+        if path:
+            STORAGE.added(path)
+    _label_request(rows=profiler.n_rows)
+    # The memory-mappable columnar copy is built off the request path; reads
+    # use the CSV until the registry points at it
+    INGEST.submit('ingest', build_columnar, file_id, save_path, profiler.read_dtypes())
 
-    return jsonify({'file_id': file_id, **REGISTRY[file_id]}), 200
+    return jsonify({'file_id': file_id, **meta}), 200
 
 
 @app.route('/columns', methods=['GET'])
 def columns():
     file_id = request.args.get('file_id')
-    if not file_id or file_id not in REGISTRY:
+    meta = REGISTRY.get(file_id)
+    if meta is None:
         return jsonify({'error': 'Invalid file_id'}), 400
-    meta = REGISTRY[file_id]
-    return jsonify({'columns': meta['columns'], 'n_rows': meta['n_rows'], 'n_cols': meta['n_cols'], 'filename': meta['filename']}), 200
+    STORAGE.touch(file_id)
+    return jsonify({'columns': meta['columns'], 'n_rows': meta['n_rows'], 'n_cols': meta['n_cols'], 'filename': meta['filename'],
+                    'dtypes': meta['dtypes'], 'profiles': meta['profiles']}), 200
 
 
-@app.route('/analyze', methods=['POST'])
-def analyze():
-    data = request.get_json(force=True)
+def _progress(job, stage: str, fraction: float) -> None:
+    # Progress report and cancellation checkpoint for async jobs
+    if job is not None:
+        job.progress(stage, fraction)
+
+
+class RequestError(Exception):
+    """Invalid request detected below the view layer; carries the error payload."""
+
+    def __init__(self, payload: dict, status: int = 400):
+        super().__init__(payload.get('error'))
+        self.payload = payload
+        self.status = status
+
+
+@app.errorhandler(RequestError)
+def request_error(e):
+    return jsonify(e.payload), e.status
+
+
+def _content_hash(file_id: str, meta: dict) -> str:
+    # Uploads registered before content hashing are hashed on first use
+    if not meta.get('content_hash'):
+        meta['content_hash'] = file_sha256(meta['path'])
+        REGISTRY.update(file_id, content_hash=meta['content_hash'])
+    return meta['content_hash']
+
+
+def _check_report_columns(known_cols: list, sens_col, target_col) -> None:
+    if not sens_col:
+        raise RequestError({'error': 'Missing sensitive attribute column'})
+    if sens_col not in known_cols:
+        raise RequestError({'error': f'Column {sens_col} not in dataset'})
+    if target_col and target_col not in known_cols:
+        raise RequestError({'error': f'Target column {target_col} not in dataset'})
+
+
+def _parse_ci_opts(data: dict) -> dict:
+    # Optional bootstrap confidence intervals for the parity metrics
+    try:
+        ci_opts = {
+            'bootstrap': int(data.get('bootstrap') or 0),
+            'ci_level': float(data.get('ci_level') or 0.95),
+            'seed': int(data['seed']) if data.get('seed') is not None else None,
+        }
+    except (TypeError, ValueError):
+        raise RequestError({'error': 'bootstrap, ci_level and seed must be numeric'})
+    if not 0 <= ci_opts['bootstrap'] <= MAX_BOOTSTRAP_REPLICATES or not 0 < ci_opts['ci_level'] < 1:
+        raise RequestError({'error': f'bootstrap must be 0-{MAX_BOOTSTRAP_REPLICATES} and ci_level in (0, 1)'})
+    return ci_opts
+
+
+def parse_analyze_request(data: dict) -> dict:
+    """Validated parameters of an /analyze payload; raises RequestError."""
     file_id = data.get('file_id')
     sens_col = data.get('sensitive')
     target_col = data.get('target')  # optional
     positive_label = data.get('positive_label')  # optional, for classification datasets
 
-    if not file_id or file_id not in REGISTRY:
-        return jsonify({'error': 'Invalid file_id'}), 400
+    meta = REGISTRY.get(file_id)
+    if meta is None:
+        raise RequestError({'error': 'Invalid file_id'})
+    _check_report_columns(meta['columns'], sens_col, target_col)
+    ci_opts = _parse_ci_opts(data)
+    STORAGE.touch(file_id)
+
+    return {'file_id': file_id, 'meta': meta, 'sensitive': sens_col, 'target': target_col,
+            'positive_label': positive_label, 'streaming': bool(data.get('streaming')), 'ci_opts': ci_opts,
+            'preview': _parse_preview(data)}
+
+
+def _parse_preview(data: dict) -> int:
+    # Sample size of a preview report: true for the upload-time sample size,
+    # or a row count; 0 for the exact report
+    preview = data.get('preview')
+    if not preview:
+        return 0
+    if preview is True:
+        return PREVIEW_ROWS or 20_000
+    try:
+        rows = int(preview)
+    except (TypeError, ValueError):
+        raise RequestError({'error': 'preview must be true or a number of rows'})
+    if not 0 < rows <= MAX_PREVIEW_ROWS:
+        raise RequestError({'error': f'preview must be 1-{MAX_PREVIEW_ROWS} rows'})
+    return rows
+
+
+def parse_analyze_batch_request(data: dict) -> List[dict]:
+    """
+    Per-spec /analyze parameters for an /analyze/batch payload, whose
+    ``specs`` list holds {sensitive, target, positive_label} objects sharing
+    the payload's file_id and bootstrap options; raises RequestError.
+    """
+    file_id = data.get('file_id')
+    meta = REGISTRY.get(file_id)
+    if meta is None:
+        raise RequestError({'error': 'Invalid file_id'})
+    specs = data.get('specs')
+    if not isinstance(specs, list) or not specs or not all(isinstance(spec, dict) for spec in specs):
+        raise RequestError({'error': 'specs must be a non-empty list of {sensitive, target, positive_label} objects'})
+    if len(specs) > MAX_BATCH_SPECS:
+        raise RequestError({'error': f'At most {MAX_BATCH_SPECS} specs per batch'})
+    ci_opts = _parse_ci_opts(data)
+    batch = []
+    for spec in specs:
+        _check_report_columns(meta['columns'], spec.get('sensitive'), spec.get('target'))
+        batch.append({'file_id': file_id, 'meta': meta, 'sensitive': spec['sensitive'], 'target': spec.get('target'),
+                      'positive_label': spec.get('positive_label'), 'streaming': False, 'ci_opts': ci_opts,
+                      'preview': 0})
+    return batch
+
+
+def analyze_etag(params: dict):
+    """
+    Report cache key for parsed /analyze parameters, also sent as the ETag.
+    None when the report is not reproducible (unseeded bootstrap).
+    """
+    ci_opts = params['ci_opts']
+    if ci_opts['bootstrap'] and ci_opts['seed'] is None:
+        return None
+    return report_key(_content_hash(params['file_id'], params['meta']), params['sensitive'], params['target'],
+                      params['positive_label'], streaming=params['streaming'], preview=params['preview'], **ci_opts)
+
+
+def run_analyze(data: dict, job=None):
+    """Bias report for an /analyze payload; returns (payload, http_status)."""
+    try:
+        params = parse_analyze_request(data)
+    except RequestError as e:
+        return e.payload, e.status
+    key = analyze_etag(params)
+    if key is None:
+        return compute_analysis(params, job), 200
+    return REPORT_CACHE.get_or_compute(key, lambda: compute_analysis(params, job)), 200
+
+
+def compute_analysis(params: dict, job=None) -> dict:
+    """Compute the bias report for parsed /analyze parameters."""
+    from bias.metrics import compute_bias_report
+    from bias.parallel import compute_bias_report_parallel
+    from bias.streaming import compute_bias_report_streaming
+    from service.columnar import iter_columnar_batches
+
+    file_id = params['file_id']
+    sens_col = params['sensitive']
+    target_col = params['target']
+    positive_label = params['positive_label']
+    ci_opts = params['ci_opts']
+
+    needed = [sens_col] + ([target_col] if target_col and target_col != sens_col else [])
+    _progress(job, 'load', 0.1)
+    if params['preview']:
+        return compute_preview(params, needed, job)
+    if params['streaming']:
+        # Out-of-core: accumulate per-group counts chunk by chunk
+        meta = params['meta']
+        _label_request(method='streaming', rows=meta.get('n_rows'))
+        if meta.get('columnar_path') and os.path.exists(meta['columnar_path']):
+            source = iter_columnar_batches(meta['columnar_path'], columns=needed, batch_rows=STREAM_CHUNK_ROWS)
+        else:
+            source = meta['path']
+        return compute_bias_report_streaming(source, sensitive_col=sens_col, target_col=target_col,
+                                             positive_label=positive_label, chunksize=STREAM_CHUNK_ROWS, **ci_opts)
+
+    with stage('load'):
+        df = load_dataset(file_id, columns=needed, categorical=[sens_col])
+    _progress(job, 'analyze', 0.5)
+
+    _label_request(method='parallel' if PARALLEL_WORKERS > 1 else 'serial')
+    if PARALLEL_WORKERS > 1:
+        return compute_bias_report_parallel(df, sensitive_col=sens_col, target_col=target_col, positive_label=positive_label,
+                                            workers=PARALLEL_WORKERS, partition_rows=PARTITION_ROWS, **ci_opts)
+    return compute_bias_report(df, sensitive_col=sens_col, target_col=target_col, positive_label=positive_label, **ci_opts)
+
+
+def _read_sample(meta: dict, columns: list, categorical: list, rows: int) -> 'pd.DataFrame':
+    """
+    A uniform sample of at least ``rows`` rows of an upload (or all of it),
+    projected to ``columns``: the sample stored at upload when it is large
+    enough, else one reservoir pass over the columnar copy or the CSV.
+    """
+    import pandas as pd
+    from bias.sampling import reservoir_sample
+    from service.columnar import iter_columnar_batches
+    from service.profiling import read_hints
+
+    wanted = min(rows, meta['n_rows'])
+    path = meta.get('sample_path')
+    if path and os.path.exists(path):
+        with stage('read_sample'):
+            try:
+                sample = pd.read_csv(path, usecols=columns, dtype=read_hints(meta.get('dtypes') or {}, columns, categorical))
+            except (TypeError, ValueError):
+                sample = pd.read_csv(path, usecols=columns)
+        if len(sample) >= wanted:
+            return sample
+    if meta.get('columnar_path') and os.path.exists(meta['columnar_path']):
+        chunks = iter_columnar_batches(meta['columnar_path'], columns=columns, batch_rows=STREAM_CHUNK_ROWS)
+    else:
+        chunks = pd.read_csv(meta['path'], usecols=columns, chunksize=STREAM_CHUNK_ROWS)
+    with stage('reservoir'):
+        # Seeded, so that repeated previews (and their ETag) agree
+        sample, _ = reservoir_sample(chunks, rows, seed=0)
+    return sample
+
+
+def compute_preview(params: dict, needed: list, job=None) -> dict:
+    """Approximate bias report with error bounds from a sample of the upload."""
+    import numpy as np
+    from bias.sampling import preview_bias_report
+
+    meta = params['meta']
+    rows = params['preview']
+    ci_opts = params['ci_opts']
+    _label_request(method='preview', rows=meta.get('n_rows'))
+    with stage('load'):
+        sample = _read_sample(meta, needed, [params['sensitive']], rows)
+    _progress(job, 'analyze', 0.5)
+    if len(sample) > rows:
+        # A smaller preview than the stored sample: a fixed subsample, so
+        # the report (and its ETag) does not change between requests
+        picked = np.random.default_rng(0).choice(len(sample), size=rows, replace=False)
+        sample = sample.iloc[np.sort(picked)]
+    return preview_bias_report(sample, params['sensitive'], params['target'], params['positive_label'],
+                               meta['n_rows'], ci_opts['ci_level'], ci_opts['seed'])
+
+
+def run_analyze_batch(data: dict, job=None):
+    """
+    Bias reports for an /analyze/batch payload; returns (payload, http_status).
+
+    Cached reports are reused; the rest are computed together from one
+    projected load of the columns they need.
+    """
+    from bias.metrics import compute_bias_reports
+
+    try:
+        batch = parse_analyze_batch_request(data)
+    except RequestError as e:
+        return e.payload, e.status
+    keys = [analyze_etag(params) for params in batch]
+    reports = [REPORT_CACHE.get(key) if key is not None else None for key in keys]
+    missing = [i for i, report in enumerate(reports) if report is None]
+    if missing:
+        needed = []
+        for i in missing:
+            for col in (batch[i]['sensitive'], batch[i]['target']):
+                if col and col not in needed:
+                    needed.append(col)
+        _progress(job, 'load', 0.1)
+        with stage('load'):
+            df = load_dataset(batch[0]['file_id'], columns=needed,
+                              categorical=[batch[i]['sensitive'] for i in missing])
+        _progress(job, 'analyze', 0.5)
+        _label_request(method='batch')
+        specs = [(batch[i]['sensitive'], batch[i]['target'], batch[i]['positive_label']) for i in missing]
+        for i, report in zip(missing, compute_bias_reports(df, specs, **batch[0]['ci_opts'])):
+            reports[i] = report
+            if keys[i] is not None and 'error' not in report:
+                REPORT_CACHE.put(keys[i], report)
+    return {'file_id': batch[0]['file_id'], 'reports': reports}, 200
+
+
+def run_sweep(data: dict, job=None):
+    """Threshold-sweep curves for an /analyze/sweep payload; returns (payload, http_status)."""
+    from bias.metrics import threshold_sweep
+
+    file_id = data.get('file_id')
+    sens_col = data.get('sensitive')
+    score_col = data.get('score')
+    meta = REGISTRY.get(file_id)
+    if meta is None:
+        return {'error': 'Invalid file_id'}, 400
     if not sens_col:
-        return jsonify({'error': 'Missing sensitive attribute column'}), 400
+        return {'error': 'Missing sensitive attribute column'}, 400
+    if not score_col:
+        return {'error': 'Missing score column'}, 400
+    for col in (sens_col, score_col):
+        if col not in meta['columns']:
+            return {'error': f'Column {col} not in dataset'}, 400
+    thresholds = data.get('thresholds')
+    try:
+        points = int(data.get('points') or SWEEP_POINTS)
+        if thresholds is not None:
+            thresholds = [float(t) for t in thresholds]
+    except (TypeError, ValueError):
+        return {'error': 'points and thresholds must be numeric'}, 400
+    if not 2 <= (points if thresholds is None else len(thresholds)) <= MAX_SWEEP_POINTS:
+        return {'error': f'Sweeps are limited to 2-{MAX_SWEEP_POINTS} thresholds'}, 400
 
-    df = pd.read_csv(REGISTRY[file_id]['path'])
-    if sens_col not in df.columns:
-        return jsonify({'error': f'Column {sens_col} not in dataset'}), 400
-    if target_col and target_col not in df.columns:
-        return jsonify({'error': f'Target column {target_col} not in dataset'}), 400
+    def compute():
+        _progress(job, 'load', 0.1)
+        with stage('load'):
+            df = load_dataset(file_id, columns=[sens_col] + ([score_col] if score_col != sens_col else []),
+                              categorical=[sens_col])
+        _progress(job, 'sweep', 0.5)
+        _label_request(method='sweep')
+        return threshold_sweep(df, sens_col, score_col, thresholds=thresholds, max_points=points)
 
-    report = compute_bias_report(df, sensitive_col=sens_col, target_col=target_col, positive_label=positive_label)
-    return jsonify(report), 200
+    key = report_key(_content_hash(file_id, meta), sens_col, score_col, None, sweep=True,
+                     thresholds=thresholds, points=points)
+    return REPORT_CACHE.get_or_compute(key, compute), 200
 
 
-@app.route('/mitigate', methods=['POST'])
-def mitigate():
-    data = request.get_json(force=True)
+def run_fairness(data: dict, job=None):
+    """Prediction-based fairness metrics for an /analyze/fairness payload; returns (payload, http_status)."""
+    from bias.metrics import compute_fairness_report
+
     file_id = data.get('file_id')
     sens_col = data.get('sensitive')
     target_col = data.get('target')
+    pred_col = data.get('prediction')
     positive_label = data.get('positive_label')
-    method = (data.get('method') or 'reweigh').lower()
+    prediction_positive_label = data.get('prediction_positive_label')
+    meta = REGISTRY.get(file_id)
+    if meta is None:
+        return {'error': 'Invalid file_id'}, 400
+    if not sens_col:
+        return {'error': 'Missing sensitive attribute column'}, 400
+    if not target_col:
+        return {'error': 'Missing target column'}, 400
+    if not pred_col:
+        return {'error': 'Missing prediction column'}, 400
+    for col in (sens_col, target_col, pred_col):
+        if col not in meta['columns']:
+            return {'error': f'Column {col} not in dataset'}, 400
+    try:
+        threshold = float(data.get('threshold', 0.5))
+        bins = int(data.get('calibration_bins', CALIBRATION_BINS))
+    except (TypeError, ValueError):
+        return {'error': 'threshold and calibration_bins must be numeric'}, 400
+    if not 0 <= bins <= MAX_CALIBRATION_BINS:
+        return {'error': f'calibration_bins must be between 0 and {MAX_CALIBRATION_BINS}'}, 400
+
+    def compute():
+        _progress(job, 'load', 0.1)
+        with stage('load'):
+            df = load_dataset(file_id, columns=list(dict.fromkeys([sens_col, target_col, pred_col])),
+                              categorical=[sens_col])
+        _progress(job, 'fairness', 0.5)
+        _label_request(method='fairness')
+        return compute_fairness_report(df, sens_col, target_col, pred_col, positive_label=positive_label,
+                                       threshold=threshold, calibration_bins=bins,
+                                       prediction_positive_label=prediction_positive_label)
+
+    key = report_key(_content_hash(file_id, meta), sens_col, target_col, positive_label, fairness=True,
+                     prediction=pred_col, prediction_positive_label=prediction_positive_label,
+                     threshold=threshold, bins=bins)
+    return REPORT_CACHE.get_or_compute(key, compute), 200
 
+
+def _check_mitigate_request(data: dict):
+    file_id = data.get('file_id')
     if not file_id or file_id not in REGISTRY:
-        return jsonify({'error': 'Invalid file_id'}), 400
-    if not sens_col:
-        return jsonify({'error': 'Missing sensitive attribute column'}), 400
+        raise RequestError({'error': 'Invalid file_id'})
+    if not data.get('sensitive'):
+        raise RequestError({'error': 'Missing sensitive attribute column'})
+    method = (data.get('method') or 'reweigh').lower()
+    if method not in ('reweigh', 'resample', 'adjust'):
+        raise RequestError({'error': 'Unknown method. Use reweigh, resample, or adjust.'})
+    if method == 'adjust' and not data.get('target'):
+        raise RequestError({'error': 'Target column is required for adjust method'})
+
 
-    df = pd.read_csv(REGISTRY[file_id]['path'])
+def _parse_score_opts(data: dict):
+    # Score columns ranked by modify_original selection, with optional weights
+    score_cols = data.get('score_columns')
+    score_weights = data.get('score_weights')
+    if isinstance(score_cols, str):
+        score_cols = [score_cols]
+    if score_cols is not None and (not isinstance(score_cols, list) or not all(isinstance(c, str) for c in score_cols)):
+        raise RequestError({'error': 'score_columns must be a column name or a list of names'})
+    if score_weights is not None:
+        try:
+            score_weights = [float(w) for w in score_weights]
+        except (TypeError, ValueError):
+            raise RequestError({'error': 'score_weights must be a list of numbers'})
+        if len(score_weights) != len(score_cols or []):
+            raise RequestError({'error': 'score_weights needs one weight per score column'})
+    known_cols = dataset_meta(data['file_id'])['columns']
+    missing = [c for c in score_cols or [] if c not in known_cols]
+    if missing:
+        raise RequestError({'error': f'Score columns not in dataset: {missing}'})
+    return score_cols or None, score_weights
+
+
+def mitigate_frame(data: dict, job=None):
+    """
+    Compute the mitigated frame for a /mitigate payload.
+
+    Returns (mitigated_df, out_name, payload) where payload holds the
+    response fields other than the download link; raises RequestError.
+    """
+    from bias.mitigate import adjust_values, apply_quota_selection, resample_dataset
+    from bias.parallel import reweigh_dataset_parallel
+
+    _check_mitigate_request(data)
+    file_id = data.get('file_id')
+    sens_col = data.get('sensitive')
+    target_col = data.get('target')
+    positive_label = data.get('positive_label')
+    method = (data.get('method') or 'reweigh').lower()
+    _label_request(method=method)
+
+    _progress(job, 'load', 0.1)
+    with stage('load'):
+        df = load_dataset(file_id)
+    _progress(job, 'mitigate', 0.4)
 
     if method == 'reweigh':
-        mitigated = reweigh_dataset(df, sensitive_col=sens_col, target_col=target_col, positive_label=positive_label)
-        out_name = f"{file_id}_mitigated_reweigh.csv"
-        out_path = os.path.join(OUTPUT_DIR, out_name)
-        mitigated.to_csv(out_path, index=False)
-        return jsonify({'download': f"/download/{out_name}", 'method': 'reweigh'}), 200
+        # 'append' shares the loaded (possibly cached) columns instead of copying them
+        mitigated = reweigh_dataset_parallel(df, sensitive_col=sens_col, target_col=target_col, positive_label=positive_label,
+                                             workers=PARALLEL_WORKERS, partition_rows=PARTITION_ROWS, output='append')
+        return mitigated, f"{file_id}_mitigated_reweigh.csv", {'method': 'reweigh'}
     elif method == 'resample':
-        mitigated = resample_dataset(df, sensitive_col=sens_col, target_col=target_col, positive_label=positive_label)
-        out_name = f"{file_id}_mitigated_resample.csv"
-        out_path = os.path.join(OUTPUT_DIR, out_name)
-        mitigated.to_csv(out_path, index=False)
-        return jsonify({'download': f"/download/{out_name}", 'method': 'resample'}), 200
-    elif method == 'adjust':
-        if not target_col:
-            return jsonify({'error': 'Target column is required for adjust method'}), 400
+        # 'counts' keeps the original rows plus a replication_count column
+        # instead of materializing the upsampled frame
+        resample_output = 'counts' if data.get('resample_output') == 'counts' else 'frame'
+        mitigated = resample_dataset(df, sensitive_col=sens_col, target_col=target_col, positive_label=positive_label,
+                                     output=resample_output)
+        out_name = f"{file_id}_mitigated_resample{'_counts' if resample_output == 'counts' else ''}.csv"
+        return mitigated, out_name, {'method': 'resample'}
+    else:  # 'adjust'
         adjustment_method = data.get('adjustment_method', 'multiply')
         modify_original = data.get('modify_original', False)
         threshold = float(data.get('threshold', 0.5)) if modify_original else 0.5
         
+        payload = {'method': f'adjust_{adjustment_method}'}
         try:
-            # Create a copy of the dataframe to avoid modifying the original
-            df_mitigated = df.copy()
-            
-            # Apply bias correction
-            df_mitigated = adjust_values(
-                df_mitigated, 
-                sensitive_col=sens_col, 
-                target_col=target_col,
-                method=adjustment_method,
-                modify_original=modify_original,
-                threshold=threshold
-            )
-            
-            # If we modified the original column, ensure the target column has the corrected values
-            if modify_original and target_col in df_mitigated.columns:
-                # Convert to binary if it's a probability
-                if df_mitigated[target_col].dtype == float:
-                    df_mitigated[target_col] = (df_mitigated[target_col] > threshold).astype(int)
-                
-                # Add a column indicating the original values for reference
-                df_mitigated[f'original_{target_col}'] = df[target_col]
-                
-                # Calculate and log the changes
-                original_counts = df[target_col].value_counts()
-                new_counts = df_mitigated[target_col].value_counts()
-                print(f"Original counts: {original_counts.to_dict()}")
-                print(f"Adjusted counts: {new_counts.to_dict()}")
-            
-            # Save the mitigated dataset
-            out_name = f"{file_id}_adjusted_{adjustment_method}_{'modified' if modify_original else 'weighted'}.csv"
-            out_path = os.path.join(OUTPUT_DIR, out_name)
-            df_mitigated.to_csv(out_path, index=False)
-            
+            if modify_original:
+                score_cols, score_weights = _parse_score_opts(data)
+                # Keeps the original values for reference
+                df_mitigated, payload['selection'] = apply_quota_selection(
+                    df, sens_col, target_col, score_cols, score_weights, threshold=threshold,
+                    positive_label=positive_label, keep_original=True)
+            else:
+                # Apply bias correction (returns a copy; df is left untouched)
+                df_mitigated = adjust_values(
+                    df,
+                    sensitive_col=sens_col,
+                    target_col=target_col,
+                    method=adjustment_method,
+                )
+
             # Calculate and include some statistics in the response
+            # (with modify_original, the positives as the selection counted them)
             stats = {
                 'original_size': len(df),
                 'mitigated_size': len(df_mitigated),
-                'original_positive': int(df[target_col].sum()),
+                'original_positive': payload['selection']['total'] if modify_original else int(df[target_col].sum()),
                 'mitigated_positive': int(df_mitigated[target_col].sum())
             }
-            
-            return jsonify({
-                'download': f"/download/{out_name}", 
-                'method': f'adjust_{adjustment_method}',
-                'stats': stats
-            }), 200
-            
+
+        except (JobCancelled, RequestError):
+            raise
         except Exception as e:
             import traceback
             error_details = traceback.format_exc()
-            print(f"Error in adjust method: {error_details}")
-            return jsonify({'error': f'Adjustment failed: {str(e)}', 'details': error_details}), 400
+            app.logger.error('Error in adjust method: %s', error_details)
+            raise RequestError({'error': f'Adjustment failed: {str(e)}', 'details': error_details})
+
+        out_name = f"{file_id}_adjusted_{adjustment_method}_{'modified' if modify_original else 'weighted'}.csv"
+        return df_mitigated, out_name, {**payload, 'stats': stats}
+
+
+def _load_projection(data: dict, job=None):
+    # The sensitive and target columns of a /mitigate payload, read alone;
+    # the target is None when the upload does not have it
+    file_id = data.get('file_id')
+    sens_col = data.get('sensitive')
+    target_col = data.get('target')
+    if target_col not in dataset_meta(file_id)['columns']:
+        target_col = None
+    needed = [sens_col] + ([target_col] if target_col and target_col != sens_col else [])
+    _progress(job, 'load', 0.1)
+    with stage('load'):
+        df = load_dataset(file_id, columns=needed, categorical=[sens_col])
+    _progress(job, 'mitigate', 0.4)
+    return df, sens_col, target_col
+
+
+def reweigh_weights(data: dict, job=None):
+    """
+    sample_weight values for a reweigh /mitigate payload, computed from the
+    sensitive and target columns alone so the other columns can be copied
+    to the output unparsed. Returns (weights, out_name, payload), or None
+    when the payload has to go through mitigate_frame; raises RequestError.
+    """
+    from bias.parallel import reweigh_dataset_parallel
+
+    _check_mitigate_request(data)
+    if (data.get('method') or 'reweigh').lower() != 'reweigh':
+        return None
+    file_id = data.get('file_id')
+    known_cols = dataset_meta(file_id)['columns']
+    # An existing sample_weight column is overwritten in place by the frame path
+    if data.get('sensitive') not in known_cols or 'sample_weight' in known_cols:
+        return None
+    _label_request(method='reweigh')
+    df, sens_col, target_col = _load_projection(data, job)
+    weights = reweigh_dataset_parallel(df, sensitive_col=sens_col, target_col=target_col,
+                                       positive_label=data.get('positive_label'),
+                                       workers=PARALLEL_WORKERS, partition_rows=PARTITION_ROWS, output='weights')
+    return weights, f"{file_id}_mitigated_reweigh.csv", {'method': 'reweigh'}
+
+
+def sidecar_column(data: dict, job=None):
+    """
+    The single column asked for by a sidecar /mitigate payload, in place of
+    the mitigated dataset: ``"reweigh_output": "sidecar"`` gives each row's
+    sample_weight keyed by row number, ``"resample_output": "index"`` the
+    upload row numbers making up the resampled dataset. Only the sensitive
+    and target columns are read. Returns (name, values, keyed, out_name,
+    payload), or None for any other payload; raises RequestError.
+    """
+    from bias.mitigate import resample_dataset
+    from bias.parallel import reweigh_dataset_parallel
+
+    _check_mitigate_request(data)
+    method = (data.get('method') or 'reweigh').lower()
+    if method == 'reweigh' and data.get('reweigh_output') == 'sidecar':
+        name, keyed, suffix = 'sample_weight', True, 'sample_weight'
+    elif method == 'resample' and data.get('resample_output') == 'index':
+        name, keyed, suffix = 'row', False, 'resample_index'
+    else:
+        return None
+    file_id = data.get('file_id')
+    if data.get('sensitive') not in dataset_meta(file_id)['columns']:
+        raise RequestError({'error': f"Column {data.get('sensitive')} not in dataset"})
+    _label_request(method=method)
+    df, sens_col, target_col = _load_projection(data, job)
+    if method == 'reweigh':
+        values = reweigh_dataset_parallel(df, sensitive_col=sens_col, target_col=target_col,
+                                          positive_label=data.get('positive_label'),
+                                          workers=PARALLEL_WORKERS, partition_rows=PARTITION_ROWS, output='weights')
+    else:
+        values = resample_dataset(df, sensitive_col=sens_col, target_col=target_col, output='index')
+    return name, values, keyed, f"{file_id}_{suffix}.csv", {'method': method, 'rows': int(len(values))}
+
+
+def run_mitigate(data: dict, job=None):
+    """Mitigated export for a /mitigate payload; returns (payload, http_status)."""
+    from bias.parallel import to_csv_parallel
+    from service.export import write_csv_with_column, write_sidecar_csv
+
+    ensure_dirs()
+    try:
+        if data.get('export') == 'stream':
+            # Defer the work to the download itself, which streams the CSV
+            _check_mitigate_request(data)
+            spec = {k: data.get(k) for k in EXPORT_SPEC_KEYS if data.get(k) is not None}
+            method = (data.get('method') or 'reweigh').lower()
+            return {'download': f"/export?{urlencode({'spec': json.dumps(spec)})}", 'method': method}, 200
+        sidecar = sidecar_column(data, job)
+        if sidecar is not None:
+            name, values, keyed, out_name, payload = sidecar
+            _progress(job, 'write', 0.7)
+            with stage('to_csv'):
+                write_sidecar_csv(os.path.join(OUTPUT_DIR, out_name), name, values, EXPORT_CHUNK_ROWS, keyed)
+            STORAGE.added(os.path.join(OUTPUT_DIR, out_name))
+            return {'download': f"/download/{out_name}", **payload}, 200
+        weighted = reweigh_weights(data, job)
+        if weighted is not None:
+            weights, out_name, payload = weighted
+            meta = dataset_meta(data['file_id'])
+            _progress(job, 'write', 0.7)
+            try:
+                with stage('to_csv'):
+                    write_csv_with_column(meta['path'], os.path.join(OUTPUT_DIR, out_name), 'sample_weight',
+                                          weights, len(meta['columns']), EXPORT_CHUNK_ROWS)
+                STORAGE.added(os.path.join(OUTPUT_DIR, out_name))
+                return {'download': f"/download/{out_name}", **payload}, 200
+            except ValueError as e:
+                app.logger.warning('CSV pass-through failed (%s); writing from the parsed frame', e)
+        mitigated, out_name, payload = mitigate_frame(data, job)
+    except RequestError as e:
+        return e.payload, e.status
+
+    # Save the mitigated dataset
+    out_path = os.path.join(OUTPUT_DIR, out_name)
+    _progress(job, 'write', 0.7)
+    to_csv_parallel(mitigated, out_path, workers=PARALLEL_WORKERS, partition_rows=PARTITION_ROWS)
+    STORAGE.added(out_path)
+    return {'download': f"/download/{out_name}", **payload}, 200
+
+
+@app.route('/analyze', methods=['POST'])
+def analyze():
+    data = request.get_json(force=True)
+    if data.get('async'):
+        return submit_job('analyze', run_analyze, data)
+    try:
+        params = parse_analyze_request(data)
+    except RequestError as e:
+        return jsonify(e.payload), e.status
+    # The ETag identifies the report by dataset content and parameters, so a
+    # client holding it can revalidate without the report being recomputed
+    etag = analyze_etag(params)
+    if etag is not None and request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    if etag is None:
+        report = compute_analysis(params)
     else:
-        return jsonify({'error': 'Unknown method. Use reweigh, resample, or adjust.'}), 400
+        report = REPORT_CACHE.get_or_compute(etag, lambda: compute_analysis(params))
+    response = jsonify(report)
+    if etag is not None and 'error' not in report:
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+@app.route('/analyze/batch', methods=['POST'])
+def analyze_batch():
+    data = request.get_json(force=True)
+    if data.get('async'):
+        return submit_job('analyze_batch', run_analyze_batch, data)
+    payload, status = run_analyze_batch(data)
+    return jsonify(payload), status
+
+
+@app.route('/analyze/sweep', methods=['POST'])
+def analyze_sweep():
+    data = request.get_json(force=True)
+    if data.get('async'):
+        return submit_job('analyze_sweep', run_sweep, data)
+    payload, status = run_sweep(data)
+    return jsonify(payload), status
+
+
+@app.route('/analyze/fairness', methods=['POST'])
+def analyze_fairness():
+    data = request.get_json(force=True)
+    if data.get('async'):
+        return submit_job('analyze_fairness', run_fairness, data)
+    payload, status = run_fairness(data)
+    return jsonify(payload), status
+
+
+@app.route('/mitigate', methods=['POST'])
+def mitigate():
+    data = request.get_json(force=True)
+    if data.get('async'):
+        return submit_job('mitigate', run_mitigate, data)
+    payload, status = run_mitigate(data)
+    return jsonify(payload), status
+
+
+def _timed_job(endpoint: str, fn):
+    # Jobs run on pool threads, outside the request's timer
+    def run(data: dict, job):
+        timer = StageTimer()
+        with timer.active():
+            try:
+                payload, status = fn(data, job)
+            except RequestError as e:
+                payload, status = e.payload, e.status
+        job.timings = timer.as_dict()
+        _observe(endpoint, timer, status)
+        return payload, status
+    return run
+
+
+def submit_job(kind: str, fn, data: dict):
+    file_id = data.get('file_id')
+    if not file_id or file_id not in REGISTRY:
+        return jsonify({'error': 'Invalid file_id'}), 400
+    job = JOBS.submit(kind, _timed_job(kind, fn), data)
+    return jsonify({'job_id': job.id, 'status': job.status, 'status_url': f'/jobs/{job.id}'}), 202
+
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    state = JOBS.state(job_id)
+    if state is None:
+        return jsonify({'error': 'Unknown job_id'}), 404
+    return jsonify(state), 200
+
+
+@app.route('/jobs/<job_id>', methods=['DELETE'])
+def job_cancel(job_id):
+    state = JOBS.request_cancel(job_id)
+    if state is None:
+        return jsonify({'error': 'Unknown job_id'}), 404
+    return jsonify(state), 200
+
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify({**DATASET_CACHE.stats(), 'reports': REPORT_CACHE.stats(), 'storage': STORAGE.stats()}), 200
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(METRICS.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@app.route('/export', methods=['GET'])
+def export():
+    """
+    Stream a mitigated CSV straight into the response, encoded chunk by
+    chunk and optionally gzip/zstd compressed, without writing it to disk.
+    ``spec`` is the JSON /mitigate payload returned by export=stream.
+    """
+    from service.export import (choose_encoding, count_csv_records, encode_stream, iter_csv_chunks,
+                                iter_csv_with_column, iter_sidecar_csv)
+
+    try:
+        data = json.loads(request.args.get('spec') or '{}')
+    except json.JSONDecodeError:
+        data = None
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Invalid export spec'}), 400
+
+    try:
+        chunks = None
+        sidecar = sidecar_column(data)
+        weighted = reweigh_weights(data) if sidecar is None else None
+        if sidecar is not None:
+            name, values, keyed, out_name, _ = sidecar
+            chunks = iter_sidecar_csv(name, values, EXPORT_CHUNK_ROWS, keyed)
+        elif weighted is not None:
+            # Reweighing copies the upload's records through untouched. Once
+            # the response has started an error can only truncate it, so the
+            # record count is checked up front and the first chunk taken here
+            # (which opens the file); on a mismatch the frame is serialized
+            # instead, as run_mitigate does.
+            weights, out_name, _ = weighted
+            meta = dataset_meta(data['file_id'])
+            if count_csv_records(meta['path']) == len(weights):
+                records = iter_csv_with_column(meta['path'], 'sample_weight', weights, len(meta['columns']),
+                                               EXPORT_CHUNK_ROWS)
+                chunks = itertools.chain([next(records)], records)
+            else:
+                app.logger.warning('CSV pass-through row count differs for %s; streaming from the parsed frame',
+                                   data['file_id'])
+        if chunks is None:
+            mitigated, out_name, _ = mitigate_frame(data)
+            chunks = iter_csv_chunks(mitigated, EXPORT_CHUNK_ROWS)
+    except RequestError as e:
+        return jsonify(e.payload), e.status
+
+    encoding = choose_encoding(request.args.get('encoding'), request.accept_encodings)
+    body = current_timer().iterate('encode', encode_stream(chunks, encoding))
+    headers = {'Content-Disposition': f'attachment; filename={out_name}', 'Vary': 'Accept-Encoding'}
+    if encoding != 'identity':
+        headers['Content-Encoding'] = encoding
+    return Response(stream_with_context(body), mimetype='text/csv', headers=headers)
+
+
+def warm_up() -> dict:
+    """
+    Pay the cold-start costs ahead of the first real request: create the
+    storage directories, open the registry, import the analysis stack and
+    run one tiny report through it. Safe to call repeatedly and from any
+    thread; returns the seconds each step took.
+    """
+    timings = {}
+    started = time.perf_counter()
+
+    def lap(step: str) -> None:
+        nonlocal started
+        now = time.perf_counter()
+        timings[step] = round(now - started, 6)
+        started = now
+
+    ensure_dirs()
+    lap('dirs')
+    len(REGISTRY)
+    lap('registry')
+    for name in WARMUP_MODULES:
+        importlib.import_module(name)
+    lap('imports')
+    import pandas as pd
+    from bias.metrics import compute_bias_report
+
+    compute_bias_report(pd.read_csv(io.StringIO('g,y\na,1\nb,0\n')), 'g', 'y')
+    lap('first_report')
+    return timings
+
+
+@app.route('/warmup', methods=['GET'])
+def warmup():
+    # For a platform health check or scheduled ping, so that cold starts
+    # happen off the user-facing path
+    return jsonify({'warm': True, 'seconds': warm_up()})
 
 
 @app.route('/download/<path:filename>', methods=['GET'])
 def download(filename):
+    file_id = owner(filename)
+    if file_id is not None:
+        STORAGE.touch(file_id)
     return send_from_directory(OUTPUT_DIR, filename, as_attachment=True)
 
 
+if WARMUP_ON_START:
+    threading.Thread(target=warm_up, name='warmup', daemon=True).start()
+
 if __name__ == '__main__':
     app.run(host='127.0.0.1', port=5000, debug=True)
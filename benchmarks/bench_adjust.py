@@ -0,0 +1,84 @@
+"""
+Throughput benchmark for bias.mitigate.adjust_values.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_adjust
+    python -m benchmarks.bench_adjust --rows 100000,1000000,10000000 --groups 2,1000
+
+Before timing, the columnar kernel is checked against the original
+iterrows implementation (multiply and add, auto and explicit factors,
+unknown and null groups, inplace and copy modes).
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from bias.mitigate import adjust_values
+
+from .legacy import legacy_adjusted
+
+
+def make_data(n_rows: int, n_groups: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    group = rng.choice(n_groups, size=n_rows).astype(str)
+    offset = rng.normal(50_000, 5_000, size=n_groups)
+    salary = rng.normal(0, 2_000, size=n_rows) + offset[rng.choice(n_groups, size=n_rows)]
+    return pd.DataFrame({'gender': group, 'age': rng.integers(20, 60, n_rows), 'salary': salary.round(2)})
+
+
+def check_regression(n_rows: int = 20_000) -> None:
+    df = make_data(n_rows, 5, seed=1)
+    df.loc[df.sample(frac=0.01, random_state=1).index, 'gender'] = None
+    cases = [
+        (None, 'multiply'),
+        (None, 'add'),
+        ({'0': 1.1, '1': 0.9, 'not-a-group': 3.0}, 'multiply'),
+        ({'2': 500.0}, 'add'),
+    ]
+    for factors, method in cases:
+        expected = pd.Series(legacy_adjusted(df, 'gender', 'salary', factors, method), name='salary_adjusted')
+        out = adjust_values(df, 'gender', 'salary', adjustment_factors=factors, method=method)
+        pd.testing.assert_series_equal(out['salary_adjusted'], expected, check_dtype=True)
+        pd.testing.assert_series_equal(out['salary'], df['salary'])
+
+        inplace_df = df.copy()
+        ret = adjust_values(inplace_df, 'gender', 'salary', adjustment_factors=factors, method=method, inplace=True)
+        assert ret is inplace_df
+        pd.testing.assert_series_equal(inplace_df['salary'], expected.rename('salary'))
+    print(f'check: output matches the iterrows implementation on {n_rows:,} rows')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', default='100000,1000000,10000000',
+                        help='comma-separated row counts')
+    parser.add_argument('--groups', default='2,1000',
+                        help='comma-separated sensitive-attribute cardinalities')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--skip-check', action='store_true')
+    args = parser.parse_args()
+
+    if not args.skip_check:
+        check_regression()
+
+    print(f"{'rows':>12} {'groups':>8} {'mode':>8} {'best s':>9} {'rows/s':>14}")
+    for n_groups in (int(g) for g in args.groups.split(',')):
+        for n_rows in (int(float(r)) for r in args.rows.split(',')):
+            df = make_data(n_rows, n_groups)
+            for inplace in (False, True):
+                best = float('inf')
+                for _ in range(args.repeat):
+                    work = df.copy() if inplace else df
+                    t0 = time.perf_counter()
+                    adjust_values(work, 'gender', 'salary', inplace=inplace)
+                    best = min(best, time.perf_counter() - t0)
+                mode = 'inplace' if inplace else 'copy'
+                print(f'{n_rows:>12,} {n_groups:>8,} {mode:>8} {best:>9.3f} {n_rows / best:>14,.0f}')
+            del df
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""
+asv benchmarks for the Flask endpoints, driven through app.test_client() so
+request parsing, registry lookups, caching and response encoding are all
+included. Each benchmark process gets a throwaway registry database, and the
+uploads and outputs it creates are removed in teardown.
+
+Run from the repository root:
+
+    asv run --bench bench_endpoints
+"""
+import io
+import os
+import tempfile
+import time
+
+from .datagen import SENSITIVE_COL, TARGET_COL, make_dataset
+
+
+def _client():
+    # The registry location is read at import time, so point it at a scratch
+    # database before the app module is first imported
+    os.environ.setdefault('BIAS_BUSTER_REGISTRY_DB', os.path.join(tempfile.mkdtemp(prefix='bench-'), 'registry.sqlite3'))
+    import app as appmod
+    return appmod, appmod.app.test_client()
+
+
+def _upload(client, payload: bytes) -> dict:
+    resp = client.post('/upload', data={'file': (io.BytesIO(payload), 'bench.csv')},
+                       content_type='multipart/form-data')
+    if resp.status_code != 200:
+        raise RuntimeError(f'upload failed: {resp.get_json()}')
+    return resp.get_json()
+
+
+def _wait_for_columnar(appmod, file_id: str, timeout: float = 60.0) -> None:
+    # Upload hands the Arrow conversion to a background job; benchmark the
+    # steady state that follows it
+    deadline = time.time() + timeout
+    while time.time() < deadline and not appmod.REGISTRY[file_id].get('columnar_path'):
+        time.sleep(0.05)
+
+
+def _uncached(appmod) -> None:
+    # Time the report computation itself, not the report cache (user-016)
+    appmod.REPORT_CACHE.max_entries = 0
+
+
+def _cleanup(appmod) -> None:
+    # Let pending Arrow conversions finish so they do not recreate files
+    while any(appmod.INGEST.stats()[state] for state in ('queued', 'running')):
+        time.sleep(0.05)
+    for file_id in list(appmod.REGISTRY):
+        meta = appmod.REGISTRY[file_id]
+        for path in (meta.get('path'), meta.get('columnar_path')):
+            if path and os.path.exists(path):
+                os.remove(path)
+        prefix = f'{file_id}_'
+        for name in os.listdir(appmod.OUTPUT_DIR):
+            if name.startswith(prefix):
+                os.remove(os.path.join(appmod.OUTPUT_DIR, name))
+        del appmod.REGISTRY[file_id]
+
+
+class Upload:
+    params = ([10_000, 200_000], [8, 32])
+    param_names = ['rows', 'width']
+    timeout = 300
+
+    def setup(self, rows, width):
+        self.appmod, self.client = _client()
+        self.payload = make_dataset(rows, 20, skew=1.0, target='binary', width=width).to_csv(index=False).encode()
+
+    def teardown(self, rows, width):
+        _cleanup(self.appmod)
+
+    def time_upload(self, rows, width):
+        _upload(self.client, self.payload)
+
+    def peakmem_upload(self, rows, width):
+        _upload(self.client, self.payload)
+
+
+class Analyze:
+    params = ([10_000, 200_000], [False, True])
+    param_names = ['rows', 'streaming']
+    timeout = 300
+
+    def setup(self, rows, streaming):
+        self.appmod, self.client = _client()
+        payload = make_dataset(rows, 20, skew=1.0, target='binary', width=8).to_csv(index=False).encode()
+        self.file_id = _upload(self.client, payload)['file_id']
+        _wait_for_columnar(self.appmod, self.file_id)
+        self.body = {'file_id': self.file_id, 'sensitive': SENSITIVE_COL, 'target': TARGET_COL,
+                     'streaming': streaming}
+        _uncached(self.appmod)
+
+    def teardown(self, rows, streaming):
+        _cleanup(self.appmod)
+
+    def time_analyze(self, rows, streaming):
+        self.client.post('/analyze', json=self.body)
+
+    def peakmem_analyze(self, rows, streaming):
+        self.client.post('/analyze', json=self.body)
+
+
+class AnalyzeBatch:
+    """A four-attribute audit as one /analyze/batch call and as four /analyze calls."""
+    params = ([10_000, 200_000],)
+    param_names = ['rows']
+    timeout = 300
+
+    def setup(self, rows):
+        self.appmod, self.client = _client()
+        payload = make_dataset(rows, 20, skew=1.0, target='binary', width=8).to_csv(index=False).encode()
+        self.file_id = _upload(self.client, payload)['file_id']
+        _wait_for_columnar(self.appmod, self.file_id)
+        self.specs = [{'sensitive': col, 'target': TARGET_COL} for col in (SENSITIVE_COL, 'f1', 'f3', 'f5')]
+        _uncached(self.appmod)
+
+    def teardown(self, rows):
+        _cleanup(self.appmod)
+
+    def time_analyze_batch(self, rows):
+        self.client.post('/analyze/batch', json={'file_id': self.file_id, 'specs': self.specs})
+
+    def time_analyze_each(self, rows):
+        for spec in self.specs:
+            self.client.post('/analyze', json={'file_id': self.file_id, **spec})
+
+
+class Mitigate:
+    params = ([10_000, 200_000], ['reweigh', 'resample', 'adjust'], ['file', 'stream'])
+    param_names = ['rows', 'method', 'export']
+    timeout = 300
+
+    def setup(self, rows, method, export):
+        self.appmod, self.client = _client()
+        payload = make_dataset(rows, 20, skew=1.0, target='binary', width=8).to_csv(index=False).encode()
+        self.file_id = _upload(self.client, payload)['file_id']
+        _wait_for_columnar(self.appmod, self.file_id)
+        self.body = {'file_id': self.file_id, 'sensitive': SENSITIVE_COL, 'target': TARGET_COL,
+                     'method': method}
+        if export == 'stream':
+            self.body['export'] = 'stream'
+
+    def teardown(self, rows, method, export):
+        _cleanup(self.appmod)
+
+    def _mitigate(self):
+        # Fetch the result as a client would, so streamed exports do their work
+        link = self.client.post('/mitigate', json=self.body).get_json()['download']
+        self.client.get(link).close()
+
+    def time_mitigate(self, rows, method, export):
+        self._mitigate()
+
+    def peakmem_mitigate(self, rows, method, export):
+        self._mitigate()
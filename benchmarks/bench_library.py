@@ -0,0 +1,155 @@
+"""
+asv benchmarks for the bias package: time and peak memory of the bias
+report, the three mitigations, score-based selection and prediction
+fairness on synthetic data (see datagen).
+
+Run from the repository root:
+
+    asv run                      # benchmark HEAD
+    asv continuous main HEAD     # flag regressions between two commits
+    asv run --environment existing --quick --bench bench_library   # quick local check
+"""
+import numpy as np
+
+from bias.metrics import compute_bias_report, compute_bias_reports, compute_fairness_report
+from bias.mitigate import adjust_values, resample_dataset, reweigh_dataset
+from bias.selection import quota_selection
+
+from .datagen import SENSITIVE_COL, TARGET_COL, make_dataset
+
+# One audit: the target against several sensitive attributes (f1, f3, ...
+# are three-valued filler columns)
+AUDIT_SPECS = [(SENSITIVE_COL, TARGET_COL), ('f1', TARGET_COL), ('f3', TARGET_COL), ('f5', TARGET_COL)]
+
+
+class BiasReport:
+    params = ([100_000, 1_000_000], [2, 1000], ['binary', 'label'])
+    param_names = ['rows', 'groups', 'target']
+    timeout = 300
+
+    def setup(self, rows, groups, target):
+        self.df = make_dataset(rows, groups, skew=1.0, target=target, width=8)
+
+    def time_compute_bias_report(self, rows, groups, target):
+        compute_bias_report(self.df, SENSITIVE_COL, TARGET_COL)
+
+    def peakmem_compute_bias_report(self, rows, groups, target):
+        compute_bias_report(self.df, SENSITIVE_COL, TARGET_COL)
+
+    def time_compute_bias_reports(self, rows, groups, target):
+        compute_bias_reports(self.df, AUDIT_SPECS)
+
+    def time_compute_bias_report_preview(self, rows, groups, target):
+        compute_bias_report(self.df, SENSITIVE_COL, TARGET_COL, preview=20_000, seed=0)
+
+
+class Reweigh:
+    params = ([100_000, 1_000_000], [2, 1000], ['binary', 'label'])
+    param_names = ['rows', 'groups', 'target']
+    timeout = 300
+
+    def setup(self, rows, groups, target):
+        self.df = make_dataset(rows, groups, skew=1.0, target=target, width=8)
+
+    def time_reweigh_dataset(self, rows, groups, target):
+        reweigh_dataset(self.df, SENSITIVE_COL, TARGET_COL)
+
+    def peakmem_reweigh_dataset(self, rows, groups, target):
+        reweigh_dataset(self.df, SENSITIVE_COL, TARGET_COL)
+
+
+class ReweighOutput:
+    """Cost of each reweigh_dataset output mode: full copy, shared columns, weights only."""
+    params = ([1_000_000], ['frame', 'append', 'weights'])
+    param_names = ['rows', 'output']
+    timeout = 300
+
+    def setup(self, rows, output):
+        self.df = make_dataset(rows, 50, skew=1.0, target='binary', width=8)
+
+    def time_reweigh_dataset(self, rows, output):
+        reweigh_dataset(self.df, SENSITIVE_COL, TARGET_COL, output=output)
+
+    def peakmem_reweigh_dataset(self, rows, output):
+        reweigh_dataset(self.df, SENSITIVE_COL, TARGET_COL, output=output)
+
+
+class Resample:
+    params = ([100_000, 1_000_000], [2, 1000], ['frame', 'index', 'counts'])
+    param_names = ['rows', 'groups', 'output']
+    timeout = 300
+
+    def setup(self, rows, groups, output):
+        self.df = make_dataset(rows, groups, skew=1.0, target='binary', width=8)
+
+    def time_resample_dataset(self, rows, groups, output):
+        resample_dataset(self.df, SENSITIVE_COL, TARGET_COL, output=output)
+
+    def peakmem_resample_dataset(self, rows, groups, output):
+        resample_dataset(self.df, SENSITIVE_COL, TARGET_COL, output=output)
+
+
+class Adjust:
+    params = ([100_000, 1_000_000], [2, 1000], ['binary', 'continuous'])
+    param_names = ['rows', 'groups', 'target']
+    timeout = 300
+
+    def setup(self, rows, groups, target):
+        self.df = make_dataset(rows, groups, skew=1.0, target=target, width=8)
+
+    def time_adjust_values(self, rows, groups, target):
+        adjust_values(self.df, SENSITIVE_COL, TARGET_COL, method='multiply')
+
+    def peakmem_adjust_values(self, rows, groups, target):
+        adjust_values(self.df, SENSITIVE_COL, TARGET_COL, method='multiply')
+
+
+class Selection:
+    """adjust_values(modify_original=True): proportional top-k per group."""
+    params = ([100_000, 1_000_000], [2, 1000])
+    param_names = ['rows', 'groups']
+    timeout = 300
+
+    def setup(self, rows, groups):
+        self.df = make_dataset(rows, groups, skew=1.0, target='binary', width=8)
+
+    def time_quota_selection(self, rows, groups):
+        quota_selection(self.df, SENSITIVE_COL, TARGET_COL)
+
+    def peakmem_quota_selection(self, rows, groups):
+        quota_selection(self.df, SENSITIVE_COL, TARGET_COL)
+
+
+class Fairness:
+    """compute_fairness_report on a score and on a predicted label."""
+    params = ([1_000_000, 10_000_000], ['score', 'label'])
+    param_names = ['rows', 'prediction']
+    timeout = 300
+
+    def setup(self, rows, prediction):
+        self.df = make_dataset(rows, 50, skew=1.0, target='binary')
+        rng = np.random.default_rng(0)
+        score = np.clip(0.3 * self.df[TARGET_COL].to_numpy() + 0.7 * rng.random(rows), 0.0, 1.0)
+        self.df['prediction'] = score if prediction == 'score' else (score >= 0.5).astype(int)
+
+    def time_compute_fairness_report(self, rows, prediction):
+        compute_fairness_report(self.df, SENSITIVE_COL, TARGET_COL, 'prediction')
+
+    def peakmem_compute_fairness_report(self, rows, prediction):
+        compute_fairness_report(self.df, SENSITIVE_COL, TARGET_COL, 'prediction')
+
+
+class Skew:
+    """Report and reweighing cost as group sizes go from equal to heavy-tailed."""
+    params = ([0.0, 1.0, 2.0],)
+    param_names = ['skew']
+    timeout = 300
+
+    def setup(self, skew):
+        self.df = make_dataset(1_000_000, 5000, skew=skew, target='binary')
+
+    def time_compute_bias_report(self, skew):
+        compute_bias_report(self.df, SENSITIVE_COL, TARGET_COL)
+
+    def time_reweigh_dataset(self, skew):
+        reweigh_dataset(self.df, SENSITIVE_COL, TARGET_COL)
@@ -0,0 +1,81 @@
+"""
+Core-scaling benchmark for bias.parallel.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_parallel
+    python -m benchmarks.bench_parallel --rows 50000000 --workers 1,2,4,8,16
+
+For each worker count it times the bias report, reweighing and (optionally)
+the CSV export on the same synthetic dataset and prints the speedup over a
+single worker.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from bias.parallel import (
+    compute_bias_report_parallel,
+    reweigh_dataset_parallel,
+    shutdown_pool,
+    to_csv_parallel,
+)
+
+
+def make_data(n_rows: int, n_groups: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    group = rng.integers(0, n_groups, size=n_rows)
+    rate = rng.uniform(0.1, 0.9, size=n_groups)
+    hired = (rng.random(n_rows) < rate[group]).astype(np.int8)
+    return pd.DataFrame({'group': group, 'hired': hired, 'score': rng.random(n_rows)})
+
+
+def _best(fn, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=lambda v: int(float(v)), default=50_000_000)
+    parser.add_argument('--groups', type=int, default=100)
+    parser.add_argument('--workers', default=','.join(str(w) for w in (1, 2, 4, 8, 16) if w <= (os.cpu_count() or 1)),
+                        help='comma-separated worker counts')
+    parser.add_argument('--partition-rows', type=lambda v: int(float(v)), default=2_000_000)
+    parser.add_argument('--repeat', type=int, default=2)
+    parser.add_argument('--csv', action='store_true', help='also time the partitioned CSV export')
+    args = parser.parse_args()
+
+    df = make_data(args.rows, args.groups)
+    print(f'{args.rows:,} rows, {args.groups} groups, partitions of {args.partition_rows:,} rows')
+    stages = {
+        'report': lambda w: compute_bias_report_parallel(df, 'group', 'hired', workers=w,
+                                                         partition_rows=args.partition_rows),
+        'reweigh': lambda w: reweigh_dataset_parallel(df, 'group', 'hired', workers=w,
+                                                      partition_rows=args.partition_rows),
+    }
+    if args.csv:
+        out = os.path.join(tempfile.mkdtemp(), 'out.csv')
+        stages['to_csv'] = lambda w: to_csv_parallel(df, out, workers=w, partition_rows=args.partition_rows)
+
+    print(f"{'stage':>8} {'workers':>8} {'best s':>9} {'speedup':>8}")
+    for name, fn in stages.items():
+        base = None
+        for workers in (int(w) for w in args.workers.split(',')):
+            fn(workers)  # warm the pool
+            t = _best(lambda: fn(workers), args.repeat)
+            base = base or t
+            print(f'{name:>8} {workers:>8} {t:>9.3f} {base / t:>7.2f}x')
+    shutdown_pool()
+
+
+if __name__ == '__main__':
+    main()
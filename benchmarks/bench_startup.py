@@ -0,0 +1,88 @@
+"""
+Cold-start cost of the Flask app: how long a fresh interpreter takes to
+import app.py, and how long the first /upload and /analyze take after it
+(which pay for the lazily imported analysis stack). Every measurement runs
+in a new process against a throwaway data directory.
+
+asv times the import in a fresh interpreter through timeraw_ benchmarks:
+
+    asv run --bench bench_startup
+
+Run as a script from the repository root for a quick report, optionally
+failing when import plus first request exceeds a budget in seconds:
+
+    python -m benchmarks.bench_startup --repeat 5 --target 2.0
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import textwrap
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a fresh interpreter and prints the timings of each step as JSON
+_MEASURE = textwrap.dedent('''
+    import io, json, os, tempfile, time
+    data_dir = tempfile.mkdtemp(prefix='cold-')
+    os.environ['BIAS_BUSTER_DATA_DIR'] = data_dir
+    os.environ['BIAS_BUSTER_REGISTRY_DB'] = os.path.join(data_dir, 'registry.sqlite3')
+    started = time.perf_counter()
+    import app
+    imported = time.perf_counter()
+    client = app.app.test_client()
+    rows = ['g,y'] + ['%s,%d' % ('ab'[i % 2], i % 3 == 0) for i in range(1000)]
+    resp = client.post('/upload', data={'file': (io.BytesIO('\\n'.join(rows).encode()), 'cold.csv')},
+                       content_type='multipart/form-data')
+    uploaded = time.perf_counter()
+    client.post('/analyze', json={'file_id': resp.get_json()['file_id'], 'sensitive': 'g', 'target': 'y'})
+    analyzed = time.perf_counter()
+    print(json.dumps({'import': imported - started, 'first_upload': uploaded - imported,
+                      'first_analyze': analyzed - uploaded}))
+''')
+
+
+def timeraw_import_app():
+    return textwrap.dedent('''
+        import os, tempfile
+        os.environ['BIAS_BUSTER_REGISTRY_DB'] = os.path.join(tempfile.mkdtemp(prefix='cold-'), 'registry.sqlite3')
+        import app
+    ''')
+
+
+def timeraw_import_analysis_stack():
+    # What the first request pays on top of the app import
+    return 'import bias.metrics, bias.mitigate, bias.parallel, service.columnar, service.export, service.ingest'
+
+
+def measure_once() -> dict:
+    """Seconds for import, first upload and first analyze in a new interpreter."""
+    env = {k: v for k, v in os.environ.items() if not k.startswith('BIAS_BUSTER_')}
+    out = subprocess.run([sys.executable, '-c', _MEASURE], cwd=REPO_ROOT, env=env, check=True,
+                         capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--repeat', type=int, default=5, help='fresh processes to measure (median is reported)')
+    parser.add_argument('--target', type=float, default=None,
+                        help='fail when median import + first request exceeds this many seconds')
+    args = parser.parse_args(argv)
+
+    runs = [measure_once() for _ in range(max(args.repeat, 1))]
+    medians = {step: statistics.median(run[step] for run in runs) for step in runs[0]}
+    cold = medians['import'] + medians['first_upload'] + medians['first_analyze']
+    for step, seconds in medians.items():
+        print(f'{step:>14}: {seconds * 1000:8.1f} ms')
+    print(f'{"cold total":>14}: {cold * 1000:8.1f} ms  (median of {len(runs)} processes)')
+    if args.target is not None and cold > args.target:
+        print(f'cold start {cold:.3f}s exceeds the {args.target:.3f}s target', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
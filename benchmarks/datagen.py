@@ -0,0 +1,81 @@
+"""
+Synthetic hiring-style datasets for the benchmark suite.
+
+    make_dataset(rows=1_000_000, groups=50, skew=1.0, target='binary', width=8)
+
+returns a DataFrame with a sensitive column ``group``, a ``target`` column,
+the ``Technical_Score``/``Interview_Score`` columns used by adjust_values,
+and ``width`` filler columns (alternating float and string) so that copies
+and CSV round-trips cost what a wide real upload would.
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+TARGET_TYPES = ('binary', 'label', 'multiclass', 'continuous')
+SENSITIVE_COL = 'group'
+TARGET_COL = 'target'
+
+
+def group_probabilities(groups: int, skew: float) -> np.ndarray:
+    """Group shares proportional to rank ** -skew (0 = equal sizes, 1 = Zipf)."""
+    p = np.arange(1, groups + 1, dtype=float) ** -float(skew)
+    return p / p.sum()
+
+
+def make_dataset(
+    rows: int,
+    groups: int = 2,
+    skew: float = 0.0,
+    target: Optional[str] = 'binary',
+    width: int = 0,
+    null_frac: float = 0.0,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    Build a synthetic dataset.
+
+    Args:
+        rows: Number of rows
+        groups: Cardinality of the sensitive column (labels 'g0', 'g1', ...)
+        skew: Power-law exponent of the group sizes, see group_probabilities
+        target: 'binary' (0/1 ints), 'label' ('yes'/'no' strings), 'multiclass'
+                (ints 0-4), 'continuous' (float scores) or None for no target
+        width: Number of extra filler columns
+        null_frac: Fraction of sensitive values replaced by nulls
+        seed: Seed for numpy's default_rng
+
+    Returns:
+        DataFrame with a per-group positive rate, so the bias metrics are non-trivial
+    """
+    if target is not None and target not in TARGET_TYPES:
+        raise ValueError(f'target must be one of {TARGET_TYPES} or None')
+    rng = np.random.default_rng(seed)
+    codes = rng.choice(groups, size=rows, p=group_probabilities(groups, skew))
+    labels = np.array([f'g{i}' for i in range(groups)], dtype=object)
+    sensitive = labels[codes]
+    if null_frac:
+        sensitive[rng.random(rows) < null_frac] = None
+
+    technical = rng.integers(40, 100, size=rows)
+    interview = rng.integers(40, 100, size=rows)
+    data = {SENSITIVE_COL: sensitive, 'Technical_Score': technical, 'Interview_Score': interview}
+
+    rate = rng.uniform(0.1, 0.9, size=groups)[codes]
+    if target == 'binary':
+        data[TARGET_COL] = (rng.random(rows) < rate).astype(np.int64)
+    elif target == 'label':
+        data[TARGET_COL] = np.where(rng.random(rows) < rate, 'yes', 'no').astype(object)
+    elif target == 'multiclass':
+        data[TARGET_COL] = np.minimum((rng.random(rows) * rate * 10).astype(np.int64), 4)
+    elif target == 'continuous':
+        data[TARGET_COL] = np.round(rate * 100 + rng.normal(0, 10, size=rows), 3)
+
+    for i in range(width):
+        if i % 2:
+            data[f'f{i}'] = np.array(['x', 'y', 'z'], dtype=object)[rng.integers(0, 3, size=rows)]
+        else:
+            data[f'f{i}'] = rng.random(rows)
+    return pd.DataFrame(data)
@@ -0,0 +1,54 @@
+from typing import Any, Dict, Tuple
+import pandas as pd
+import numpy as np
+
+
+def encode(values: pd.Series, sort: bool = False) -> Tuple[np.ndarray, Any]:
+    """
+    Factorize a column into int64 codes (-1 for null) and the values they
+    index. With ``sort`` the values are in the order groupby would list its
+    keys; unorderable mixed-type columns keep first-appearance order.
+    """
+    try:
+        codes, uniques = pd.factorize(values, sort=sort)
+    except TypeError:
+        codes, uniques = pd.factorize(values)
+    return codes.astype(np.int64, copy=False), uniques
+
+
+class GroupIndex:
+    """
+    A sensitive column factorized once, so that every per-group statistic is
+    an ``np.bincount`` over the same integer codes instead of a groupby.
+
+    ``groups`` holds the group values (sorted, as groupby keys, by default),
+    ``codes`` each row's position in ``groups`` or -1 for a null value, and
+    ``sizes`` the number of rows per group. Cost is O(rows + groups)
+    whatever the cardinality.
+    """
+
+    def __init__(self, values: pd.Series, sort: bool = True):
+        self.codes, self.groups = encode(values, sort=sort)
+        self.valid = self.codes >= 0
+        self.sizes = np.bincount(self.codes[self.valid], minlength=len(self.groups))
+
+    def __len__(self) -> int:
+        return len(self.groups)
+
+    def count(self, mask: np.ndarray) -> np.ndarray:
+        """Rows per group where ``mask`` is true."""
+        sel = self.valid & np.asarray(mask, dtype=bool)
+        return np.bincount(self.codes[sel], minlength=len(self.groups))
+
+    def take(self, table: np.ndarray, fill: float = 1.0) -> np.ndarray:
+        """Gather a per-group ``table`` to rows; null groups get ``fill``."""
+        table = np.asarray(table)
+        if not self.valid.all():
+            # Code -1 gathers the trailing fill value
+            table = np.append(table, fill)
+        return table[self.codes]
+
+    def lookup(self, mapping: Dict[Any, float], default: float = 1.0) -> np.ndarray:
+        """Per-group table from a {group value: number} mapping."""
+        return np.asarray([mapping.get(g, default) for g in self.groups], dtype=float)
+
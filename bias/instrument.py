@@ -0,0 +1,37 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Callable, Iterator, Optional
+
+
+# Receives (stage name, elapsed seconds); unset means timing is off
+_RECORDER: ContextVar[Optional[Callable[[str, float], None]]] = ContextVar('bias_stage_recorder', default=None)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Time a hot-path stage and report it to the active recorder, if any.
+
+    Costs a single context-variable lookup when nothing is recording, so the
+    library functions can stay instrumented outside the web app.
+    """
+    recorder = _RECORDER.get()
+    if recorder is None:
+        yield
+        return
+    t0 = perf_counter()
+    try:
+        yield
+    finally:
+        recorder(name, perf_counter() - t0)
+
+
+@contextmanager
+def recording(recorder: Callable[[str, float], None]) -> Iterator[None]:
+    """Send the stages timed in this context (thread or task) to ``recorder``."""
+    token = _RECORDER.set(recorder)
+    try:
+        yield
+    finally:
+        _RECORDER.reset(token)
@@ -1,7 +1,10 @@
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
 import pandas as pd
 import numpy as np
 
+from .groupstats import GroupIndex
+from .instrument import stage
+
 
 def _infer_positive_label(series: pd.Series) -> Any:
     # Try infer for binary targets
@@ -27,56 +30,202 @@ def compute_bias_report(
     sensitive_col: str,
     target_col: Optional[str] = None,
     positive_label: Optional[Any] = None,
+    bootstrap: int = 0,
+    ci_level: float = 0.95,
+    seed: Optional[int] = None,
+    preview: int = 0,
 ) -> Dict[str, Any]:
-    report: Dict[str, Any] = {
-        'sensitive': sensitive_col,
-        'target': target_col,
-        'groups': {},
-        'summary': {},
-        'warnings': [],
-    }
+    """
+    Per-group shares and positive rates plus parity summary metrics.
 
-    if sensitive_col not in df.columns:
-        return {'error': f'sensitive column {sensitive_col} missing'}
+    With ``bootstrap`` > 0 and a target, percentile confidence intervals at
+    ``ci_level`` for the demographic parity difference and disparate impact
+    are added under ``confidence_intervals`` (see ``bootstrap_intervals``).
 
-    # Clean columns
-    dfx = df.copy()
-    # Cast sensitive to string-ish for grouping display
-    sens = dfx[sensitive_col]
-    total_n = int(len(dfx))
+    With ``preview`` > 0 the report is instead estimated from a uniform
+    random sample of that many rows, drawn with ``seed``, and carries error
+    bounds at ``ci_level`` (see ``bias.sampling.preview_bias_report``).
+    """
+    if preview:
+        from .sampling import preview_bias_report
 
-    # Setup target if provided
-    has_target = target_col is not None and target_col in dfx.columns
-    if has_target:
-        y = dfx[target_col]
-        pos = positive_label if positive_label is not None else _infer_positive_label(y)
-        report['inferred_positive_label'] = pos
-        # Boolean mask for positive outcome
-        pos_mask = (y == pos)
-        if pos is None:
-            has_target = False
-            report['warnings'].append('Could not infer positive_label; treating as no-target analysis.')
-    else:
-        pos = None
-        pos_mask = pd.Series(False, index=dfx.index)
-
-    # Per-group stats
-    group_stats = []
-    for g, idx in sens.groupby(sens).groups.items():
-        g_n = int(len(idx))
-        g_share = g_n / total_n if total_n else 0.0
-        entry = {
-            'n': g_n,
-            'share': round(float(g_share), 6),
+        n = len(df)
+        sample = df
+        if n > preview:
+            with stage('sample'):
+                rows = np.random.default_rng(seed).choice(n, size=int(preview), replace=False)
+                sample = df.iloc[np.sort(rows)]
+        return preview_bias_report(sample, sensitive_col, target_col, positive_label, n, ci_level, seed)
+    return compute_bias_reports(df, [(sensitive_col, target_col, positive_label)], bootstrap, ci_level, seed)[0]
+
+
+def _spec_fields(spec: Union[Mapping[str, Any], Sequence[Any]]) -> Tuple[str, Optional[str], Any]:
+    # (sensitive, target, positive_label) from a dict or a 1-3 item tuple
+    if isinstance(spec, Mapping):
+        return spec['sensitive'], spec.get('target'), spec.get('positive_label')
+    sensitive_col, target_col, positive_label = (list(spec) + [None, None])[:3]
+    return sensitive_col, target_col, positive_label
+
+
+def _outcome(df: pd.DataFrame, target_col: Optional[str], positive_label: Any) -> Dict[str, Any]:
+    # Positive-outcome mask of one (target, positive_label) pair
+    if target_col is None or target_col not in df.columns:
+        return {'has_target': False}
+    y = df[target_col]
+    pos = positive_label if positive_label is not None else _infer_positive_label(y)
+    positive = np.asarray((y == pos).fillna(False), dtype=bool)
+    return {'has_target': pos is not None, 'pos': pos, 'positive': positive,
+            'n_positive': int(np.count_nonzero(positive))}
+
+
+def compute_bias_reports(
+    df: pd.DataFrame,
+    specs: List[Union[Mapping[str, Any], Sequence[Any]]],
+    bootstrap: int = 0,
+    ci_level: float = 0.95,
+    seed: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    compute_bias_report for many configurations of one frame, in order.
+
+    ``specs`` holds dicts with a 'sensitive' and optional 'target' and
+    'positive_label' key, or (sensitive, target, positive_label) tuples.
+    Every sensitive column is factorized once and every (target,
+    positive_label) outcome mask is built once, however many specs share
+    them; each report is then a bincount over the shared codes. Reports
+    equal those of separate compute_bias_report calls.
+    """
+    indexes: Dict[str, GroupIndex] = {}
+    outcomes: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+    total_n = int(len(df))
+    reports = []
+    for spec in specs:
+        sensitive_col, target_col, positive_label = _spec_fields(spec)
+        if sensitive_col not in df.columns:
+            reports.append({'error': f'sensitive column {sensitive_col} missing'})
+            continue
+        report: Dict[str, Any] = {
+            'sensitive': sensitive_col,
+            'target': target_col,
+            'groups': {},
+            'summary': {},
+            'warnings': [],
         }
-        if has_target:
-            g_pos_rate = float(pos_mask.loc[idx].mean()) if g_n else 0.0
-            entry['positive_rate'] = round(g_pos_rate, 6)
-        group_stats.append((g, entry))
 
-    # Summary metrics
+        # Per-group stats: sizes and positive counts are bincounts over the
+        # sensitive column's codes, in groupby key order
+        group_stats = []
+        group_pos = []
+        with stage('group_stats'):
+            index = indexes.get(sensitive_col)
+            if index is None:
+                index = indexes[sensitive_col] = GroupIndex(df[sensitive_col])
+            # Type-qualified so that labels such as 1 and True stay distinct
+            outcome_key = (target_col, type(positive_label).__name__, str(positive_label))
+            outcome = outcomes.get(outcome_key)
+            if outcome is None:
+                outcome = outcomes[outcome_key] = _outcome(df, target_col, positive_label)
+            has_target = outcome['has_target']
+            if 'pos' in outcome:
+                report['inferred_positive_label'] = outcome['pos']
+                if not has_target:
+                    report['warnings'].append('Could not infer positive_label; treating as no-target analysis.')
+            if has_target:
+                pos_counts = index.count(outcome['positive'])
+            for i in np.flatnonzero(index.sizes):
+                g_n = int(index.sizes[i])
+                g_share = g_n / total_n if total_n else 0.0
+                entry = {
+                    'n': g_n,
+                    'share': round(float(g_share), 6),
+                }
+                if has_target:
+                    g_pos = int(pos_counts[i])
+                    entry['positive_rate'] = round(float(g_pos / g_n), 6)
+                    group_pos.append(g_pos)
+                group_stats.append((index.groups[i], entry))
+
+            overall_pos_rate = float(outcome['n_positive'] / total_n) if has_target and total_n else 0.0
+        report = _finalize_report(report, group_stats, has_target, overall_pos_rate)
+        if bootstrap and has_target:
+            group_n = [e['n'] for _, e in group_stats]
+            with stage('bootstrap'):
+                report['confidence_intervals'] = bootstrap_intervals(group_n, group_pos, total_n, bootstrap, ci_level, seed)
+        reports.append(report)
+    return reports
+
+
+# Upper bound on replicates x groups held in memory at once while bootstrapping
+_BOOTSTRAP_BLOCK_CELLS = 1 << 22
+
+
+def bootstrap_intervals(
+    group_n: List[int],
+    group_pos: List[int],
+    total_n: int,
+    replicates: int = 10000,
+    ci_level: float = 0.95,
+    seed: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Percentile bootstrap intervals for the parity summary metrics.
+
+    Resamples the sufficient statistics rather than the rows: each replicate
+    draws group sizes from a multinomial over the groups (plus the rows with
+    a null group) and positives per group from a binomial at the observed
+    rate. This is the row bootstrap's sampling distribution, so the cost is
+    O(replicates x groups) regardless of the dataset size.
+    """
+    result = {'level': ci_level, 'replicates': int(replicates), 'seed': seed,
+              'demographic_parity_diff': None, 'disparate_impact': None}
+    n = np.asarray(group_n, dtype=np.int64)
+    if not len(n) or int(total_n) <= 0:
+        # No groups (e.g. every sensitive value null): nothing to resample
+        return result
+
+    rng = np.random.default_rng(seed)
+    rates = np.asarray(group_pos, dtype=float) / np.maximum(n, 1)
+    n_null = max(int(total_n) - int(n.sum()), 0)
+    pvals = np.append(n, n_null) / float(total_n)
+
+    block = max(1, min(int(replicates), _BOOTSTRAP_BLOCK_CELLS // max(len(n) + 1, 1)))
+    dp = np.empty(int(replicates))
+    di = np.empty(int(replicates))
+    for start in range(0, int(replicates), block):
+        size = min(block, int(replicates) - start)
+        sizes = rng.multinomial(int(total_n), pvals, size=size)[:, :-1]
+        pos = rng.binomial(sizes, rates)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Groups that drew no rows have no rate in that replicate
+            boot_rates = np.where(sizes > 0, pos / sizes, np.nan)
+            max_rate = np.nanmax(boot_rates, axis=1)
+            min_rate = np.nanmin(boot_rates, axis=1)
+            dp[start:start + size] = max_rate - min_rate
+            di[start:start + size] = np.where(max_rate > 0, min_rate / max_rate, np.nan)
+
+    tail = (1.0 - ci_level) / 2.0 * 100.0
+
+    def _interval(samples: np.ndarray):
+        samples = samples[np.isfinite(samples)]
+        if not len(samples):
+            return None
+        lo, hi = np.percentile(samples, [tail, 100.0 - tail])
+        return [round(float(lo), 6), round(float(hi), 6)]
+
+    result['demographic_parity_diff'] = _interval(dp)
+    result['disparate_impact'] = _interval(di)
+    return result
+
+
+def _finalize_report(
+    report: Dict[str, Any],
+    group_stats: List[Tuple[Any, Dict[str, Any]]],
+    has_target: bool,
+    overall_pos_rate: float,
+) -> Dict[str, Any]:
+    # Summary metrics from the per-group entries; shared by the in-memory
+    # and streaming report builders so both emit the same JSON.
     if has_target:
-        overall_pos_rate = float(pos_mask.mean()) if total_n else 0.0
         rates = [e[1]['positive_rate'] for e in group_stats]
         if rates:
             max_rate = max(rates)
@@ -106,3 +255,288 @@ def compute_bias_report(
         }
 
     return report
+
+
+def _curve(values: np.ndarray) -> List[Optional[float]]:
+    # JSON-ready series: rounded like the reports, NaN as None
+    return [round(v, 6) if v == v else None for v in values.tolist()]
+
+
+def threshold_sweep(
+    df: pd.DataFrame,
+    sensitive_col: str,
+    score_col: str,
+    thresholds: Optional[Sequence[float]] = None,
+    max_points: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Fairness curves of a continuous score binarized at every threshold.
+
+    A row is positive at threshold t when its score is >= t; rows with a
+    null score are never positive, as a null target is in
+    compute_bias_report. Thresholds are the score's distinct values, thinned
+    to ``max_points`` evenly spaced ones when given, or the ``thresholds``
+    grid. Each row is binned once by the largest threshold it reaches
+    (a binary search), the bins are counted per group with one bincount and
+    a reverse cumulative sum turns them into positive counts at every
+    threshold: O(n log T + groups x T) in total, instead of one report per
+    threshold.
+    """
+    for col in (sensitive_col, score_col):
+        if col not in df.columns:
+            return {'error': f'column {col} missing'}
+    score = df[score_col]
+    if pd.api.types.is_bool_dtype(score):
+        score = score.astype(float)
+    if not pd.api.types.is_numeric_dtype(score):
+        return {'error': f'score column {score_col} must be numeric'}
+    values = score.to_numpy(dtype=float, na_value=np.nan)
+    finite = np.isfinite(values)
+
+    with stage('sweep'):
+        if thresholds is None:
+            grid = np.unique(values[finite])
+            if max_points is not None and len(grid) > max_points:
+                grid = grid[np.unique(np.linspace(0, len(grid) - 1, max(int(max_points), 2)).round().astype(np.int64))]
+        else:
+            grid = np.unique(np.asarray(thresholds, dtype=float))
+            grid = grid[np.isfinite(grid)]
+
+        index = GroupIndex(df[sensitive_col])
+        present = np.flatnonzero(index.sizes)
+        n_t = len(grid)
+        # Bin of the largest threshold each row reaches (-1: below them all)
+        bins = np.full(len(values), -1, dtype=np.int64)
+        bins[finite] = np.searchsorted(grid, values[finite], side='right') - 1
+        counted = index.valid & (bins >= 0)
+        cells = np.bincount(index.codes[counted] * n_t + bins[counted], minlength=len(index) * n_t)
+        # Positives at threshold j: rows whose bin is j or higher
+        positives = np.cumsum(cells.reshape(len(index), n_t)[:, ::-1], axis=1)[:, ::-1][present]
+        sizes = index.sizes[present]
+        # Summaries come from the rounded group rates, as in the reports, so
+        # each point equals compute_bias_report on the binarized score
+        rate_lists = [[round(v, 6) for v in row] for row in (positives / sizes[:, None]).tolist()]
+        rates = np.array(rate_lists, dtype=float).reshape(len(present), n_t)
+
+        total_n = len(df)
+        all_positive = np.cumsum(np.bincount(bins[bins >= 0], minlength=n_t)[::-1])[::-1]
+        overall = all_positive / total_n if total_n else np.zeros(n_t)
+        if len(present):
+            max_rate = rates.max(axis=0)
+            min_rate = rates.min(axis=0)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                disparate_impact = np.where(max_rate > 0, min_rate / max_rate, np.nan)
+            parity_diff = max_rate - min_rate
+        else:
+            disparate_impact = parity_diff = np.full(n_t, np.nan)
+
+    warnings = []
+    if not n_t:
+        warnings.append(f'No finite values in {score_col} to threshold.')
+    return {
+        'sensitive': sensitive_col,
+        'score': score_col,
+        'direction': '>=',
+        'thresholds': [float(t) for t in grid],
+        'overall_positive_rate': _curve(overall),
+        'demographic_parity_diff': _curve(parity_diff),
+        'disparate_impact': _curve(disparate_impact),
+        'groups': {str(index.groups[i]): {'n': int(n), 'positive_rate': r}
+                   for i, n, r in zip(present, sizes, rate_lists)},
+        'warnings': warnings,
+    }
+
+
+# Cell order of a confusion matrix row: 2 * actual + predicted
+CONFUSION_CELLS = ('tn', 'fp', 'fn', 'tp')
+
+
+def confusion_matrices(index: GroupIndex, actual: np.ndarray, predicted: np.ndarray,
+                       counted: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Per-group confusion matrices as a (groups, 4) array of tn, fp, fn, tp
+    counts: one bincount over the combined code 4 * group + 2 * actual +
+    predicted. Rows with a null group, or false in ``counted``, go to a
+    spare trailing cell instead of being filtered out, which would copy
+    every input.
+    """
+    size = 4 * len(index)
+    cells = index.codes * 4
+    cells += np.asarray(actual, dtype=bool).view(np.int8) * np.int8(2)
+    cells += np.asarray(predicted, dtype=bool).view(np.int8)
+    cells[~(index.valid if counted is None else index.valid & counted)] = size
+    return np.bincount(cells, minlength=size + 1)[:size].reshape(len(index), 4)
+
+
+def _ratio(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(den > 0, num / np.maximum(den, 1), np.nan)
+
+
+def _gap(values: np.ndarray) -> Optional[float]:
+    # Largest minus smallest defined value; None when fewer than one is defined
+    values = values[np.isfinite(values)]
+    return round(float(values.max() - values.min()), 6) if len(values) else None
+
+
+def _rounded(value: float) -> Optional[float]:
+    return round(float(value), 6) if value == value else None
+
+
+def compute_fairness_report(
+    df: pd.DataFrame,
+    sensitive_col: str,
+    target_col: str,
+    prediction_col: str,
+    positive_label: Optional[Any] = None,
+    threshold: float = 0.5,
+    calibration_bins: int = 10,
+    prediction_positive_label: Optional[Any] = None,
+) -> Dict[str, Any]:
+    """
+    Prediction-based fairness metrics of a model output column.
+
+    The prediction is a score when it is a float column, predicted positive
+    when >= ``threshold``, and otherwise a label compared with
+    ``prediction_positive_label``. That defaults to the target's positive
+    label (given, or inferred as in compute_bias_report), unless no
+    prediction is ever a target value (e.g. 0/1 predictions of a yes/no
+    target): then it is inferred from the binary prediction column, with a
+    warning, and is an error if that is not possible.
+    Rows with a null group, target or prediction are left out. Every group's
+    confusion matrix comes from one bincount (see confusion_matrices), and
+    for scores in [0, 1] the calibration table from three more over the
+    same codes (rows, score sum and positives per group and equal-width
+    bin), so each group gets its TPR, FPR, PPV, NPV, selection rate,
+    accuracy and calibration error without another pass over the rows.
+
+    The summary holds the equal opportunity difference (TPR gap), the
+    equalized odds difference (the larger of the TPR and FPR gaps), the
+    predictive parity difference (PPV gap), the accuracy gap and, for
+    scores, the largest per-group expected calibration error.
+    """
+    for col in (sensitive_col, target_col, prediction_col):
+        if col not in df.columns:
+            return {'error': f'column {col} missing'}
+    report: Dict[str, Any] = {
+        'sensitive': sensitive_col,
+        'target': target_col,
+        'prediction': prediction_col,
+        'groups': {},
+        'summary': {},
+        'warnings': [],
+    }
+    y = df[target_col]
+    pos = positive_label if positive_label is not None else _infer_positive_label(y)
+    report['inferred_positive_label'] = pos
+    if pos is None:
+        report['error'] = f'Could not infer positive_label from {target_col}'
+        return report
+
+    with stage('confusion'):
+        index = GroupIndex(df[sensitive_col])
+        actual = np.asarray((y == pos).fillna(False), dtype=bool)
+        counted = y.notna().to_numpy(dtype=bool, copy=True)
+        pred = df[prediction_col]
+        is_score = pd.api.types.is_float_dtype(pred)
+        if is_score:
+            scores = pred.to_numpy(dtype=float, na_value=np.nan)
+            counted &= ~np.isnan(scores)
+            predicted = scores >= threshold
+            report['threshold'] = threshold
+        else:
+            pred_pos = prediction_positive_label
+            if pred_pos is None:
+                pred_pos = pos
+                values = pd.unique(pred.dropna())
+                if len(values) and not pd.Series(values).isin(pd.unique(y.dropna())).any():
+                    # Labelled differently from the target: comparing with the
+                    # target's label would make every prediction negative
+                    pred_pos = _infer_positive_label(pred) if len(values) == 2 else None
+                    if pred_pos is None:
+                        report['error'] = (f'{prediction_col} never takes a {target_col} value; '
+                                           f'pass prediction_positive_label')
+                        return report
+                    report['warnings'].append(
+                        f'{prediction_col} never takes a {target_col} value; {pred_pos!r} was taken as '
+                        f'its positive label (pass prediction_positive_label to choose).')
+            report['prediction_positive_label'] = pred_pos
+            predicted = np.asarray((pred == pred_pos).fillna(False), dtype=bool)
+            counted &= pred.notna().to_numpy(dtype=bool)
+        cm = confusion_matrices(index, actual, predicted, counted)
+
+    dropped = int(len(df) - cm.sum())
+    if dropped:
+        report['warnings'].append(f'{dropped} rows with a null group, target or prediction were left out.')
+
+    tn, fp, fn, tp = (cm[:, i] for i in range(4))
+    n = cm.sum(axis=1)
+    rates = {
+        'tpr': _ratio(tp, tp + fn),
+        'fpr': _ratio(fp, fp + tn),
+        'ppv': _ratio(tp, tp + fp),
+        'npv': _ratio(tn, tn + fn),
+        'selection_rate': _ratio(tp + fp, n),
+        'base_rate': _ratio(tp + fn, n),
+        'accuracy': _ratio(tp + tn, n),
+    }
+
+    ece = None
+    if is_score and calibration_bins > 0:
+        ok = counted & index.valid
+        if ok.any() and (scores.min(where=ok, initial=np.inf) < 0 or scores.max(where=ok, initial=-np.inf) > 1):
+            report['warnings'].append(f'{prediction_col} has scores outside [0, 1]; calibration skipped.')
+        else:
+            with stage('calibration'):
+                # Rows, score sums and positives per (group, equal-width
+                # bin); left-out rows share a spare trailing cell
+                b = int(calibration_bins)
+                size = len(index) * b
+                with np.errstate(invalid='ignore'):
+                    cells = np.minimum((scores * b).astype(np.int64), b - 1)
+                cells += index.codes * b
+                cells[~ok] = size
+                bin_n = np.bincount(cells, minlength=size + 1)[:size].reshape(len(index), b)
+                bin_score = np.bincount(cells, weights=scores, minlength=size + 1)[:size].reshape(len(index), b)
+                bin_pos = np.bincount(cells, weights=actual, minlength=size + 1)[:size].reshape(len(index), b)
+                mean_score = _ratio(bin_score, bin_n)
+                observed = _ratio(bin_pos, bin_n)
+                gap = np.where(bin_n > 0, np.abs(mean_score - observed), 0.0)
+                ece = _ratio((bin_n * gap).sum(axis=1), n)
+
+    present = np.flatnonzero(n)
+    for i in present:
+        entry: Dict[str, Any] = {'n': int(n[i])}
+        entry.update({cell: int(cm[i, j]) for j, cell in enumerate(CONFUSION_CELLS)})
+        entry.update({name: _rounded(values[i]) for name, values in rates.items()})
+        if ece is not None:
+            entry['calibration'] = {
+                'ece': _rounded(ece[i]),
+                'bins': [
+                    {'lower': round(k / b, 6), 'upper': round((k + 1) / b, 6), 'n': int(bin_n[i, k]),
+                     'mean_score': _rounded(mean_score[i, k]), 'positive_rate': _rounded(observed[i, k])}
+                    for k in np.flatnonzero(bin_n[i]).tolist()
+                ],
+            }
+        report['groups'][str(index.groups[i])] = entry
+
+    totals = cm.sum(axis=0)
+    overall = {
+        'tpr': _ratio(totals[3], totals[3] + totals[2]),
+        'fpr': _ratio(totals[1], totals[1] + totals[0]),
+        'ppv': _ratio(totals[3], totals[3] + totals[1]),
+        'accuracy': _ratio(totals[3] + totals[0], totals.sum()),
+    }
+    tpr_gap = _gap(rates['tpr'][present])
+    fpr_gap = _gap(rates['fpr'][present])
+    report['summary'] = {
+        **{f'overall_{name}': _rounded(value) for name, value in overall.items()},
+        'equal_opportunity_diff': tpr_gap,
+        'equalized_odds_diff': max((g for g in (tpr_gap, fpr_gap) if g is not None), default=None),
+        'predictive_parity_diff': _gap(rates['ppv'][present]),
+        'accuracy_diff': _gap(rates['accuracy'][present]),
+    }
+    if ece is not None:
+        defined = ece[present][np.isfinite(ece[present])]
+        report['summary']['max_group_ece'] = _rounded(defined.max()) if len(defined) else None
+    return report
@@ -1,7 +1,11 @@
-from typing import Any, Optional, Dict, Union
+from typing import Any, Optional, Dict, Sequence, Tuple, Union
 import pandas as pd
 import numpy as np
 
+from .groupstats import GroupIndex, encode
+from .instrument import stage
+from .selection import quota_selection
+
 
 def _infer_positive_label(series: pd.Series) -> Any:
     vals = series.dropna().unique()
@@ -18,48 +22,140 @@ def _infer_positive_label(series: pd.Series) -> Any:
         return vals[0] if len(vals) else None
 
 
+# Above this many (a, y) cells the joint table is built sparsely from the
+# observed pairs instead of as a dense na x ny array.
+_DENSE_JOINT_MAX_CELLS = 1 << 22
+
+
+def _reweigh_weights(A: pd.Series, Y: pd.Series) -> np.ndarray:
+    """
+    Vectorized reweighing weights w(a,y) = P(A=a) P(Y=y) / P(A=a, Y=y).
+
+    Both columns are factorized into integer codes once, the joint
+    contingency table is counted with ``np.bincount`` and every row's weight
+    is a single gather from the per-cell weight table. Marginals are
+    normalized over non-null values and the joint over all rows, matching
+    ``value_counts(normalize=True)`` and ``groupby(...).size() / n``; rows
+    with a null sensitive or target value get weight 1.0.
+    """
+    n = len(A)
+    a_codes, a_uniques = encode(A)
+    y_codes, y_uniques = encode(Y)
+    na, ny = len(a_uniques), len(y_uniques)
+    valid = (a_codes >= 0) & (y_codes >= 0)
+
+    cnt_a = np.bincount(a_codes[a_codes >= 0], minlength=na)
+    cnt_y = np.bincount(y_codes[y_codes >= 0], minlength=ny)
+    pA = cnt_a / cnt_a.sum()
+    pY = cnt_y / cnt_y.sum()
+
+    weights = np.ones(n, dtype=float)
+    if not valid.any():
+        return weights
+    a_valid = a_codes[valid].astype(np.int64)
+    y_valid = y_codes[valid].astype(np.int64)
+    if na * ny <= _DENSE_JOINT_MAX_CELLS:
+        joint = np.bincount(a_valid * ny + y_valid, minlength=na * ny).reshape(na, ny)
+        pAY = joint / n
+        with np.errstate(divide='ignore', invalid='ignore'):
+            table = np.where(joint > 0, np.multiply.outer(pA, pY) / pAY, 1.0)
+        weights[valid] = table[a_valid, y_valid]
+    else:
+        # High-cardinality target (e.g. a continuous score): count only the
+        # observed (a, y) pairs.
+        pair_codes, pairs = pd.factorize(a_valid * ny + y_valid)
+        joint = np.bincount(pair_codes, minlength=len(pairs))
+        pa_idx, py_idx = np.divmod(pairs, ny)
+        table = (pA[pa_idx] * pY[py_idx]) / (joint / n)
+        weights[valid] = table[pair_codes]
+    return weights
+
+
+def _with_column(df: pd.DataFrame, name: str, values: np.ndarray) -> pd.DataFrame:
+    """
+    ``df`` plus one column, without copying the existing columns: a shallow
+    copy shares their data, so ``df`` itself is left unchanged. An existing
+    column of that name is replaced in place (deleted from the shallow copy
+    first, since assigning over it could write through to ``df``).
+    """
+    dfx = df.copy(deep=False)
+    if name not in dfx.columns:
+        dfx[name] = values
+        return dfx
+    loc = dfx.columns.get_loc(name)
+    del dfx[name]
+    dfx.insert(loc, name, values)
+    return dfx
+
+
+def _normalized(weights: pd.Series) -> np.ndarray:
+    # Normalize weights to mean 1 for stability
+    mean_w = float(np.mean(weights))
+    if mean_w > 0:
+        weights = weights / mean_w
+    return weights.to_numpy(dtype=float)
+
+
+def _weights_output(df: pd.DataFrame, weights: np.ndarray, output: str) -> Union[pd.DataFrame, np.ndarray]:
+    if output == 'weights':
+        return weights
+    if output == 'append':
+        return _with_column(df, 'sample_weight', weights)
+    with stage('copy'):
+        dfx = df.copy()
+    dfx['sample_weight'] = weights
+    return dfx
+
+
 def reweigh_dataset(
     df: pd.DataFrame,
     sensitive_col: str,
     target_col: Optional[str] = None,
     positive_label: Optional[Any] = None,
-) -> pd.DataFrame:
-    dfx = df.copy()
-    n = len(dfx)
+    output: str = 'frame',
+) -> Union[pd.DataFrame, np.ndarray]:
+    """
+    Per-row ``sample_weight`` that makes the sensitive attribute independent
+    of the target, w(a,y) = P(A=a) P(Y=y) / P(A=a, Y=y), or balances the
+    sensitive groups by inverse frequency when there is no target. Weights
+    are normalized to mean 1. ``output`` selects what is returned:
+        'frame': a copy of ``df`` with a ``sample_weight`` column (default)
+        'append': ``df`` plus ``sample_weight`` without copying the other
+                  columns, which are shared with ``df`` (treat as read-only)
+        'weights': the float64 weight array only
+    """
+    if output not in ('frame', 'append', 'weights'):
+        raise ValueError(f"Unknown output '{output}'. Use frame, append or weights.")
+    n = len(df)
     if n == 0:
-        dfx['sample_weight'] = []
-        return dfx
-
-    A = dfx[sensitive_col]
-    if target_col is not None and target_col in dfx.columns:
-        Y = dfx[target_col]
-        pos = positive_label if positive_label is not None else _infer_positive_label(Y)
-        # Reweighing: w(a,y) = P(A=a) P(Y=y) / P(A=a, Y=y)
-        pA = A.value_counts(normalize=True)
-        pY = Y.value_counts(normalize=True)
-        pAY = dfx.groupby([sensitive_col, target_col]).size() / n
-        weights = []
-        for a_val, y_val in zip(A, Y):
-            num = pA.get(a_val, 0) * pY.get(y_val, 0)
-            den = pAY.get((a_val, y_val), 0)
-            w = (num / den) if den > 0 else 1.0
-            weights.append(w)
-        dfx['sample_weight'] = weights
-        # Normalize weights to mean 1 for stability
-        mean_w = float(np.mean(dfx['sample_weight']))
-        if mean_w > 0:
-            dfx['sample_weight'] = dfx['sample_weight'] / mean_w
-        return dfx
+        weights = np.empty(0, dtype=float)
+    elif target_col is not None and target_col in df.columns:
+        with stage('weights'):
+            weights = _normalized(pd.Series(_reweigh_weights(df[sensitive_col], df[target_col])))
     else:
-        # No target: balance sensitive groups by inverse frequency
-        counts = A.value_counts()
-        inv_freq = counts.max() / counts
-        w_map = inv_freq.to_dict()
-        dfx['sample_weight'] = A.map(w_map).astype(float)
-        mean_w = float(np.mean(dfx['sample_weight']))
-        if mean_w > 0:
-            dfx['sample_weight'] = dfx['sample_weight'] / mean_w
-        return dfx
+        with stage('weights'):
+            # No target: balance sensitive groups by inverse frequency
+            A = df[sensitive_col]
+            counts = A.value_counts()
+            inv_freq = counts.max() / counts
+            weights = _normalized(A.map(inv_freq.to_dict()).astype(float))
+    return _weights_output(df, weights, output)
+
+
+def _stratum_codes(df: pd.DataFrame, cols) -> np.ndarray:
+    """
+    Integer stratum code per row, numbered in the sorted key order groupby
+    uses; rows with a null in any key column get -1 (dropped, as groupby
+    does by default).
+    """
+    codes = np.zeros(len(df), dtype=np.int64)
+    null = np.zeros(len(df), dtype=bool)
+    for col in cols:
+        col_codes, uniques = encode(df[col], sort=True)
+        null |= col_codes < 0
+        codes = codes * len(uniques) + col_codes
+    codes[null] = -1
+    return codes
 
 
 def resample_dataset(
@@ -67,46 +163,108 @@ def resample_dataset(
     sensitive_col: str,
     target_col: Optional[str] = None,
     positive_label: Optional[Any] = None,
-) -> pd.DataFrame:
-    dfx = df.copy()
-    n = len(dfx)
-    if n == 0:
-        return dfx
+    output: str = 'frame',
+) -> Union[pd.DataFrame, np.ndarray]:
+    """
+    Upsample every (sensitive, target) stratum, or every sensitive group when
+    there is no target, to the size of the largest one.
 
-    if target_col is not None and target_col in dfx.columns:
-        # Upsample strata (A=a, Y=y) to reduce disparity without downsampling
-        strata = dfx.groupby([sensitive_col, target_col])
-        sizes = strata.size()
-        max_size = sizes.max()
-        samples = []
-        rng = np.random.default_rng(42)
-        for key, grp in strata:
-            k = len(grp)
-            if k < max_size:
-                need = max_size - k
-                add_idx = rng.integers(low=0, high=k, size=need)
-                add_rows = grp.iloc[add_idx]
-                samples.append(pd.concat([grp, add_rows], axis=0))
-            else:
-                samples.append(grp)
-        return pd.concat(samples, axis=0, ignore_index=True)
+    The resampled rows are described by a single int64 array of positional
+    indices into ``df`` (each stratum's rows in original order followed by
+    its draws from ``default_rng(42)``), which is gathered once. ``output``
+    selects what is returned:
+        'frame': the upsampled DataFrame (default)
+        'index': the positional index array only; ``df.iloc[index]`` is the frame
+        'counts': ``df`` plus a ``replication_count`` column; the other
+                  columns are shared with ``df``, not copied (treat as read-only)
+    """
+    if output not in ('frame', 'index', 'counts'):
+        raise ValueError(f"Unknown output '{output}'. Use frame, index or counts.")
+    n = len(df)
+    if n == 0:
+        index = np.empty(0, dtype=np.int64)
     else:
-        # No target: balance sensitive groups by upsampling to max group size
-        groups = dfx.groupby(sensitive_col)
-        sizes = groups.size()
-        max_size = sizes.max()
-        rng = np.random.default_rng(42)
-        outs = []
-        for g, grp in groups:
-            k = len(grp)
-            if k < max_size and k > 0:
-                need = max_size - k
-                add_idx = rng.integers(low=0, high=k, size=need)
-                add_rows = grp.iloc[add_idx]
-                outs.append(pd.concat([grp, add_rows], axis=0))
-            else:
-                outs.append(grp)
-        return pd.concat(outs, axis=0, ignore_index=True)
+        with stage('strata'):
+            # Upsample strata (A=a, Y=y) to reduce disparity without downsampling;
+            # without a target, balance sensitive groups the same way
+            has_target = target_col is not None and target_col in df.columns
+            cols = [sensitive_col, target_col] if has_target else [sensitive_col]
+            codes = _stratum_codes(df, cols)
+            rows = np.flatnonzero(codes >= 0)
+            # Dense 0..n_strata-1 numbering of the observed strata, in key order
+            _, dense = np.unique(codes[rows], return_inverse=True)
+            order = rows[np.argsort(dense, kind='stable')]
+            sizes = np.bincount(dense.ravel())
+            starts = np.cumsum(sizes) - sizes
+            max_size = sizes.max() if len(sizes) else 0
+            rng = np.random.default_rng(42)
+            pieces = []
+            for start, k in zip(starts, sizes):
+                members = order[start:start + k]
+                pieces.append(members)
+                if k < max_size:
+                    pieces.append(members[rng.integers(low=0, high=k, size=max_size - k)])
+            index = np.concatenate(pieces) if pieces else np.empty(0, dtype=np.int64)
+
+    if output == 'index':
+        return index
+    with stage('gather'):
+        if output == 'counts':
+            return _with_column(df, 'replication_count', np.bincount(index, minlength=n))
+        return df.iloc[index].reset_index(drop=True)
+
+
+def _apply_group_factors(
+    sens: pd.Series,
+    values: pd.Series,
+    factors: Dict[Any, float],
+    method: str,
+) -> np.ndarray:
+    """
+    Columnar adjustment kernel: look up each group's factor once, gather it
+    per row through the factorized codes and apply it in a single NumPy
+    operation. Groups missing from ``factors`` (and null groups) use 1.0.
+    """
+    index = GroupIndex(sens, sort=False)
+    per_row = index.take(index.lookup(factors, default=1.0), fill=1.0)
+    vals = values.to_numpy()
+    if method == 'multiply':
+        return vals * per_row
+    return vals + per_row  # 'add'
+
+
+def apply_quota_selection(
+    df: pd.DataFrame,
+    sensitive_col: str,
+    target_col: str,
+    score_cols: Optional[Sequence[str]] = None,
+    score_weights: Optional[Sequence[float]] = None,
+    threshold: float = 0.5,
+    positive_label: Optional[Any] = None,
+    inplace: bool = False,
+    keep_original: bool = False,
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Rewrite ``target_col`` as 0/1 by quota_selection; returns the frame and
+    the selection summary.
+
+    The current positives are the rows whose target equals
+    ``positive_label`` or, without one, is above ``threshold``, so a
+    non-binary target (a score or rating) is binarized at the threshold.
+    Their count is re-selected so that each group gets its proportional
+    share, best ``score_cols`` scores (weighted by ``score_weights``) first.
+    With ``keep_original`` the old values are kept in
+    ``original_<target_col>``. ``df`` is copied first unless ``inplace``.
+    """
+    selected, summary = quota_selection(df, sensitive_col, target_col, score_cols, score_weights,
+                                        threshold=threshold, positive_label=positive_label)
+    if not inplace:
+        with stage('copy'):
+            df = df.copy()
+    if keep_original:
+        df[f'original_{target_col}'] = df[target_col]
+    df[target_col] = selected.astype(np.int64)
+    return df, summary
 
 
 def adjust_values(
@@ -117,7 +275,9 @@ def adjust_values(
     method: str = 'multiply',
     inplace: bool = False,
     modify_original: bool = False,
-    threshold: float = 0.5
+    threshold: float = 0.5,
+    score_cols: Optional[Sequence[str]] = None,
+    score_weights: Optional[Sequence[float]] = None,
 ) -> pd.DataFrame:
     """
     Adjust target values based on sensitive attribute to reduce bias.
@@ -129,13 +289,21 @@ def adjust_values(
         adjustment_factors: Dictionary mapping sensitive attribute values to adjustment factors.
                           If None, will automatically calculate to equalize group means.
         method: 'multiply' or 'add' - how to apply the adjustment factors
-        inplace: If True, modifies the input DataFrame directly
+        inplace: If True, overwrites target_col in the input DataFrame directly (no copy);
+                 otherwise a single copy is returned with a '<target_col>_adjusted' column
+        modify_original: If True, target_col is rewritten as 0/1 by apply_quota_selection: the
+                         rows above ``threshold`` are re-selected so that each group gets its
+                         proportional share, picking the top ``score_cols`` scores
+                         (weighted by ``score_weights``) within each group. A non-binary
+                         target is binarized at ``threshold``. Use apply_quota_selection
+                         directly for the selection summary
         
     Returns:
         DataFrame with adjusted target values
     """
     if not inplace:
-        df = df.copy()
+        with stage('copy'):
+            df = df.copy()
     
     if target_col not in df.columns:
         raise ValueError(f"Target column '{target_col}' not found in DataFrame")
@@ -143,66 +311,27 @@ def adjust_values(
     if sensitive_col not in df.columns:
         raise ValueError(f"Sensitive column '{sensitive_col}' not found in DataFrame")
     
-    # Convert target to numeric if it's not already
-    if not np.issubdtype(df[target_col].dtype, np.number):
-        if not inplace:
-            df = df.copy()
-
-    # For binary classification with original modification, we'll use a different approach
-    if modify_original and target_col == 'Hired':
-        # Calculate the target number of hires per group for equal representation
-        total_hires = df[target_col].sum()
-        group_counts = df[sensitive_col].value_counts()
-        target_hires = {}
-        
-        # Calculate target hires to balance the groups
-        for group, count in group_counts.items():
-            # Aim for proportional representation based on group size
-            target_hires[group] = int(round((count / len(df)) * total_hires))
-        
-        # Sort candidates within each group by their scores (Technical_Score + Interview_Score)
-        df['total_score'] = df['Technical_Score'] + df['Interview_Score']
-        df_sorted = df.sort_values(by='total_score', ascending=False)
-        
-        # Reset the Hired column
-        df[target_col] = 0
-        
-        # Select top candidates from each group to meet the target
-        for group, target in target_hires.items():
-            group_indices = df_sorted[df_sorted[sensitive_col] == group].index[:target]
-            df.loc[group_indices, target_col] = 1
-        
-        # Clean up
-        df = df.drop(columns=['total_score'])
-        
-        print(f"\nOriginal 'Hired' values have been updated to reduce bias.")
-        print("Adjusted hiring counts by group:")
-        print(df.groupby(sensitive_col)[target_col].value_counts().unstack())
-        
+    if modify_original:
+        # Re-select the positives group by group, best scores first, so each
+        # group gets its proportional share of the current positives
+        df, _ = apply_quota_selection(df, sensitive_col, target_col, score_cols, score_weights,
+                                      threshold=threshold, inplace=True)
         return df
     
-    # Original adjustment logic for non-binary or non-Hired targets
-    if adjustment_factors is None:
-        group_means = df.groupby(sensitive_col)[target_col].mean()
-        overall_mean = df[target_col].mean()
-        adjustment_factors = (overall_mean / group_means).to_dict()
-
-    # Apply adjustments
-    adjusted = []
-    for _, row in df.iterrows():
-        val = row[target_col]
-        factor = adjustment_factors.get(row[sensitive_col], 1.0)
-        
-        if method == 'multiply':
-            adjusted_val = val * factor
-        else:  # 'add'
-            adjusted_val = val + factor
-        adjusted.append(adjusted_val)
+    # Rescale (or shift) each group's values by its factor, by default the
+    # one that brings the group mean to the overall mean
+    with stage('adjust'):
+        if adjustment_factors is None:
+            group_means = df.groupby(sensitive_col)[target_col].mean()
+            overall_mean = df[target_col].mean()
+            adjustment_factors = (overall_mean / group_means).to_dict()
+
+        # Apply adjustments as one columnar operation over the group codes
+        adjusted = _apply_group_factors(df[sensitive_col], df[target_col], adjustment_factors, method)
 
     if inplace:
         df[target_col] = adjusted
     else:
-        df = df.copy()
         df[target_col + '_adjusted'] = adjusted
     
     return df
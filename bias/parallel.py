@@ -0,0 +1,236 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Union
+import pandas as pd
+import numpy as np
+
+from .groupstats import encode
+from .instrument import stage
+from .streaming import GroupCounts, _py
+
+
+DEFAULT_PARTITION_ROWS = 2_000_000
+# Rows encoded per to_csv call when writing serially
+_CSV_CHUNK_ROWS = 100_000
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_WORKERS = 0
+_POOL_LOCK = threading.Lock()
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def _mp_context():
+    # Forking the server would copy locks held by its job, ingest and sweeper
+    # threads into children that can then deadlock; forkserver children start
+    # from a clean single-threaded process (spawn where there is no forkserver)
+    if 'forkserver' not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('spawn')
+    context = multiprocessing.get_context('forkserver')
+    # Import the task module once in the server rather than in every worker
+    context.set_forkserver_preload(['bias.parallel'])
+    return context
+
+
+def get_pool(workers: int) -> ProcessPoolExecutor:
+    """Shared process pool, recreated when the requested size changes."""
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_WORKERS != workers:
+            if _POOL is not None:
+                _POOL.shutdown(wait=True)
+            _POOL = ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context())
+            _POOL_WORKERS = workers
+        return _POOL
+
+
+def shutdown_pool() -> None:
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=True)
+        _POOL, _POOL_WORKERS = None, 0
+
+
+def _partitions(n: int, partition_rows: int) -> List[Tuple[int, int]]:
+    partition_rows = max(int(partition_rows), 1)
+    return [(start, min(start + partition_rows, n)) for start in range(0, n, partition_rows)]
+
+
+def _use_serial(n: int, workers: Optional[int], partition_rows: int) -> Tuple[bool, int]:
+    # More processes than cores only adds pickling and scheduling overhead
+    workers = min(workers or default_workers(), default_workers())
+    return workers <= 1 or n <= partition_rows, workers
+
+
+# --- Worker tasks (module level so they pickle) ---
+
+def _count_partition(part: pd.DataFrame, sensitive_col: str, target_col: Optional[str]) -> GroupCounts:
+    return GroupCounts(sensitive_col, target_col).update(part)
+
+
+def _gather_weights(part: pd.DataFrame, sensitive_col: str, target_col: str,
+                    a_index: Dict[Any, int], y_index: Dict[Any, int],
+                    cell_codes: np.ndarray, cell_weights: np.ndarray) -> np.ndarray:
+    # Map this partition's local codes onto the global (a, y) cell codes and
+    # look each row up in the sorted global weight table; nulls get 1.0
+    a_codes, a_uniques = encode(part[sensitive_col])
+    y_codes, y_uniques = encode(part[target_col])
+    a_map = np.array([a_index[a] for a in map(_py, a_uniques)], dtype=np.int64)
+    y_map = np.array([y_index[y] for y in map(_py, y_uniques)], dtype=np.int64)
+    valid = (a_codes >= 0) & (y_codes >= 0)
+    weights = np.ones(len(part), dtype=float)
+    rows = a_map[a_codes[valid]] * len(y_index) + y_map[y_codes[valid]]
+    weights[valid] = cell_weights[np.searchsorted(cell_codes, rows)]
+    return weights
+
+
+def _write_partition(part: pd.DataFrame, path: str, header: bool) -> str:
+    part.to_csv(path, index=False, header=header)
+    return path
+
+
+# --- Public API ---
+
+def group_counts_parallel(
+    df: pd.DataFrame,
+    sensitive_col: str,
+    target_col: Optional[str] = None,
+    workers: Optional[int] = None,
+    partition_rows: int = DEFAULT_PARTITION_ROWS,
+) -> GroupCounts:
+    """Per-partition GroupCounts computed on a process pool and merged."""
+    cols = [sensitive_col] + ([target_col] if target_col is not None and target_col in df.columns else [])
+    serial, workers = _use_serial(len(df), workers, partition_rows)
+    with stage('group_stats'):
+        if serial:
+            return _count_partition(df[cols], sensitive_col, target_col)
+        pool = get_pool(workers)
+        proj = df[cols]
+        futures = [
+            pool.submit(_count_partition, proj.iloc[start:stop], sensitive_col, target_col)
+            for start, stop in _partitions(len(df), partition_rows)
+        ]
+        counts = GroupCounts(sensitive_col, target_col)
+        for fut in futures:
+            counts.merge(fut.result())
+        return counts
+
+
+def compute_bias_report_parallel(
+    df: pd.DataFrame,
+    sensitive_col: str,
+    target_col: Optional[str] = None,
+    positive_label: Optional[Any] = None,
+    workers: Optional[int] = None,
+    partition_rows: int = DEFAULT_PARTITION_ROWS,
+    bootstrap: int = 0,
+    ci_level: float = 0.95,
+    seed: Optional[int] = None,
+) -> Dict[str, Any]:
+    """compute_bias_report with group statistics computed per row partition."""
+    if sensitive_col not in df.columns:
+        return {'error': f'sensitive column {sensitive_col} missing'}
+    counts = group_counts_parallel(df, sensitive_col, target_col, workers, partition_rows)
+    return counts.report(positive_label, bootstrap=bootstrap, ci_level=ci_level, seed=seed)
+
+
+def reweigh_dataset_parallel(
+    df: pd.DataFrame,
+    sensitive_col: str,
+    target_col: Optional[str] = None,
+    positive_label: Optional[Any] = None,
+    workers: Optional[int] = None,
+    partition_rows: int = DEFAULT_PARTITION_ROWS,
+    output: str = 'frame',
+) -> Union[pd.DataFrame, np.ndarray]:
+    """
+    reweigh_dataset with the contingency table counted per partition and the
+    per-row weight gather also done per partition. Weights are identical to
+    the serial version; the no-target case is delegated to it. ``output`` is
+    as for reweigh_dataset ('frame', 'append' or 'weights').
+    """
+    from .mitigate import _normalized, _weights_output, reweigh_dataset
+
+    serial, workers = _use_serial(len(df), workers, partition_rows)
+    if serial or target_col is None or target_col not in df.columns:
+        return reweigh_dataset(df, sensitive_col, target_col, positive_label, output=output)
+    if output not in ('frame', 'append', 'weights'):
+        raise ValueError(f"Unknown output '{output}'. Use frame, append or weights.")
+
+    n = len(df)
+    counts = group_counts_parallel(df, sensitive_col, target_col, workers, partition_rows)
+    cnt_a: Dict[Any, int] = {}
+    cnt_y: Dict[Any, int] = {}
+    for (a, y), c in counts.cells.items():
+        if a is not None:
+            cnt_a[a] = cnt_a.get(a, 0) + c
+        if y is not None:
+            cnt_y[y] = cnt_y.get(y, 0) + c
+    sum_a, sum_y = sum(cnt_a.values()), sum(cnt_y.values())
+    # w(a,y) = P(A=a) P(Y=y) / P(A=a, Y=y), same operation order as serial
+    a_index = {a: i for i, a in enumerate(cnt_a)}
+    y_index = {y: j for j, y in enumerate(cnt_y)}
+    cells = [(a_index[a] * len(y_index) + y_index[y], (cnt_a[a] / sum_a) * (cnt_y[y] / sum_y) / (c / n))
+             for (a, y), c in counts.cells.items()
+             if a is not None and y is not None]
+    cells.sort()
+    cell_codes = np.array([code for code, _ in cells], dtype=np.int64)
+    cell_weights = np.array([w for _, w in cells], dtype=float)
+
+    pool = get_pool(workers)
+    proj = df[[sensitive_col, target_col]]
+    futures = [
+        pool.submit(_gather_weights, proj.iloc[start:stop], sensitive_col, target_col,
+                    a_index, y_index, cell_codes, cell_weights)
+        for start, stop in _partitions(n, partition_rows)
+    ]
+    with stage('weights'):
+        weights = _normalized(pd.Series(np.concatenate([fut.result() for fut in futures])))
+    return _weights_output(df, weights, output)
+
+
+def to_csv_parallel(
+    df: pd.DataFrame,
+    path: str,
+    workers: Optional[int] = None,
+    partition_rows: int = DEFAULT_PARTITION_ROWS,
+) -> str:
+    """
+    Write ``df`` to CSV by encoding row partitions on the process pool and
+    concatenating the part files in order. Output matches
+    ``df.to_csv(path, index=False)``.
+    """
+    serial, workers = _use_serial(len(df), workers, partition_rows)
+    if serial:
+        # Encode and write in chunks so the encoding and the disk time are
+        # timed separately
+        with open(path, 'w', encoding='utf-8', newline='') as out:
+            for start in range(0, max(len(df), 1), _CSV_CHUNK_ROWS):
+                with stage('to_csv'):
+                    text = df.iloc[start:start + _CSV_CHUNK_ROWS].to_csv(index=False, header=start == 0)
+                with stage('disk'):
+                    out.write(text)
+        return path
+    pool = get_pool(workers)
+    part_dir = tempfile.mkdtemp(prefix='parts-', dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        futures = [
+            pool.submit(_write_partition, df.iloc[start:stop], os.path.join(part_dir, f'{i:06d}.csv'), i == 0)
+            for i, (start, stop) in enumerate(_partitions(len(df), partition_rows))
+        ]
+        with open(path, 'wb') as out:
+            for fut in futures:
+                with stage('to_csv'):
+                    part_path = fut.result()
+                with stage('disk'), open(part_path, 'rb') as part:
+                    shutil.copyfileobj(part, out)
+    finally:
+        shutil.rmtree(part_dir, ignore_errors=True)
+    return path
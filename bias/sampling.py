@@ -0,0 +1,167 @@
+from statistics import NormalDist
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import pandas as pd
+import numpy as np
+
+from .groupstats import GroupIndex
+from .instrument import stage
+from .metrics import _outcome, bootstrap_intervals, compute_bias_report
+
+
+# Replicates behind a preview's summary-metric bounds
+PREVIEW_REPLICATES = 1000
+
+
+class Reservoir:
+    """
+    Uniform random sample of at most ``size`` rows from a stream of
+    DataFrame chunks, in one pass (Algorithm R, vectorized per chunk).
+
+    Row t of the stream (0-based) replaces a uniformly chosen slot with
+    probability size / (t + 1), so after any number of rows every row seen
+    is in the sample with the same probability. Memory is one sample plus
+    one chunk. Chunks must have the same columns.
+    """
+
+    def __init__(self, size: int, seed: Optional[int] = None):
+        if size <= 0:
+            raise ValueError('size must be positive')
+        self.size = int(size)
+        self.n_seen = 0
+        self._rng = np.random.default_rng(seed)
+        self._frame: Optional[pd.DataFrame] = None
+        # Stream position of the row held in each slot
+        self._positions = np.empty(0, dtype=np.int64)
+
+    def update(self, chunk: pd.DataFrame) -> 'Reservoir':
+        m = len(chunk)
+        if not m:
+            return self
+        chunk = chunk.reset_index(drop=True)
+        filled = len(self._positions)
+        fill = min(self.size - filled, m)
+        if fill > 0:
+            # Free slots take the leading rows as they come
+            head = chunk.iloc[:fill]
+            self._frame = head if self._frame is None else pd.concat([self._frame, head], ignore_index=True)
+            self._positions = np.concatenate([self._positions, self.n_seen + np.arange(fill)])
+        if fill < m:
+            rows = np.arange(fill, m)
+            t = self.n_seen + rows
+            slots = self._rng.integers(0, t + 1)
+            hit = slots < self.size
+            rows, slots = rows[hit], slots[hit]
+            if len(rows):
+                # A slot hit twice in one chunk keeps the later row, as a
+                # row-by-row pass would
+                _, last = np.unique(slots[::-1], return_index=True)
+                keep = len(slots) - 1 - last
+                rows, slots = rows[keep], slots[keep]
+                take = np.arange(self.size)
+                take[slots] = self.size + np.arange(len(rows))
+                combined = pd.concat([self._frame, chunk.iloc[rows]], ignore_index=True)
+                self._frame = combined.iloc[take].reset_index(drop=True)
+                self._positions[slots] = self.n_seen + rows
+        self.n_seen += m
+        return self
+
+    def sample(self) -> pd.DataFrame:
+        """The sampled rows in stream order, with a fresh RangeIndex."""
+        if self._frame is None:
+            return pd.DataFrame()
+        return self._frame.iloc[np.argsort(self._positions, kind='stable')].reset_index(drop=True)
+
+
+def reservoir_sample(chunks: Iterable[pd.DataFrame], size: int,
+                     seed: Optional[int] = None) -> Tuple[pd.DataFrame, int]:
+    """(uniform sample of at most ``size`` rows, rows seen) from one pass over ``chunks``."""
+    reservoir = Reservoir(size, seed)
+    for chunk in chunks:
+        reservoir.update(chunk)
+    return reservoir.sample(), reservoir.n_seen
+
+
+def _wilson(rate: float, n: float, z: float) -> List[float]:
+    # Wilson score interval for a proportion observed on n rows
+    if n <= 0:
+        return [0.0, 1.0]
+    denom = 1.0 + z * z / n
+    center = (rate + z * z / (2.0 * n)) / denom
+    half = z * np.sqrt(rate * (1.0 - rate) / n + z * z / (4.0 * n * n)) / denom
+    return [round(float(max(center - half, 0.0)), 6), round(float(min(center + half, 1.0)), 6)]
+
+
+def _basic_interval(estimate: Optional[float], percentile: Optional[List[float]]) -> Optional[List[float]]:
+    # Basic (reverse percentile) bootstrap interval. The max - min and
+    # min / max of sampled rates are biased away from the truth, and more
+    # so in the replicates; reflecting the percentiles about the estimate
+    # cancels that first-order bias, which plain percentiles would double.
+    if estimate is None or percentile is None:
+        return None
+    lo, hi = percentile
+    return [round(max(2.0 * estimate - hi, 0.0), 6), round(2.0 * estimate - lo, 6)]
+
+
+def preview_bias_report(
+    sample: pd.DataFrame,
+    sensitive_col: str,
+    target_col: Optional[str] = None,
+    positive_label: Optional[Any] = None,
+    population_rows: Optional[int] = None,
+    ci_level: float = 0.95,
+    seed: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Approximate compute_bias_report of a dataset of ``population_rows`` rows
+    from a uniform random ``sample`` of it.
+
+    Rates and shares are those of the sample. Each group's ``n`` is scaled
+    up to the population, its sample size is kept as ``sample_n`` and its
+    positive rate gets a Wilson interval at ``ci_level``, narrowed by the
+    finite-population correction (zero width once the sample is the whole
+    dataset). Basic bootstrap intervals over the sample for the parity metrics and
+    the sample and population sizes are reported under ``preview``.
+    """
+    report = compute_bias_report(sample, sensitive_col, target_col, positive_label)
+    if 'error' in report:
+        return report
+    n = len(sample)
+    population = max(int(population_rows if population_rows is not None else n), n)
+    z = NormalDist().inv_cdf(0.5 + ci_level / 2.0)
+    # Finite-population correction: sampling n of N rows without replacement
+    fpc = (population - n) / (population - 1) if population > 1 else 0.0
+    exact = fpc == 0.0
+
+    has_target = report['summary'].get('overall_positive_rate') is not None
+    with stage('preview'):
+        for entry in report['groups'].values():
+            m = entry['n']
+            entry['sample_n'] = m
+            entry['n'] = int(round(m * population / n)) if n else 0
+            if 'positive_rate' in entry:
+                rate = entry['positive_rate']
+                entry['positive_rate_bounds'] = [rate, rate] if exact else _wilson(rate, m / fpc, z)
+
+        preview: Dict[str, Any] = {
+            'sample_rows': n,
+            'population_rows': population,
+            'level': ci_level,
+            'exact': exact,
+        }
+        if has_target and n:
+            summary = report['summary']
+            if exact:
+                for metric in ('demographic_parity_diff', 'disparate_impact'):
+                    value = summary.get(metric)
+                    preview[metric] = [value, value] if value is not None else None
+            else:
+                index = GroupIndex(sample[sensitive_col])
+                outcome = _outcome(sample, target_col, report.get('inferred_positive_label'))
+                present = np.flatnonzero(index.sizes)
+                intervals = bootstrap_intervals(index.sizes[present].tolist(),
+                                                index.count(outcome['positive'])[present].tolist(),
+                                                n, PREVIEW_REPLICATES, ci_level, seed if seed is not None else 0)
+                for metric in ('demographic_parity_diff', 'disparate_impact'):
+                    preview[metric] = _basic_interval(summary.get(metric), intervals[metric])
+    report['preview'] = preview
+    return report
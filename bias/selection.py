@@ -0,0 +1,263 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+import pandas as pd
+import numpy as np
+
+from .groupstats import GroupIndex, encode
+from .instrument import stage
+from .streaming import DEFAULT_CHUNK_ROWS, _py, _sorted_keys
+
+
+# Score columns of the bundled hiring dataset, ranked when none are given
+DEFAULT_SCORE_COLS = ('Technical_Score', 'Interview_Score')
+
+
+def resolve_score_cols(columns: Iterable[str], target_col: Optional[str],
+                       score_cols: Optional[Sequence[str]] = None) -> List[str]:
+    """
+    Columns to rank by: ``score_cols`` when given, else DEFAULT_SCORE_COLS
+    when the data has them, else the target itself (e.g. a probability).
+    """
+    if score_cols:
+        return list(score_cols)
+    columns = set(columns)
+    if all(col in columns for col in DEFAULT_SCORE_COLS):
+        return list(DEFAULT_SCORE_COLS)
+    if target_col is None:
+        raise ValueError('score_cols is required without a target column')
+    return [target_col]
+
+
+def composite_score(df: pd.DataFrame, score_cols: Sequence[str],
+                    weights: Optional[Sequence[float]] = None) -> np.ndarray:
+    """Weighted sum of the score columns as float; a null in any of them gives NaN."""
+    if weights is None:
+        weights = [1.0] * len(score_cols)
+    if len(weights) != len(score_cols):
+        raise ValueError(f'{len(weights)} weights given for {len(score_cols)} score columns')
+    score = np.zeros(len(df), dtype=float)
+    for col, weight in zip(score_cols, weights):
+        if col not in df.columns:
+            raise ValueError(f"Score column '{col}' not found in DataFrame")
+        score += float(weight) * df[col].to_numpy(dtype=float, na_value=np.nan)
+    return score
+
+
+def group_quotas(sizes: np.ndarray, n: int, total: int) -> np.ndarray:
+    """Proportional representation: each group's share of ``total`` selections, rounded."""
+    if not n:
+        return np.zeros(len(sizes), dtype=np.int64)
+    return np.rint(np.asarray(sizes) / n * total).astype(np.int64)
+
+
+def _positive(values: pd.Series, threshold: float, positive_label: Any) -> np.ndarray:
+    # Rows currently selected: equal to positive_label, or above threshold
+    if positive_label is not None:
+        return np.asarray((values == positive_label).fillna(False), dtype=bool)
+    return np.asarray(values.to_numpy(dtype=float, na_value=np.nan) > threshold, dtype=bool)
+
+
+def _ranked_keep(groups: np.ndarray, keys: np.ndarray, quotas: np.ndarray) -> np.ndarray:
+    # Positions (into the inputs) of the top ``quotas[g]`` rows of each group
+    # g: one stable sort by (group, key), with ties in input order, and a
+    # row's rank is its offset from the start of its group
+    order = np.lexsort((keys, groups))
+    sorted_groups = groups[order]
+    sizes = np.bincount(sorted_groups, minlength=len(quotas))
+    starts = np.cumsum(sizes) - sizes
+    rank = np.arange(len(order)) - starts[sorted_groups]
+    return order[rank < quotas[sorted_groups]]
+
+
+def _rank_key(score: np.ndarray) -> np.ndarray:
+    # Ascending sort key for a descending score; null scores rank last
+    return np.where(np.isnan(score), np.inf, -score)
+
+
+def _summary(score_cols, weights, total, groups, sizes, quotas, selected, cutoffs, original) -> Dict[str, Any]:
+    entries: Dict[str, Any] = {}
+    for i, g in enumerate(groups):
+        entry = {
+            'n': int(sizes[i]),
+            'quota': int(quotas[i]),
+            'selected': int(selected[i]),
+            'cutoff_score': None if np.isnan(cutoffs[i]) else round(float(cutoffs[i]), 6),
+        }
+        if original is not None:
+            entry['original_positive'] = int(original[i])
+        entries[str(g)] = entry
+    return {
+        'score_columns': list(score_cols),
+        'weights': [float(w) for w in weights] if weights is not None else [1.0] * len(score_cols),
+        'total': int(total),
+        'selected': int(np.sum(selected)),
+        'groups': entries,
+    }
+
+
+def quota_selection(
+    df: pd.DataFrame,
+    sensitive_col: str,
+    target_col: Optional[str] = None,
+    score_cols: Optional[Sequence[str]] = None,
+    weights: Optional[Sequence[float]] = None,
+    total: Optional[int] = None,
+    threshold: float = 0.5,
+    positive_label: Optional[Any] = None,
+) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """
+    Select the top-scoring rows of every sensitive group so that each group
+    gets its proportional share of ``total`` selections.
+
+    ``total`` defaults to the number of rows the target currently marks as
+    positive (equal to ``positive_label``, or above ``threshold``). Rows are
+    ranked by the weighted sum of ``score_cols`` (see resolve_score_cols),
+    highest first, with null scores last and ties in row order; rows with a
+    null group are never selected. One stable sort by (group, score) ranks
+    every group at once: O(n log n) whatever the number of groups.
+
+    Returns the boolean selection mask and a summary with each group's
+    size, quota, number selected, lowest selected score and original
+    positives.
+    """
+    if sensitive_col not in df.columns:
+        raise ValueError(f"Sensitive column '{sensitive_col}' not found in DataFrame")
+    if target_col is not None and target_col not in df.columns:
+        raise ValueError(f"Target column '{target_col}' not found in DataFrame")
+    score_cols = resolve_score_cols(df.columns, target_col, score_cols)
+    n = len(df)
+    with stage('rank'):
+        score = composite_score(df, score_cols, weights)
+        index = GroupIndex(df[sensitive_col])
+        original = None
+        if target_col is not None:
+            positive = _positive(df[target_col], threshold, positive_label)
+            original = index.count(positive)
+            if total is None:
+                total = int(np.count_nonzero(positive))
+        if total is None:
+            raise ValueError('total is required without a target column')
+        quotas = group_quotas(index.sizes, n, total)
+
+        rows = np.flatnonzero(index.valid)
+        chosen = rows[_ranked_keep(index.codes[rows], _rank_key(score[rows]), quotas)]
+        selected = np.zeros(n, dtype=bool)
+        selected[chosen] = True
+
+        counts = np.bincount(index.codes[chosen], minlength=len(index))
+        cutoffs = np.full(len(index), np.nan)
+        # Rows come back group by group, best first: the last of a group is its cutoff
+        ends = np.cumsum(counts) - 1
+        for i in np.flatnonzero(counts):
+            cutoffs[i] = score[chosen[ends[i]]]
+
+    present = np.flatnonzero(index.sizes)
+    summary = _summary(score_cols, weights, total, [index.groups[i] for i in present], index.sizes[present],
+                       quotas[present], counts[present], cutoffs[present],
+                       original[present] if original is not None else None)
+    return selected, summary
+
+
+def _chunks(source: Union[str, Callable[[], Iterable[pd.DataFrame]]], usecols: List[str],
+            chunksize: int) -> Iterable[pd.DataFrame]:
+    if isinstance(source, str):
+        return pd.read_csv(source, usecols=usecols, chunksize=chunksize)
+    return source()
+
+
+def quota_selection_streaming(
+    source: Union[str, Callable[[], Iterable[pd.DataFrame]]],
+    sensitive_col: str,
+    target_col: Optional[str] = None,
+    score_cols: Optional[Sequence[str]] = None,
+    weights: Optional[Sequence[float]] = None,
+    total: Optional[int] = None,
+    threshold: float = 0.5,
+    positive_label: Optional[Any] = None,
+    chunksize: int = DEFAULT_CHUNK_ROWS,
+) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """
+    Out-of-core variant of quota_selection.
+
+    ``source`` is a CSV path, read ``chunksize`` rows at a time with only
+    the needed columns parsed, or a callable returning a fresh iterable of
+    DataFrame chunks (it is called twice). The first pass counts the groups
+    to fix the quotas; the second keeps a running top-k per group, so
+    memory is bounded by ``total`` plus one chunk. Returns the sorted row
+    positions of the selection (not a mask) and the same summary as
+    quota_selection. As in compute_bias_report_streaming, CSV chunks are
+    typed independently.
+    """
+    def check_columns(columns) -> List[str]:
+        if sensitive_col not in columns:
+            raise ValueError(f"Sensitive column '{sensitive_col}' not found in DataFrame")
+        if target_col is not None and target_col not in columns:
+            raise ValueError(f"Target column '{target_col}' not found in DataFrame")
+        return resolve_score_cols(columns, target_col, score_cols)
+
+    usecols = None
+    if isinstance(source, str):
+        score_cols = check_columns(list(pd.read_csv(source, nrows=0).columns))
+        usecols = list(dict.fromkeys([sensitive_col] + ([target_col] if target_col else []) + score_cols))
+
+    # Pass 1: group sizes and current positives
+    sizes: Dict[Any, int] = {}
+    original: Dict[Any, int] = {}
+    n = n_positive = 0
+    with stage('count'):
+        for chunk in _chunks(source, usecols, chunksize):
+            if usecols is None:
+                score_cols = check_columns(list(chunk.columns))
+                usecols = list(chunk.columns)
+            codes, uniques = encode(chunk[sensitive_col])
+            counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+            pos = None
+            if target_col is not None:
+                positive = _positive(chunk[target_col], threshold, positive_label)
+                pos = np.bincount(codes[(codes >= 0) & positive], minlength=len(uniques))
+                n_positive += int(np.count_nonzero(positive))
+            for i, g in enumerate(map(_py, uniques)):
+                sizes[g] = sizes.get(g, 0) + int(counts[i])
+                if pos is not None:
+                    original[g] = original.get(g, 0) + int(pos[i])
+            n += len(chunk)
+    if usecols is None:
+        # No chunks at all
+        score_cols = list(score_cols or [])
+    if total is None:
+        if target_col is None:
+            raise ValueError('total is required without a target column')
+        total = n_positive
+    groups = _sorted_keys(sizes)
+    gid = {g: i for i, g in enumerate(groups)}
+    size_arr = np.array([sizes[g] for g in groups], dtype=np.int64)
+    quotas = group_quotas(size_arr, n, total)
+
+    # Pass 2: running top-k per group over (group id, rank key, row position)
+    kept_g = np.empty(0, dtype=np.int64)
+    kept_key = np.empty(0, dtype=float)
+    kept_pos = np.empty(0, dtype=np.int64)
+    kept_score = np.empty(0, dtype=float)
+    offset = 0
+    with stage('rank'):
+        for chunk in _chunks(source, usecols, chunksize):
+            codes, uniques = encode(chunk[sensitive_col])
+            rows = np.flatnonzero(codes >= 0)
+            mapping = np.array([gid[g] for g in map(_py, uniques)], dtype=np.int64)
+            score = composite_score(chunk, score_cols, weights)[rows]
+            cand_g = np.concatenate([kept_g, mapping[codes[rows]]])
+            cand_key = np.concatenate([kept_key, _rank_key(score)])
+            cand_pos = np.concatenate([kept_pos, rows + offset])
+            cand_score = np.concatenate([kept_score, score])
+            # Kept rows precede the chunk's, so ties still resolve in row order
+            keep = _ranked_keep(cand_g, cand_key, quotas)
+            kept_g, kept_key, kept_pos, kept_score = cand_g[keep], cand_key[keep], cand_pos[keep], cand_score[keep]
+            offset += len(chunk)
+
+    counts = np.bincount(kept_g, minlength=len(groups))
+    cutoffs = np.full(len(groups), np.nan)
+    ends = np.cumsum(counts) - 1
+    for i in np.flatnonzero(counts):
+        cutoffs[i] = kept_score[ends[i]]
+    summary = _summary(score_cols, weights, total, groups, size_arr, quotas, counts, cutoffs,
+                       np.array([original.get(g, 0) for g in groups]) if target_col is not None else None)
+    return np.sort(kept_pos), summary
@@ -0,0 +1,202 @@
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+import pandas as pd
+import numpy as np
+
+from .groupstats import encode
+from .instrument import stage
+from .metrics import _finalize_report, bootstrap_intervals
+
+
+DEFAULT_CHUNK_ROWS = 1_000_000
+
+
+def _py(value: Any) -> Any:
+    # NumPy scalars -> plain Python values so keys merge and serialize cleanly
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _sorted_keys(keys):
+    try:
+        return sorted(keys)
+    except TypeError:
+        return list(keys)
+
+
+def _infer_positive_label_from_counts(value_counts: Dict[Any, int]) -> Any:
+    # Same rules as metrics._infer_positive_label, applied to value counts
+    vals = [v for v, c in value_counts.items() if c > 0]
+    if len(vals) == 2:
+        if set(vals) == {0, 1}:
+            return 1
+        try:
+            return sorted(vals)[-1]
+        except Exception:
+            return vals[0]
+    if not vals:
+        return None
+    # Fallback: majority class, smallest value on ties (as Series.mode)
+    top = max(value_counts[v] for v in vals)
+    tied = [v for v in vals if value_counts[v] == top]
+    return _sorted_keys(tied)[0]
+
+
+class GroupCounts:
+    """
+    Mergeable sufficient statistics for a bias report.
+
+    Holds the number of rows per (sensitive value, target value) cell, with
+    None standing for a null value. Group sizes, positive counts and the
+    inferred positive label all follow from these cells, so merging the
+    counts of chunks, files or workers gives exactly the report of the
+    concatenated data. Memory is O(groups x distinct target values) and
+    independent of the number of rows.
+    """
+
+    def __init__(self, sensitive_col: str, target_col: Optional[str] = None):
+        self.sensitive_col = sensitive_col
+        self.target_col = target_col
+        self.has_target = False
+        self.cells: Dict[Tuple[Any, Any], int] = {}
+
+    def update(self, chunk: pd.DataFrame) -> 'GroupCounts':
+        a_codes, a_uniques = encode(chunk[self.sensitive_col])
+        if self.target_col is not None and self.target_col in chunk.columns:
+            self.has_target = True
+            y_codes, y_uniques = encode(chunk[self.target_col])
+        else:
+            y_codes, y_uniques = np.zeros(len(chunk), dtype=np.intp), [None]
+
+        # Shift codes by one so that slot 0 holds the null (-1) values
+        ny = len(y_uniques) + 1
+        cell_codes = (a_codes + 1) * ny + (y_codes + 1)
+        n_cells = (len(a_uniques) + 1) * ny
+        if n_cells <= max(len(chunk), 1 << 16):
+            counts = np.bincount(cell_codes, minlength=n_cells)
+            present = np.flatnonzero(counts)
+            counts = counts[present]
+        else:
+            present, counts = np.unique(cell_codes, return_counts=True)
+
+        a_keys = [None] + [_py(v) for v in a_uniques]
+        y_keys = [None] + [_py(v) for v in y_uniques]
+        for code, c in zip(present.tolist(), counts.tolist()):
+            ai, yi = divmod(code, ny)
+            key = (a_keys[ai], y_keys[yi])
+            self.cells[key] = self.cells.get(key, 0) + c
+        return self
+
+    def merge(self, other: 'GroupCounts') -> 'GroupCounts':
+        if (other.sensitive_col, other.target_col) != (self.sensitive_col, self.target_col):
+            raise ValueError('Cannot merge GroupCounts built for different columns')
+        self.has_target = self.has_target or other.has_target
+        for key, c in other.cells.items():
+            self.cells[key] = self.cells.get(key, 0) + c
+        return self
+
+    @property
+    def total_n(self) -> int:
+        return sum(self.cells.values())
+
+    def report(
+        self,
+        positive_label: Optional[Any] = None,
+        bootstrap: int = 0,
+        ci_level: float = 0.95,
+        seed: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Build the compute_bias_report JSON from the accumulated counts."""
+        report: Dict[str, Any] = {
+            'sensitive': self.sensitive_col,
+            'target': self.target_col,
+            'groups': {},
+            'summary': {},
+            'warnings': [],
+        }
+        total_n = self.total_n
+        group_n: Dict[Any, int] = {}
+        y_counts: Dict[Any, int] = {}
+        for (g, y), c in self.cells.items():
+            if g is not None:
+                group_n[g] = group_n.get(g, 0) + c
+            if y is not None:
+                y_counts[y] = y_counts.get(y, 0) + c
+
+        has_target = self.has_target
+        pos = None
+        if has_target:
+            pos = positive_label if positive_label is not None else _infer_positive_label_from_counts(y_counts)
+            report['inferred_positive_label'] = pos
+            if pos is None:
+                has_target = False
+                report['warnings'].append('Could not infer positive_label; treating as no-target analysis.')
+
+        group_pos: Dict[Any, int] = {}
+        total_pos = 0
+        if has_target:
+            for (g, y), c in self.cells.items():
+                if y is not None and y == pos:
+                    total_pos += c
+                    if g is not None:
+                        group_pos[g] = group_pos.get(g, 0) + c
+
+        group_stats = []
+        for g in _sorted_keys(group_n):
+            g_n = group_n[g]
+            entry = {
+                'n': g_n,
+                'share': round(float(g_n / total_n if total_n else 0.0), 6),
+            }
+            if has_target:
+                entry['positive_rate'] = round(float(group_pos.get(g, 0) / g_n), 6)
+            group_stats.append((g, entry))
+
+        overall_pos_rate = float(total_pos / total_n) if has_target and total_n else 0.0
+        report = _finalize_report(report, group_stats, has_target, overall_pos_rate)
+        if bootstrap and has_target:
+            with stage('bootstrap'):
+                report['confidence_intervals'] = bootstrap_intervals(
+                    [e['n'] for _, e in group_stats],
+                    [group_pos.get(g, 0) for g, _ in group_stats],
+                    total_n, bootstrap, ci_level, seed,
+                )
+        return report
+
+
+def compute_bias_report_streaming(
+    source: Union[str, Iterable[pd.DataFrame]],
+    sensitive_col: str,
+    target_col: Optional[str] = None,
+    positive_label: Optional[Any] = None,
+    chunksize: int = DEFAULT_CHUNK_ROWS,
+    bootstrap: int = 0,
+    ci_level: float = 0.95,
+    seed: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Out-of-core variant of compute_bias_report.
+
+    ``source`` is a CSV path, read ``chunksize`` rows at a time with only the
+    sensitive and target columns parsed, or any iterable of DataFrame chunks.
+    Peak memory depends on the number of groups, not the number of rows.
+    Note that CSV chunks are typed independently, so a column that is
+    integral in some chunks and float in others may label groups either way.
+    """
+    if isinstance(source, str):
+        header = pd.read_csv(source, nrows=0).columns
+        if sensitive_col not in header:
+            return {'error': f'sensitive column {sensitive_col} missing'}
+        usecols = [c for c in (sensitive_col, target_col) if c is not None and c in header]
+        source = pd.read_csv(source, usecols=usecols, chunksize=chunksize)
+
+    counts = GroupCounts(sensitive_col, target_col)
+    chunks = iter(source)
+    while True:
+        with stage('read_chunk'):
+            chunk = next(chunks, None)
+        if chunk is None:
+            break
+        if sensitive_col not in chunk.columns:
+            return {'error': f'sensitive column {sensitive_col} missing'}
+        with stage('group_stats'):
+            counts.update(chunk)
+    return counts.report(positive_label, bootstrap=bootstrap, ci_level=ci_level, seed=seed)
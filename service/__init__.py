@@ -0,0 +1 @@
+# service package: runtime infrastructure for the Flask app
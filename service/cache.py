@@ -0,0 +1,179 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, Optional
+
+if TYPE_CHECKING:
+    # Only for annotations: importing this module must stay cheap at startup
+    import pandas as pd
+
+
+def frame_nbytes(df: 'pd.DataFrame') -> int:
+    """Deep in-memory size of a DataFrame, including object payloads."""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+class DatasetCache:
+    """
+    Thread-safe LRU cache of parsed DataFrames bounded by a byte budget.
+
+    Sizes are measured once on insert with ``memory_usage(deep=True)``. When
+    the budget is exceeded the least recently used entries are evicted; a
+    single frame larger than the whole budget is returned but not cached.
+    Cached frames are shared between requests and must be treated as
+    read-only by callers.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = int(max_bytes)
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional['pd.DataFrame']:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, df: 'pd.DataFrame') -> None:
+        size = frame_nbytes(df)
+        with self._lock:
+            self._discard(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (df, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                _, (_, old_size) = self._entries.popitem(last=False)
+                self._bytes -= old_size
+                self.evictions += 1
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], 'pd.DataFrame']) -> 'pd.DataFrame':
+        df = self.get(key)
+        if df is None:
+            df = loader()
+            self.put(key, df)
+        return df
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._discard(key)
+
+    def _discard(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 6) if lookups else None,
+            }
+
+
+def file_sha256(path: str, chunk_bytes: int = 1 << 20) -> str:
+    """SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_bytes), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def report_key(content_hash: str, sensitive_col: str, target_col: Optional[str] = None,
+               positive_label: Any = None, **options: Any) -> str:
+    """
+    Cache key (and HTTP ETag) for a bias report: a digest of the dataset
+    content hash, the report columns and any options that change the report.
+    Values are JSON-encoded, so 1 and '1' give different keys.
+    """
+    payload = json.dumps([content_hash, sensitive_col, target_col, positive_label, sorted(options.items())],
+                         default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ReportCache:
+    """
+    Thread-safe LRU cache of computed bias reports with a time-to-live.
+
+    Keys come from ``report_key``, so a report is shared by every upload
+    with the same content. At most ``max_entries`` reports are kept and an
+    entry older than ``ttl_seconds`` is treated as missing. Cached reports
+    are shared and must be treated as read-only by callers.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = int(max_entries)
+        self.ttl_seconds = float(ttl_seconds)
+        self._clock = clock
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() - entry[1] > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, report: Dict[str, Any]) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (report, self._clock())
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key: str, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Cached report for ``key``; error reports are returned but not cached."""
+        report = self.get(key)
+        if report is None:
+            report = compute()
+            if 'error' not in report:
+                self.put(key, report)
+        return report
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': round(self.hits / lookups, 6) if lookups else None,
+            }
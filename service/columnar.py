@@ -0,0 +1,73 @@
+import os
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    HAVE_ARROW = True
+except ImportError:  # pragma: no cover - pyarrow is optional
+    pa = feather = None
+    HAVE_ARROW = False
+
+
+COLUMNAR_SUFFIX = '.arrow'
+
+
+def columnar_path(csv_path: str) -> str:
+    """Location of the Arrow IPC copy that sits next to an uploaded CSV."""
+    return os.path.splitext(csv_path)[0] + COLUMNAR_SUFFIX
+
+
+def write_columnar_from_csv(csv_path: str, path: str, dtypes: Optional[Dict[str, str]] = None,
+                            chunk_rows: int = 1_000_000) -> Optional[str]:
+    """
+    Convert a CSV to an uncompressed Arrow IPC (Feather v2) file, parsing
+    ``chunk_rows`` rows at a time so memory stays bounded by the chunk.
+    Uncompressed buffers can be memory-mapped, so readers pay only for the
+    columns they touch and worker processes share the OS page cache.
+
+    ``dtypes`` are read_csv hints (as produced by the ingest profiler) that
+    keep every chunk on the whole-file dtype; a chunk that still does not fit
+    the schema of the first one abandons the conversion. Returns the written
+    path, or None.
+    """
+    if not HAVE_ARROW:
+        return None
+    tmp_path = path + '.tmp'
+    writer = None
+    try:
+        for chunk in pd.read_csv(csv_path, dtype=dtypes, chunksize=chunk_rows):
+            if writer is None:
+                schema = pa.Table.from_pandas(chunk, preserve_index=False).schema
+                writer = pa.ipc.new_file(tmp_path, schema)
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+        if writer is None:
+            return None
+        writer.close()
+        os.replace(tmp_path, path)
+    except Exception:
+        if writer is not None:
+            try:
+                writer.close()
+            except Exception:
+                pass
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
+    return path
+
+
+def read_columnar(path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Memory-map an Arrow IPC file and materialize only ``columns``."""
+    table = feather.read_table(path, columns=columns, memory_map=True)
+    return table.to_pandas()
+
+
+def iter_columnar_batches(path: str, columns: Optional[List[str]] = None,
+                          batch_rows: int = 1_000_000) -> Iterator[pd.DataFrame]:
+    """Yield ``columns`` of a memory-mapped Arrow IPC file in row batches."""
+    table = feather.read_table(path, columns=columns, memory_map=True)
+    for batch in table.to_batches(max_chunksize=batch_rows):
+        yield batch.to_pandas()
@@ -0,0 +1,207 @@
+import os
+import zlib
+from typing import Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstd is optional
+    zstandard = None
+
+
+def supported_encodings() -> list:
+    """Content encodings available for exports, most preferred first."""
+    return (['zstd'] if zstandard is not None else []) + ['gzip', 'identity']
+
+
+def choose_encoding(requested: Optional[str], accept_encodings=None) -> str:
+    """
+    Pick the content encoding for an export: an explicitly requested one if
+    supported, otherwise the best supported one the client accepts
+    (``accept_encodings`` is werkzeug's ``request.accept_encodings``).
+    """
+    available = supported_encodings()
+    if requested:
+        return requested if requested in available else 'identity'
+    if accept_encodings is not None:
+        for encoding in available:
+            if encoding != 'identity' and accept_encodings[encoding]:
+                return encoding
+    return 'identity'
+
+
+def iter_csv_chunks(df: pd.DataFrame, chunk_rows: int = 50_000) -> Iterator[bytes]:
+    """Encode ``df`` as CSV ``chunk_rows`` rows at a time (header first)."""
+    n = len(df)
+    if n == 0:
+        yield df.to_csv(index=False).encode('utf-8')
+        return
+    for start in range(0, n, chunk_rows):
+        yield df.iloc[start:start + chunk_rows].to_csv(index=False, header=start == 0).encode('utf-8')
+
+
+def _quote_state(line: bytes, in_quotes: bool) -> Tuple[bool, int]:
+    # Walk the quote characters of one physical line: a quote opens a field
+    # only at the start of a field (as in the pandas parser), "" inside a
+    # quoted field is an escaped quote. Returns the quote state at the end
+    # of the line and the delimiters seen outside quotes.
+    delimiters = 0
+    i = 0
+    while True:
+        j = line.find(b'"', i)
+        if in_quotes:
+            if j < 0:
+                return True, delimiters
+            if line[j + 1:j + 2] == b'"':
+                i = j + 2
+            else:
+                in_quotes, i = False, j + 1
+            continue
+        delimiters += line.count(b',', i, j if j >= 0 else len(line))
+        if j < 0:
+            return False, delimiters
+        if j == 0 or line[j - 1:j] == b',':
+            in_quotes = True
+        i = j + 1
+
+
+def iter_csv_records(csv_path: str) -> Iterator[Tuple[bytes, int]]:
+    """
+    Raw records of a CSV file as (bytes without the line terminator, number
+    of field delimiters), header first. Newlines inside quoted fields stay
+    in their record and blank lines are skipped, as read_csv does, so the
+    records after the header line up with the rows of a full parse.
+    """
+    with open(csv_path, 'rb') as f:
+        record, delimiters, in_quotes = b'', 0, False
+        for line in f:
+            if not in_quotes and b'"' not in line:
+                if line.strip():
+                    yield line.rstrip(b'\r\n'), line.count(b',')
+                continue
+            in_quotes, seen = _quote_state(line, in_quotes)
+            record += line
+            delimiters += seen
+            if not in_quotes:
+                if record.strip():
+                    yield record.rstrip(b'\r\n'), delimiters
+                record, delimiters = b'', 0
+        if record.strip():
+            yield record.rstrip(b'\r\n'), delimiters
+
+
+def count_csv_records(csv_path: str) -> int:
+    """Rows after the header as iter_csv_records splits them."""
+    return sum(1 for _ in iter_csv_records(csv_path)) - 1
+
+
+def iter_csv_with_column(csv_path: str, name: str, values: np.ndarray, n_fields: int,
+                         chunk_rows: int = 50_000) -> Iterator[bytes]:
+    """
+    Stream the CSV at ``csv_path`` with one column appended, without parsing
+    the existing fields: every record is copied byte for byte and gets
+    ``values[i]`` formatted as to_csv would. Short records are padded to
+    ``n_fields`` first so the new column lines up. Raises ValueError if the
+    file does not have exactly ``len(values)`` rows.
+    """
+    records = iter_csv_records(csv_path)
+    header, _ = next(records, (b'', 0))
+    if header.startswith(b'\xef\xbb\xbf'):
+        header = header[3:]
+    yield header + b',' + name.encode('utf-8') + b'\n'
+
+    n = len(values)
+    row = 0
+    out = []
+    for record, delimiters in records:
+        if row >= n:
+            raise ValueError(f'{csv_path} has more than {n} rows')
+        value = values[row]
+        pad = b',' * (n_fields - 1 - delimiters) if delimiters < n_fields - 1 else b''
+        out.append(record + pad + b',' + (repr(float(value)).encode() if value == value else b''))
+        row += 1
+        if len(out) >= chunk_rows:
+            out.append(b'')
+            yield b'\n'.join(out)
+            out = []
+    if out:
+        out.append(b'')
+        yield b'\n'.join(out)
+    if row != n:
+        raise ValueError(f'{csv_path} has {row} rows, expected {n}')
+
+
+def _write_atomic(out_path: str, chunks: Iterable[bytes]) -> str:
+    # Write to a .part file renamed into place, so nothing is left behind on error
+    tmp_path = out_path + '.part'
+    try:
+        with open(tmp_path, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(tmp_path, out_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return out_path
+
+
+def write_csv_with_column(csv_path: str, out_path: str, name: str, values: np.ndarray, n_fields: int,
+                          chunk_rows: int = 50_000) -> str:
+    """File variant of iter_csv_with_column; nothing is left behind on error."""
+    return _write_atomic(out_path, iter_csv_with_column(csv_path, name, values, n_fields, chunk_rows))
+
+
+def iter_sidecar_csv(name: str, values: np.ndarray, chunk_rows: int = 50_000, keyed: bool = True) -> Iterator[bytes]:
+    """
+    Encode a single array as a sidecar CSV, ``chunk_rows`` rows at a time.
+    With ``keyed`` every value is preceded by a ``row`` column holding its
+    0-based row number in the upload, so the file joins back with
+    ``read_csv(sidecar, index_col='row')``; otherwise ``name`` is the only
+    column.
+    """
+    n = len(values)
+    if n == 0:
+        yield ((b'row,' if keyed else b'') + name.encode('utf-8') + b'\n')
+        return
+    for start in range(0, n, chunk_rows):
+        part = {name: values[start:start + chunk_rows]}
+        if keyed:
+            part = {'row': np.arange(start, min(start + chunk_rows, n)), **part}
+        yield pd.DataFrame(part).to_csv(index=False, header=start == 0).encode('utf-8')
+
+
+def write_sidecar_csv(out_path: str, name: str, values: np.ndarray, chunk_rows: int = 50_000,
+                      keyed: bool = True) -> str:
+    """File variant of iter_sidecar_csv; nothing is left behind on error."""
+    return _write_atomic(out_path, iter_sidecar_csv(name, values, chunk_rows, keyed))
+
+
+def encode_stream(chunks: Iterable[bytes], encoding: str = 'identity') -> Iterator[bytes]:
+    """Apply gzip/zstd content encoding to a stream of byte chunks."""
+    if encoding == 'identity':
+        yield from chunks
+        return
+    if encoding == 'gzip':
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+        for chunk in chunks:
+            out = compressor.compress(chunk)
+            if out:
+                yield out
+        yield compressor.flush()
+        return
+    if encoding == 'zstd' and zstandard is not None:
+        compressor = zstandard.ZstdCompressor().compressobj()
+        for chunk in chunks:
+            out = compressor.compress(chunk)
+            if out:
+                yield out
+        yield compressor.flush()
+        return
+    raise ValueError(f'Unsupported encoding {encoding}')
+
+
+def encode_csv(df: pd.DataFrame, encoding: str = 'identity', chunk_rows: int = 50_000) -> bytes:
+    """Whole-file variant for callers that need bytes (e.g. st.download_button)."""
+    return b''.join(encode_stream(iter_csv_chunks(df, chunk_rows), encoding))
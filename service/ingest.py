@@ -0,0 +1,88 @@
+import hashlib
+import os
+import uuid
+from typing import Optional
+
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from .profiling import CsvProfiler
+from .storage import hold
+
+
+class IngestSink:
+    """
+    File-like target for werkzeug's multipart parser.
+
+    Upload chunks are written straight to a temporary file in the upload
+    directory and fed to a CsvProfiler as they arrive, so the body is never
+    held in memory and no second read is needed to validate or profile it.
+    The body's SHA-256 is computed on the way through as well
+    (``content_hash``). Exceeding ``max_bytes`` aborts the request with 413.
+    A sink that is closed without being committed removes its temporary
+    file, so rejected or abandoned uploads leave nothing behind.
+    """
+
+    def __init__(self, directory: str, max_bytes: Optional[int] = None, profiler: Optional[CsvProfiler] = None):
+        self.path = os.path.join(directory, f'.incoming-{uuid.uuid4().hex}.part')
+        self.max_bytes = max_bytes
+        self.profiler = profiler or CsvProfiler()
+        self.bytes_written = 0
+        self._sha256 = hashlib.sha256()
+        self._file = open(self.path, 'w+b')
+        # Keeps storage sweeps off the part while the upload is in progress
+        hold(self._file)
+        self._finished = False
+        self._committed = False
+
+    def write(self, data: bytes) -> int:
+        self.bytes_written += len(data)
+        if self.max_bytes is not None and self.bytes_written > self.max_bytes:
+            self.discard()
+            raise RequestEntityTooLarge(f'Upload exceeds the {self.max_bytes} byte limit')
+        self.profiler.feed(bytes(data))
+        self._sha256.update(data)
+        return self._file.write(data)
+
+    @property
+    def content_hash(self) -> str:
+        return self._sha256.hexdigest()
+
+    def finish(self) -> CsvProfiler:
+        """Flush the file and finalize the profile once the body is consumed."""
+        if not self._finished:
+            self._finished = True
+            self._file.flush()
+            self.profiler.close()
+        return self.profiler
+
+    def commit(self, final_path: str) -> None:
+        self.finish()
+        self._file.close()
+        os.replace(self.path, final_path)
+        self.path = final_path
+        self._committed = True
+
+    def discard(self) -> None:
+        self._file.close()
+        if not self._committed and os.path.exists(self.path):
+            os.remove(self.path)
+
+    # Minimal file protocol used by werkzeug's FileStorage
+    def seek(self, *args) -> int:
+        return self._file.seek(*args)
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def read(self, *args) -> bytes:
+        return self._file.read(*args)
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self.discard()
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
@@ -0,0 +1,201 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED_STATES = {SUCCEEDED, FAILED, CANCELLED}
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when cancellation was requested."""
+
+
+class Job:
+    def __init__(self, kind: str):
+        self.id = str(uuid.uuid4())
+        self.kind = kind
+        self.status = QUEUED
+        self.stage: Optional[str] = None
+        self.fraction = 0.0
+        self.result: Optional[Dict[str, Any]] = None
+        self.http_status: Optional[int] = None
+        self.error: Optional[str] = None
+        self.timings: Optional[Dict[str, float]] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.future = None
+        self.on_progress: Optional[Callable[['Job'], None]] = None
+        self._cancel = threading.Event()
+        self._synced_at = 0.0
+
+    def progress(self, stage: str, fraction: float) -> None:
+        """Record progress and act as a cancellation checkpoint."""
+        if self._cancel.is_set():
+            raise JobCancelled()
+        self.stage = stage
+        self.fraction = max(self.fraction, min(float(fraction), 1.0))
+        if self.on_progress is not None:
+            self.on_progress(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'job_id': self.id,
+            'type': self.kind,
+            'status': self.status,
+            'stage': self.stage,
+            'progress': round(self.fraction, 4),
+            'result': self.result,
+            'http_status': self.http_status,
+            'error': self.error,
+            'timings': self.timings,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+
+
+class JobQueue:
+    """
+    In-process job queue on a bounded thread pool.
+
+    Work functions take the Job as their last argument, report progress with
+    ``job.progress(stage, fraction)`` (which doubles as a cancellation
+    checkpoint) and return a ``(payload, http_status)`` pair like the
+    synchronous endpoints. At most ``max_jobs`` jobs are remembered; the
+    oldest finished ones are forgotten first.
+
+    Jobs run in the process that took the request. With a ``store`` (the
+    DatasetRegistry) their state is also written there when they start and
+    finish and at most every ``sync_seconds`` in between, so state() and
+    request_cancel() work from any worker process; a cancel requested
+    elsewhere is picked up at the job's next progress checkpoint. Stored
+    jobs are forgotten ``retention_seconds`` after their last update.
+    """
+
+    def __init__(self, workers: int, max_jobs: int = 1000, store=None, sync_seconds: float = 1.0,
+                 retention_seconds: float = 86400.0, name: str = 'job'):
+        self._executor = ThreadPoolExecutor(max_workers=max(int(workers), 1), thread_name_prefix=name)
+        self._jobs: 'OrderedDict[str, Job]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_jobs = max_jobs
+        self.store = store
+        self.sync_seconds = float(sync_seconds)
+        self.retention_seconds = float(retention_seconds)
+        self._pruned_at = 0.0
+
+    def submit(self, kind: str, fn: Callable[..., Tuple[Dict[str, Any], int]], *args) -> Job:
+        job = Job(kind)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        if self.store is not None:
+            self._prune_store()
+            job.on_progress = self._sync
+            self._sync(job, force=True)
+        job.future = self._executor.submit(self._run, job, fn, args)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """A job of this process."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def state(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """to_dict() of a job run by this or (through the store) any other process."""
+        job = self.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        return self.store.get_job(job_id) if self.store is not None else None
+
+    def request_cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Cancel a job run by this or any other process; returns its state. A
+        job of another process reports the cancel once that process sees it.
+        """
+        job = self.cancel(job_id)
+        if job is not None:
+            return job.to_dict()
+        return self.store.request_cancel(job_id) if self.store is not None else None
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        job = self.get(job_id)
+        if job is None or job.status in FINISHED_STATES:
+            return job
+        job._cancel.set()
+        if job.future is not None and job.future.cancel():
+            # Never started: finish it here since _run will not
+            self._finish(job, CANCELLED)
+        return job
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            counts = {state: 0 for state in (QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED)}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return counts
+
+    def _sync(self, job: Job, force: bool = False) -> None:
+        # Write the job's state to the store, throttled unless forced, and
+        # pick up a cancel requested through another process
+        if self.store is None:
+            return
+        now = time.time()
+        if not force and now - job._synced_at < self.sync_seconds:
+            return
+        job._synced_at = now
+        if self.store.put_job(job.to_dict()):
+            job._cancel.set()
+
+    def _run(self, job: Job, fn, args) -> None:
+        if job._cancel.is_set():
+            self._finish(job, CANCELLED)
+            return
+        job.status = RUNNING
+        job.started_at = time.time()
+        self._sync(job, force=True)
+        if job._cancel.is_set():
+            self._finish(job, CANCELLED)
+            return
+        try:
+            payload, http_status = fn(*args, job)
+        except JobCancelled:
+            self._finish(job, CANCELLED)
+        except Exception as e:
+            job.error = str(e)
+            self._finish(job, FAILED)
+        else:
+            job.result, job.http_status = payload, http_status
+            if http_status >= 400:
+                job.error = payload.get('error') if isinstance(payload, dict) else None
+                self._finish(job, FAILED)
+            else:
+                job.fraction = 1.0
+                self._finish(job, SUCCEEDED)
+
+    def _finish(self, job: Job, status: str) -> None:
+        job.status = status
+        job.finished_at = time.time()
+        self._sync(job, force=True)
+
+    def _prune_store(self) -> None:
+        # At most hourly, however often jobs are submitted
+        now = time.time()
+        if now - self._pruned_at > min(self.retention_seconds, 3600.0):
+            self._pruned_at = now
+            self.store.prune_jobs(now - self.retention_seconds)
+
+    def _prune(self) -> None:
+        excess = len(self._jobs) - self.max_jobs
+        if excess <= 0:
+            return
+        for job_id in [jid for jid, job in self._jobs.items() if job.status in FINISHED_STATES][:excess]:
+            del self._jobs[job_id]
@@ -0,0 +1,121 @@
+import math
+import os
+import threading
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+
+# Seconds: 1 ms .. ~5 min
+DEFAULT_TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+# Rows: 100 .. 100M
+DEFAULT_ROW_BUCKETS = tuple(10.0 ** k for k in range(2, 9))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _num(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Histogram:
+    """Thread-safe Prometheus histogram with a fixed set of label names."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_TIME_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(n, '')) for n in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self, const: Tuple[Tuple[str, str], ...] = ()) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            items = [(key, list(s[0]), s[1], s[2]) for key, s in sorted(self._series.items())]
+        names = tuple(n for n, _ in const) + self.labelnames
+        for key, counts, total, count in items:
+            values = tuple(v for _, v in const) + key
+            for bound, c in zip(self.buckets, counts):
+                le = 'le="%s"' % _num(bound)
+                lines.append(f'{self.name}_bucket{_labels(names, values, le)} {c}')
+            lines.append(f'{self.name}_sum{_labels(names, values)} {_num(total)}')
+            lines.append(f'{self.name}_count{_labels(names, values)} {count}')
+        return lines
+
+
+class Collected:
+    """Counter or gauge values read from a callback at scrape time."""
+
+    def __init__(self, name: str, documentation: str, kind: str,
+                 collect: Callable[[], Iterable[Tuple[Dict[str, str], float]]]):
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.collect = collect
+
+    def render(self, const: Tuple[Tuple[str, str], ...] = ()) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        for labels, value in self.collect():
+            names = [n for n, _ in const] + sorted(labels)
+            values = [v for _, v in const] + [labels[n] for n in sorted(labels)]
+            lines.append(f'{self.name}{_labels(names, values)} {_num(value)}')
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Per-process metric set rendered in the Prometheus text exposition format.
+
+    Under gunicorn every worker keeps its own values and a scrape reaches
+    whichever worker answers it, so every sample carries a ``worker_label``
+    with the serving process id (read at render time, so it is the worker's
+    and not a preloading master's). Sum over it, e.g.
+    ``sum without (pid) (rate(...))``, for service-wide figures; an empty
+    ``worker_label`` leaves samples unlabelled.
+    """
+
+    def __init__(self, worker_label: str = 'pid'):
+        self.worker_label = worker_label
+        self._metrics: List = []
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_TIME_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def collected(self, name: str, documentation: str, kind: str,
+                  collect: Callable[[], Iterable[Tuple[Dict[str, str], float]]]) -> Collected:
+        metric = Collected(name, documentation, kind, collect)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        const = ((self.worker_label, str(os.getpid())),) if self.worker_label else ()
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render(const))
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,282 @@
+import codecs
+import io
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from bias.sampling import Reservoir
+
+
+# Registry dtypes that read_csv accepts as explicit hints unchanged
+_HINTABLE_DTYPES = ('int64', 'float64', 'bool')
+
+
+def read_hints(dtypes: Dict[str, str], columns: List[str], categorical: Iterable[str] = ()) -> Dict[str, str]:
+    """
+    read_csv ``dtype`` hints for a column projection, from the dtypes
+    recorded at upload. String columns listed in ``categorical`` are read as
+    'category' (one code per row instead of one Python object); other
+    string columns are left to inference.
+    """
+    categorical = set(categorical)
+    hints: Dict[str, str] = {}
+    for col in columns:
+        dtype = dtypes.get(col)
+        if dtype in _HINTABLE_DTYPES:
+            hints[col] = dtype
+        elif dtype == 'object' and col in categorical:
+            hints[col] = 'category'
+    return hints
+
+
+# Decoded text accumulated before a batch of complete records is parsed
+DEFAULT_BATCH_CHARS = 8 * 1024 * 1024
+# Hashes kept per column by the distinct-count (k minimum values) sketch
+DEFAULT_SKETCH_SIZE = 1024
+
+# Order in which per-batch type guesses widen when merged
+_KIND_RANK = {'bool': 0, 'int': 1, 'float': 2, 'string': 3}
+
+
+def _merge_kind(a: Optional[str], b: Optional[str]) -> Optional[str]:
+    if a is None or a == b:
+        return b
+    if b is None:
+        return a
+    if 'bool' in (a, b) or 'string' in (a, b):
+        return 'string'
+    return a if _KIND_RANK[a] > _KIND_RANK[b] else b
+
+
+class _ColumnStats:
+    """Mergeable per-column profile built from batches of string values."""
+
+    def __init__(self, sketch_size: int):
+        self.sketch_size = sketch_size
+        self.kind: Optional[str] = None
+        self.nulls = 0
+        self.count = 0
+        self.sketch = np.empty(0, dtype=np.uint64)
+        self.min = np.inf
+        self.max = -np.inf
+        self.sum = 0.0
+
+    def update(self, values: pd.Series) -> None:
+        strings = values.to_numpy(dtype=object)
+        missing = pd.isna(strings)
+        n_missing = int(missing.sum())
+        if n_missing:
+            self.nulls += n_missing
+            strings = strings[~missing]
+        if not len(strings):
+            return
+        self.count += len(strings)
+        nums = text = None
+        if self.kind != 'string':
+            # Nothing widens past string, so text columns skip the numeric
+            # parse. A plain cast is all it takes: one unparsable value makes
+            # the batch text. Character checks run on the joined batch, far
+            # faster than the .str accessor on object values
+            try:
+                nums = strings.astype(float)
+                text = ''.join(strings)
+            except (TypeError, ValueError):
+                pass
+            if text is not None and '_' in text:
+                # Python's float() takes "1_000"; the CSV parser does not
+                nums = None
+        # Numbers are hashed by value, far cheaper than hashing their text
+        self._sketch(pd.util.hash_array(nums if nums is not None else strings))
+        if self.kind == 'string':
+            return
+
+        if nums is not None:
+            self.min = min(self.min, float(nums.min()))
+            self.max = max(self.max, float(nums.max()))
+            self.sum += float(nums.sum())
+            integral = np.isfinite(nums).all() and (nums == np.round(nums)).all() and '.' not in text
+            kind = 'int' if integral else 'float'
+        else:
+            flags = ('true', 'false')
+            kind = 'bool' if all(str(u).lower() in flags for u in pd.unique(strings)) else 'string'
+        self.kind = _merge_kind(self.kind, kind)
+
+    def _sketch(self, hashes: np.ndarray) -> None:
+        # Keep the k smallest distinct hashes. Once the sketch is full only
+        # hashes below its largest can enter, and otherwise a hash-based
+        # unique plus a partition bound the sort to k values, not the batch
+        k = self.sketch_size
+        if len(self.sketch) == k:
+            hashes = hashes[hashes < self.sketch[-1]]
+        hashes = pd.unique(hashes)
+        if len(hashes) > k:
+            hashes = np.partition(hashes, k - 1)[:k]
+        self.sketch = np.unique(np.concatenate([self.sketch, hashes]))[:k]
+
+    def distinct(self):
+        """(estimate, exact) from the k-minimum-values sketch."""
+        if len(self.sketch) < self.sketch_size:
+            return len(self.sketch), True
+        kth = float(self.sketch[-1]) / 2.0 ** 64
+        return int(round((self.sketch_size - 1) / kth)), False
+
+    def dtype(self) -> str:
+        # The dtype pandas.read_csv would infer for the whole column
+        if self.kind is None:
+            return 'float64'
+        if self.kind == 'int':
+            return 'int64' if self.nulls == 0 else 'float64'
+        if self.kind == 'float':
+            return 'float64'
+        if self.kind == 'bool':
+            return 'bool' if self.nulls == 0 else 'object'
+        return 'object'
+
+    def read_dtype(self) -> Optional[str]:
+        # read_csv hint that keeps every chunk of a chunked read on the
+        # whole-file dtype (booleans with nulls have no such hint)
+        if self.kind == 'bool' and self.nulls:
+            return None
+        if self.kind == 'string':
+            return 'str'
+        return self.dtype()
+
+    def profile(self) -> Dict[str, Any]:
+        distinct, exact = self.distinct()
+        entry: Dict[str, Any] = {
+            'dtype': self.dtype(),
+            'nulls': self.nulls,
+            'distinct': distinct,
+            'distinct_exact': exact,
+        }
+        if self.kind in ('int', 'float') and self.count:
+            entry['min'] = self.min
+            entry['max'] = self.max
+            entry['mean'] = round(self.sum / self.count, 6)
+        return entry
+
+
+class CsvProfiler:
+    """
+    Single-pass CSV validator and column profiler fed with raw byte chunks.
+
+    Decoded text is cut into batches of complete records (a newline only
+    ends a record outside quotes) and each batch is parsed with the pandas C
+    parser as strings. The header is validated on the first batch, rows are
+    counted per batch, and every column gets null counts, a dtype guess,
+    numeric min/max/mean and a k-minimum-values distinct-count sketch.
+    With ``sample_rows``, a uniform reservoir sample of that many records is
+    drawn in the same pass (``sample()``, values as strings). Memory stays
+    bounded by the batch, sketch and sample sizes, whatever the file size.
+    ``error`` is set instead of raising when the input is not a valid CSV.
+    """
+
+    def __init__(self, batch_chars: int = DEFAULT_BATCH_CHARS, sketch_size: int = DEFAULT_SKETCH_SIZE,
+                 sample_rows: int = 0, seed: Optional[int] = None):
+        self.batch_chars = batch_chars
+        self.sketch_size = sketch_size
+        self.reservoir = Reservoir(sample_rows, seed) if sample_rows > 0 else None
+        self.columns: Optional[List[str]] = None
+        self.n_rows = 0
+        self.error: Optional[str] = None
+        self._stats: List[_ColumnStats] = []
+        self._decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        # Decoded text not yet parsed: a list of chunks, joined only when a
+        # batch is cut so the unparsed tail is not copied on every feed
+        self._chunks: List[str] = []
+        self._pending_chars = 0
+
+    def feed(self, data: bytes) -> None:
+        if self.error:
+            return
+        try:
+            text = self._decoder.decode(data)
+        except UnicodeDecodeError as e:
+            self.error = f'File is not valid UTF-8: {e}'
+            return
+        self._chunks.append(text)
+        self._pending_chars += len(text)
+        if self._pending_chars >= self.batch_chars:
+            pending = ''.join(self._chunks)
+            cut = self._record_boundary(pending)
+            if cut > 0:
+                batch, pending = pending[:cut], pending[cut:]
+                self._parse(batch)
+            self._chunks = [pending] if pending else []
+            self._pending_chars = len(pending)
+
+    def close(self) -> None:
+        if self.error:
+            return
+        try:
+            self._chunks.append(self._decoder.decode(b'', final=True))
+        except UnicodeDecodeError as e:
+            self.error = f'File is not valid UTF-8: {e}'
+            return
+        batch = ''.join(self._chunks)
+        self._chunks, self._pending_chars = [], 0
+        if batch.strip():
+            self._parse(batch)
+        if self.error is None:
+            if self.columns is None:
+                self.error = 'No columns to parse from file'
+            elif self.n_rows == 0:
+                self.error = 'The CSV file is empty'
+
+    @staticmethod
+    def _record_boundary(text: str) -> int:
+        # End of the last complete record: a newline preceded by an even
+        # number of quote characters
+        idx = text.rfind('\n')
+        while idx >= 0 and text.count('"', 0, idx) % 2:
+            idx = text.rfind('\n', 0, idx)
+        return idx + 1
+
+    def _parse(self, text: str) -> None:
+        if self.error:
+            return
+        first = self.columns is None
+        try:
+            if first:
+                batch = pd.read_csv(io.StringIO(text), header=0, dtype=object)
+            else:
+                # Fixed names, so a batch that opens with a short row pads it
+                # (and later ones) with nulls as a full read would, instead
+                # of taking its field count from that row
+                batch = pd.read_csv(io.StringIO(text), header=None, names=range(len(self.columns)), dtype=object)
+        except pd.errors.EmptyDataError:
+            if first:
+                self.error = 'No columns to parse from file'
+            return
+        except Exception as e:
+            self.error = str(e).strip()
+            return
+
+        if first:
+            self.columns = [str(c) for c in batch.columns]
+            self._stats = [_ColumnStats(self.sketch_size) for _ in self.columns]
+        elif not isinstance(batch.index, pd.RangeIndex):
+            # A long first row turns the extra leading fields into an index
+            self.error = f'Expected {len(self.columns)} fields, saw more (after row {self.n_rows})'
+            return
+        self.n_rows += len(batch)
+        for i, stats in enumerate(self._stats):
+            stats.update(batch.iloc[:, i])
+        if self.reservoir is not None:
+            batch.columns = self.columns
+            self.reservoir.update(batch)
+
+    def sample(self) -> Optional[pd.DataFrame]:
+        """The reservoir sample in file order, or None without ``sample_rows``."""
+        return self.reservoir.sample() if self.reservoir is not None else None
+
+    def dtypes(self) -> Dict[str, str]:
+        return {col: stats.dtype() for col, stats in zip(self.columns or [], self._stats)}
+
+    def read_dtypes(self) -> Dict[str, str]:
+        hints = {col: stats.read_dtype() for col, stats in zip(self.columns or [], self._stats)}
+        return {col: hint for col, hint in hints.items() if hint is not None}
+
+    def profiles(self) -> Dict[str, Dict[str, Any]]:
+        return {col: stats.profile() for col, stats in zip(self.columns or [], self._stats)}
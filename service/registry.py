@@ -0,0 +1,195 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional
+
+
+# Registry fields stored as JSON text
+_JSON_FIELDS = ('columns', 'dtypes', 'profiles')
+_FIELDS = ('path', 'filename', 'n_rows', 'n_cols', 'columns', 'dtypes', 'profiles', 'columnar_path', 'content_hash',
+           'sample_path')
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS datasets (
+    file_id       TEXT PRIMARY KEY,
+    path          TEXT NOT NULL,
+    filename      TEXT NOT NULL,
+    n_rows        INTEGER NOT NULL,
+    n_cols        INTEGER NOT NULL,
+    columns       TEXT NOT NULL,
+    dtypes        TEXT,
+    profiles      TEXT,
+    columnar_path TEXT,
+    content_hash  TEXT,
+    sample_path   TEXT,
+    created_at    REAL NOT NULL,
+    accessed_at   REAL
+)
+'''
+# Status and result of async jobs, so any worker can answer a poll for a job
+# another worker runs; ``state`` is the JSON of Job.to_dict()
+_JOBS_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id           TEXT PRIMARY KEY,
+    state            TEXT NOT NULL,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    updated_at       REAL NOT NULL
+)
+'''
+# Nullable columns added after the first release, created on older databases
+_ADDED_COLUMNS = {'content_hash': 'TEXT', 'sample_path': 'TEXT', 'accessed_at': 'REAL'}
+
+
+class DatasetRegistry:
+    """
+    Upload metadata shared by every worker process through SQLite in WAL mode.
+
+    Behaves like the read side of a dict keyed by file_id (``in``, ``[]``,
+    ``get``) and returns plain metadata dicts. Returned dicts are snapshots:
+    changes must go through ``put`` or ``update`` to be seen by other
+    workers. Each thread gets its own connection. Nothing touches the disk
+    until first use, when the database directory and schema are created
+    once per process.
+
+    The same database holds the state of async jobs (``put_job``,
+    ``get_job``), which lives in whichever worker runs the job.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def _setup(self) -> None:
+        with self._lock:
+            if self._ready:
+                return
+            directory = os.path.dirname(os.path.abspath(self.db_path))
+            os.makedirs(directory, exist_ok=True)
+            with sqlite3.connect(self.db_path, timeout=30) as conn:
+                conn.row_factory = sqlite3.Row
+                conn.execute(_SCHEMA)
+                conn.execute(_JOBS_SCHEMA)
+                existing = {row['name'] for row in conn.execute('PRAGMA table_info(datasets)')}
+                for column, sql_type in _ADDED_COLUMNS.items():
+                    if column not in existing:
+                        conn.execute(f'ALTER TABLE datasets ADD COLUMN {column} {sql_type}')
+            conn.close()
+            self._ready = True
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            if not self._ready:
+                self._setup()
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _decode(row: sqlite3.Row) -> Dict[str, Any]:
+        meta = {field: row[field] for field in _FIELDS}
+        for field in _JSON_FIELDS:
+            meta[field] = json.loads(meta[field]) if meta[field] is not None else None
+        return meta
+
+    def get(self, file_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        if not file_id:
+            return None
+        row = self._conn().execute('SELECT * FROM datasets WHERE file_id = ?', (file_id,)).fetchone()
+        return self._decode(row) if row is not None else None
+
+    def __getitem__(self, file_id: str) -> Dict[str, Any]:
+        meta = self.get(file_id)
+        if meta is None:
+            raise KeyError(file_id)
+        return meta
+
+    def __contains__(self, file_id: object) -> bool:
+        if not isinstance(file_id, str):
+            return False
+        row = self._conn().execute('SELECT 1 FROM datasets WHERE file_id = ?', (file_id,)).fetchone()
+        return row is not None
+
+    def __iter__(self) -> Iterator[str]:
+        rows = self._conn().execute('SELECT file_id FROM datasets ORDER BY created_at').fetchall()
+        return iter([r['file_id'] for r in rows])
+
+    def __len__(self) -> int:
+        return self._conn().execute('SELECT COUNT(*) FROM datasets').fetchone()[0]
+
+    def put(self, file_id: str, meta: Dict[str, Any]) -> None:
+        values = [json.dumps(meta.get(f)) if f in _JSON_FIELDS and meta.get(f) is not None else meta.get(f)
+                  for f in _FIELDS]
+        with self._conn() as conn:
+            conn.execute(
+                f'INSERT OR REPLACE INTO datasets (file_id, {", ".join(_FIELDS)}, created_at) '
+                f'VALUES (?, {", ".join("?" for _ in _FIELDS)}, ?)',
+                [file_id, *values, time.time()],
+            )
+
+    def __setitem__(self, file_id: str, meta: Dict[str, Any]) -> None:
+        self.put(file_id, meta)
+
+    def update(self, file_id: str, **fields: Any) -> None:
+        unknown = set(fields) - set(_FIELDS)
+        if unknown:
+            raise KeyError(f'Unknown registry fields: {sorted(unknown)}')
+        assignments = ', '.join(f'{f} = ?' for f in fields)
+        values = [json.dumps(v) if f in _JSON_FIELDS and v is not None else v for f, v in fields.items()]
+        with self._conn() as conn:
+            conn.execute(f'UPDATE datasets SET {assignments} WHERE file_id = ?', [*values, file_id])
+
+    def touch(self, file_id: str, when: Optional[float] = None) -> None:
+        """Record a use of the upload, for least-recently-used eviction."""
+        with self._conn() as conn:
+            conn.execute('UPDATE datasets SET accessed_at = ? WHERE file_id = ?',
+                         (time.time() if when is None else when, file_id))
+
+    def last_used(self) -> Dict[str, float]:
+        """file_id -> time of the latest recorded use (upload time if never touched)."""
+        rows = self._conn().execute('SELECT file_id, MAX(created_at, COALESCE(accessed_at, 0)) AS used '
+                                    'FROM datasets').fetchall()
+        return {r['file_id']: r['used'] for r in rows}
+
+    def delete(self, file_id: str) -> None:
+        with self._conn() as conn:
+            conn.execute('DELETE FROM datasets WHERE file_id = ?', (file_id,))
+
+    def __delitem__(self, file_id: str) -> None:
+        self.delete(file_id)
+
+    def put_job(self, state: Dict[str, Any]) -> bool:
+        """
+        Store a job's state (Job.to_dict()). Returns whether a cancel was
+        requested for it through request_cancel.
+        """
+        with self._conn() as conn:
+            conn.execute(
+                'INSERT INTO jobs (job_id, state, updated_at) VALUES (?, ?, ?) '
+                'ON CONFLICT (job_id) DO UPDATE SET state = excluded.state, updated_at = excluded.updated_at',
+                (state['job_id'], json.dumps(state, default=str), time.time()),
+            )
+            row = conn.execute('SELECT cancel_requested FROM jobs WHERE job_id = ?', (state['job_id'],)).fetchone()
+        return bool(row['cancel_requested'])
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute('SELECT state FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+        return json.loads(row['state']) if row is not None else None
+
+    def request_cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Flag a job for cancellation by the worker running it; returns its last stored state."""
+        with self._conn() as conn:
+            conn.execute('UPDATE jobs SET cancel_requested = 1 WHERE job_id = ?', (job_id,))
+        return self.get_job(job_id)
+
+    def prune_jobs(self, older_than: float) -> None:
+        """Forget jobs not updated since ``older_than`` (a timestamp)."""
+        with self._conn() as conn:
+            conn.execute('DELETE FROM jobs WHERE updated_at < ?', (older_than,))
@@ -0,0 +1,271 @@
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .registry import DatasetRegistry
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not on Windows, where open files cannot be removed anyway
+    fcntl = None
+
+
+# Files derived from an upload are named "<file_id>_...", file_id a UUID
+_OWNED = re.compile(r'^([0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})_')
+
+
+def owner(filename: str) -> Optional[str]:
+    """The file_id a stored file belongs to, or None."""
+    match = _OWNED.match(os.path.basename(filename))
+    return match.group(1) if match else None
+
+
+def hold(f) -> None:
+    """
+    Mark an open file as in use until it is closed (an upload being
+    written), so no worker's sweep evicts it however long it sits idle.
+    """
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_SH)
+
+
+def is_held(path: str) -> bool:
+    """Whether some process holds ``path`` open through hold()."""
+    if fcntl is None:
+        return False
+    try:
+        with open(path, 'rb') as f:
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return True
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    except OSError:
+        pass
+    return False
+
+
+class StorageManager:
+    """
+    Disk lifecycle for the upload and output directories: a TTL per
+    dataset and a byte quota over both directories, enforced by sweep().
+
+    Every file named ``<file_id>_...`` (the upload, its Arrow copy and
+    preview sample, mitigation outputs) belongs to that dataset and is
+    evicted with it, registry entry included; any other file, such as the
+    part left by an interrupted upload, is evicted on its own; a part still
+    being written is held open with hold() and never evicted. A dataset's
+    last use is the latest of its upload time, its newest file's mtime and
+    the last touch(). Datasets unused for ``ttl_seconds`` expire, as do
+    registry entries whose files are gone. While more than ``max_bytes`` is
+    held, the least recently used are evicted, except those used within
+    ``grace_seconds``, which may still be being written or about to be
+    read. A limit of 0 turns it off.
+
+    start() runs sweep() every ``interval_seconds`` on a daemon thread, and
+    sooner once added() sees the quota exceeded. Files are only ever
+    unlinked, so a reader that already opened one finishes normally. Safe
+    to run in several worker processes at once.
+    """
+
+    def __init__(self, registry: DatasetRegistry, directories: Iterable[str], ttl_seconds: float = 0.0,
+                 max_bytes: int = 0, interval_seconds: float = 60.0, grace_seconds: float = 60.0,
+                 touch_interval: float = 60.0, on_evict: Optional[Callable[[str], None]] = None):
+        self.registry = registry
+        self.directories = list(directories)
+        self.ttl_seconds = float(ttl_seconds)
+        self.max_bytes = int(max_bytes)
+        self.interval_seconds = float(interval_seconds)
+        self.grace_seconds = float(grace_seconds)
+        # Registry writes per dataset are at most one per touch_interval
+        self.touch_interval = float(touch_interval)
+        self.on_evict = on_evict
+        self._lock = threading.Lock()
+        self._sweep_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # file_id -> last use seen by this process, and last one written to the registry
+        self._touched: Dict[str, float] = {}
+        self._recorded: Dict[str, float] = {}
+        self.bytes = 0
+        self.files = 0
+        self.datasets = 0
+        self.evicted_bytes = 0
+        self.evicted_files = 0
+        self.evicted_datasets = 0
+        self.expirations = 0
+        self.quota_evictions = 0
+        self.sweeps = 0
+        self.errors = 0
+        self.last_sweep_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def touch(self, file_id: str) -> None:
+        """Record a use of the dataset."""
+        now = time.time()
+        with self._lock:
+            self._touched[file_id] = now
+            if now - self._recorded.get(file_id, 0.0) < self.touch_interval:
+                return
+            self._recorded[file_id] = now
+        self.registry.touch(file_id, now)
+
+    def added(self, path: str) -> None:
+        """Count a newly written file; wakes the sweeper once over quota."""
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        with self._lock:
+            self.bytes += size
+            self.files += 1
+            over = self.max_bytes and self.bytes > self.max_bytes
+        if over:
+            self._wake.set()
+
+    def _scan(self) -> Dict[str, List[Tuple[str, int, float]]]:
+        # Entry key (file_id, or the path of an unowned file) -> [(path, size, mtime)]
+        entries: Dict[str, List[Tuple[str, int, float]]] = {}
+        for directory in self.directories:
+            try:
+                items = os.scandir(directory)
+            except FileNotFoundError:
+                continue
+            with items:
+                for item in items:
+                    try:
+                        if not item.is_file(follow_symlinks=False):
+                            continue
+                        st = item.stat(follow_symlinks=False)
+                    except OSError:
+                        # Removed since the listing
+                        continue
+                    key = owner(item.name) or item.path
+                    entries.setdefault(key, []).append((item.path, st.st_size, st.st_mtime))
+        return entries
+
+    def _evict(self, key: str, files: List[Tuple[str, int, float]], registered: bool) -> int:
+        # Registry first, so new requests see an unknown file_id rather than
+        # a missing file; returns the bytes the entry held
+        if registered:
+            self.registry.delete(key)
+            if self.on_evict is not None:
+                self.on_evict(key)
+        freed = removed = 0
+        for path, size, _ in files:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                # Another worker's sweep got there first
+                continue
+            freed += size
+            removed += 1
+        with self._lock:
+            self._touched.pop(key, None)
+            self._recorded.pop(key, None)
+            self.evicted_bytes += freed
+            self.evicted_files += removed
+            self.evicted_datasets += int(registered)
+        return sum(size for _, size, _ in files)
+
+    def sweep(self, now: Optional[float] = None) -> Dict[str, int]:
+        """
+        One pass: expire, then evict least recently used entries down to the
+        quota. Returns the entries and bytes this pass evicted.
+        """
+        with self._sweep_lock:
+            started = time.perf_counter()
+            now = time.time() if now is None else now
+            entries = self._scan()
+            used = self.registry.last_used()
+            with self._lock:
+                touched = dict(self._touched)
+
+            candidates = []
+            for key in set(entries) | set(used):
+                files = entries.get(key, [])
+                last = max([used.get(key, 0.0), touched.get(key, 0.0)] + [mtime for _, _, mtime in files])
+                if key not in used and owner(key) is None and is_held(key):
+                    # An upload in flight, however idle: in use as of now
+                    last = now
+                candidates.append((last, key, files))
+            candidates.sort(key=lambda c: c[0])
+
+            held = sum(size for files in entries.values() for _, size, _ in files)
+            before = held
+            expired = evicted = 0
+            kept = []
+            for last, key, files in candidates:
+                idle = now - last
+                if (self.ttl_seconds and idle > self.ttl_seconds) or (not files and idle > self.grace_seconds):
+                    held -= self._evict(key, files, key in used)
+                    expired += 1
+                else:
+                    kept.append((last, key, files))
+
+            survivors = []
+            for last, key, files in kept:
+                # Oldest first, so the grace period only stops the pass once
+                # everything older is gone
+                if self.max_bytes and held > self.max_bytes and now - last >= self.grace_seconds:
+                    held -= self._evict(key, files, key in used)
+                    evicted += 1
+                else:
+                    survivors.append((key, files))
+
+            with self._lock:
+                self.bytes = held
+                self.files = sum(len(files) for _, files in survivors)
+                self.datasets = sum(1 for key, _ in survivors if key in used)
+                self.expirations += expired
+                self.quota_evictions += evicted
+                self.sweeps += 1
+                self.last_sweep_seconds = round(time.perf_counter() - started, 6)
+            return {'expired': expired, 'evicted': evicted, 'bytes': before - held}
+
+    def start(self) -> None:
+        """Start the background sweeper (once per process; later calls are no-ops)."""
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='storage-sweeper', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self.sweep()
+            except Exception as e:
+                with self._lock:
+                    self.errors += 1
+                    self.last_error = f'{type(e).__name__}: {e}'
+            self._wake.wait(self.interval_seconds)
+            self._wake.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'bytes': self.bytes,
+                'files': self.files,
+                'datasets': self.datasets,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl_seconds,
+                'evicted_bytes': self.evicted_bytes,
+                'evicted_files': self.evicted_files,
+                'evicted_datasets': self.evicted_datasets,
+                'expirations': self.expirations,
+                'quota_evictions': self.quota_evictions,
+                'sweeps': self.sweeps,
+                'last_sweep_seconds': self.last_sweep_seconds,
+                'errors': self.errors,
+                'last_error': self.last_error,
+            }
@@ -0,0 +1,119 @@
+import cProfile
+import os
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Dict, Iterable, Iterator, Optional
+
+from bias.instrument import recording
+
+try:
+    import pyinstrument
+    HAVE_PYINSTRUMENT = True
+except ImportError:  # pragma: no cover - pyinstrument is optional
+    pyinstrument = None
+    HAVE_PYINSTRUMENT = False
+
+
+PROFILERS = ('cprofile', 'pyinstrument')
+
+_CURRENT: 'ContextVar[Optional[StageTimer]]' = ContextVar('stage_timer', default=None)
+
+
+def current_timer() -> Optional['StageTimer']:
+    """The StageTimer active in this context, if any."""
+    return _CURRENT.get()
+
+
+class StageTimer:
+    """
+    Accumulated wall time per stage for one request or job.
+
+    ``record`` is the recorder handed to ``bias.instrument.recording``, so
+    stages timed in the library and in the app land in the same table.
+    A stage entered several times (e.g. once per chunk) is summed.
+    """
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.stages: 'OrderedDict[str, float]' = OrderedDict()
+        self.method: Optional[str] = None
+        self.rows: Optional[int] = None
+
+    @contextmanager
+    def active(self) -> Iterator['StageTimer']:
+        """Make this the current timer and the recorder for bias stages."""
+        token = _CURRENT.set(self)
+        try:
+            with recording(self.record):
+                yield self
+        finally:
+            _CURRENT.reset(token)
+
+    def record(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def elapsed(self) -> float:
+        return perf_counter() - self.started
+
+    def iterate(self, name: str, iterable: Iterable) -> Iterator:
+        """Yield from ``iterable``, timing the production of each item as ``name``."""
+        it = iter(iterable)
+        while True:
+            t0 = perf_counter()
+            try:
+                item = next(it)
+            except StopIteration:
+                self.record(name, perf_counter() - t0)
+                return
+            self.record(name, perf_counter() - t0)
+            yield item
+
+    def server_timing(self) -> str:
+        """Server-Timing header value: one metric per stage plus the total."""
+        parts = [f'{name};dur={seconds * 1000:.3f}' for name, seconds in self.stages.items()]
+        parts.append(f'total;dur={self.elapsed() * 1000:.3f}')
+        return ', '.join(parts)
+
+    def as_dict(self) -> Dict[str, float]:
+        """Stage durations in milliseconds."""
+        return {name: round(seconds * 1000, 3) for name, seconds in self.stages.items()}
+
+
+class RequestProfiler:
+    """
+    cProfile or pyinstrument session around one request. ``stop`` writes a
+    ``.pstats`` file (cProfile; open with snakeviz or pstats) or an ``.html``
+    report (pyinstrument) and returns its path.
+    """
+
+    def __init__(self, kind: str = 'cprofile'):
+        if kind not in PROFILERS:
+            raise ValueError(f'profile must be one of {PROFILERS}')
+        if kind == 'pyinstrument' and not HAVE_PYINSTRUMENT:
+            raise ValueError('pyinstrument is not installed')
+        self.kind = kind
+        self._profiler = pyinstrument.Profiler() if kind == 'pyinstrument' else cProfile.Profile()
+
+    def start(self) -> None:
+        if self.kind == 'pyinstrument':
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+
+    def stop(self, directory: str) -> str:
+        os.makedirs(directory, exist_ok=True)
+        name = uuid.uuid4().hex
+        if self.kind == 'pyinstrument':
+            self._profiler.stop()
+            path = os.path.join(directory, f'{name}.html')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(self._profiler.output_html())
+        else:
+            self._profiler.disable()
+            path = os.path.join(directory, f'{name}.pstats')
+            self._profiler.dump_stats(path)
+        return path
+
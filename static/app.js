@@ -12,6 +12,7 @@ if (typeof AOS !== 'undefined') {
 let state = { 
   file_id: null, 
   columns: [],
+  profiles: {},
   isAnalyzing: false,
   analysisComplete: false
 };
@@ -224,7 +225,74 @@ function setResults(html) {
   resultsDiv.innerHTML = html;
 }
 
-function optionHtml(v) { return `<option value="${v}">${v}</option>`; }
+// Async jobs: long-running /analyze and /mitigate calls return a job_id and
+// are polled until they finish instead of holding one request open
+const JOB_POLL_MS = 500;
+
+function jobProgressHtml(label, job) {
+  const pct = Math.round((job.progress || 0) * 100);
+  return `
+    <div class="text-sm">
+      <p>${label}${job.stage ? ` (${job.stage})` : ''}... ${pct}%</p>
+      <div class="mt-2 h-1.5 w-full bg-white/10 rounded"><div class="h-1.5 bg-emerald-400 rounded" style="width:${pct}%"></div></div>
+      <button type="button" data-cancel-job="${job.job_id}" class="mt-2 text-xs text-red-300 underline">Cancel</button>
+    </div>
+  `;
+}
+
+function renderJobProgress(label, job) {
+  setResults(jobProgressHtml(label, job));
+}
+
+// onProgress(label, job) is called on every poll; by default it replaces the results
+async function runJob(url, payload, label, onProgress = renderJobProgress) {
+  const resp = await fetch(url, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ ...payload, async: true })
+  });
+  const submitted = await resp.json();
+  if (!resp.ok) throw new Error(submitted.error || 'Request failed');
+  onProgress(label, { ...submitted, progress: 0 });
+
+  while (true) {
+    await new Promise(resolve => setTimeout(resolve, JOB_POLL_MS));
+    const jobResp = await fetch(`/jobs/${submitted.job_id}`);
+    const job = await jobResp.json();
+    if (jobResp.status === 404) {
+      // The job cannot be reached (e.g. a server without shared job state):
+      // run the request synchronously instead
+      onProgress(label, { ...submitted, progress: 0 });
+      const syncResp = await fetch(url, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(payload)
+      });
+      const result = await syncResp.json();
+      if (!syncResp.ok) throw new Error(result.error || 'Request failed');
+      return result;
+    }
+    if (!jobResp.ok) throw new Error(job.error || 'Job status unavailable');
+    if (job.status === 'succeeded') return job.result;
+    if (job.status === 'failed') throw new Error(job.error || 'Job failed');
+    if (job.status === 'cancelled') throw new Error('Cancelled');
+    onProgress(label, job);
+  }
+}
+
+resultsDiv.addEventListener('click', async (e) => {
+  const jobId = e.target.getAttribute && e.target.getAttribute('data-cancel-job');
+  if (!jobId) return;
+  e.target.disabled = true;
+  await fetch(`/jobs/${jobId}`, { method: 'DELETE' });
+});
+
+function optionHtml(v) {
+  // Label columns with their cardinality from the upload profile
+  const p = state.profiles[v];
+  const label = p ? `${v} (${p.distinct_exact === false ? '~' : ''}${p.distinct} distinct)` : v;
+  return `<option value="${v}">${label}</option>`;
+}
 
 uploadForm.addEventListener('submit', async (e) => {
   e.preventDefault();
@@ -273,6 +341,7 @@ uploadForm.addEventListener('submit', async (e) => {
     
     const colData = await colResp.json();
     state.columns = colData.columns || [];
+    state.profiles = colData.profiles || {};
     console.log('Loaded columns:', state.columns);
     
     // Update UI
@@ -307,14 +376,27 @@ analyzeBtn.addEventListener('click', async () => {
   }
 
   setResults('<p class="text-sm">Analyzing...</p>');
+  const request = { file_id: state.file_id, sensitive, target, positive_label };
+  // A sampled preview comes back at once; it stays on screen, with the job
+  // progress below it, until the exact report replaces it
+  let preview = null;
   try {
     const resp = await fetch('/analyze', {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({ file_id: state.file_id, sensitive, target, positive_label })
+      body: JSON.stringify({ ...request, preview: true })
     });
-    const data = await resp.json();
-    if (!resp.ok) throw new Error(data.error || 'Analysis failed');
+    if (resp.ok) {
+      preview = await resp.json();
+      if (!preview.preview) preview = null;
+    }
+  } catch (err) {
+    preview = null;
+  }
+  if (preview) renderReport(preview);
+  try {
+    const data = await runJob('/analyze', request, 'Analyzing',
+      preview ? (label, job) => renderReport(preview, jobProgressHtml('Computing exact report', job)) : renderJobProgress);
     renderReport(data);
   } catch (err) {
     setResults(`<p class='text-red-300 text-sm'>${err.message}</p>`);
@@ -352,16 +434,12 @@ mitigateBtn.addEventListener('click', async () => {
 
     if (method === 'adjust') {
       payload.adjustment_method = 'multiply';
+    } else {
+      // Stream the CSV straight into the download instead of writing it server-side
+      payload.export = 'stream';
     }
 
-    const resp = await fetch('/mitigate', {
-      method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify(payload)
-    });
-    
-    const data = await resp.json();
-    if (!resp.ok) throw new Error(data.error || 'Mitigation failed');
+    const data = await runJob('/mitigate', payload, 'Mitigating');
     
     // Show results with statistics if available
     let resultsHtml = `<p class='text-sm'>Mitigation complete using <b>${data.method}</b>.</p>`;
@@ -383,8 +461,21 @@ mitigateBtn.addEventListener('click', async () => {
   }
 });
 
-function renderReport(rep) {
+function boundsHtml(bounds) {
+  return bounds ? ` <span class='text-slate-400 text-xs'>(${bounds[0]}–${bounds[1]})</span>` : '';
+}
+
+function renderReport(rep, footer = '') {
   const parts = [];
+  const pv = rep.preview;
+  if (pv) {
+    parts.push(`
+      <div class='text-sky-300 text-xs mb-2'>
+        Preview from a random sample of ${pv.sample_rows} of ${pv.population_rows} rows;
+        ranges are ${Math.round(pv.level * 100)}% error bounds.
+      </div>
+    `);
+  }
   if (rep.warnings && rep.warnings.length) {
     parts.push(`<div class='text-amber-300 text-xs'>${rep.warnings.join('<br/>')}</div>`);
   }
@@ -394,8 +485,8 @@ function renderReport(rep) {
         <div class='font-semibold mb-1'>Summary</div>
         <div class='grid grid-cols-2 gap-2 text-sm'>
           ${rep.summary.overall_positive_rate !== undefined ? `<div>Overall Positive Rate: <b>${rep.summary.overall_positive_rate}</b></div>` : ''}
-          ${rep.summary.demographic_parity_diff !== undefined && rep.summary.demographic_parity_diff !== null ? `<div>DP Diff: <b>${rep.summary.demographic_parity_diff}</b></div>` : ''}
-          ${rep.summary.disparate_impact !== undefined && rep.summary.disparate_impact !== null ? `<div>Disparate Impact: <b>${rep.summary.disparate_impact}</b></div>` : ''}
+          ${rep.summary.demographic_parity_diff !== undefined && rep.summary.demographic_parity_diff !== null ? `<div>DP Diff: <b>${rep.summary.demographic_parity_diff}</b>${boundsHtml(pv && pv.demographic_parity_diff)}</div>` : ''}
+          ${rep.summary.disparate_impact !== undefined && rep.summary.disparate_impact !== null ? `<div>Disparate Impact: <b>${rep.summary.disparate_impact}</b>${boundsHtml(pv && pv.disparate_impact)}</div>` : ''}
           ${rep.summary.imbalance_ratio !== undefined && rep.summary.imbalance_ratio !== null ? `<div>Imbalance Ratio: <b>${rep.summary.imbalance_ratio}</b></div>` : ''}
         </div>
       </div>
@@ -407,7 +498,7 @@ function renderReport(rep) {
         <td class='py-1 pr-3 text-slate-200'>${g}</td>
         <td class='py-1 pr-3 text-slate-300'>${m.n}</td>
         <td class='py-1 pr-3 text-slate-300'>${m.share ?? ''}</td>
-        <td class='py-1 pr-3 text-slate-300'>${m.positive_rate ?? ''}</td>
+        <td class='py-1 pr-3 text-slate-300'>${m.positive_rate ?? ''}${boundsHtml(m.positive_rate_bounds)}</td>
         <td class='py-1 pr-3 text-slate-300'>${m.statistical_parity_diff ?? ''}</td>
       </tr>
     `).join('');
@@ -431,5 +522,6 @@ function renderReport(rep) {
       </div>
     `);
   }
+  parts.push(footer);
   setResults(parts.join(''));
 }
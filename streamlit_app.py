@@ -1,10 +1,14 @@
+import hashlib
 import io
+
 import pandas as pd
 import numpy as np
 import streamlit as st
 
-from bias.metrics import compute_bias_report
+from bias.metrics import compute_bias_report, compute_fairness_report, threshold_sweep
 from bias.mitigate import reweigh_dataset, resample_dataset
+from service.cache import ReportCache, report_key
+from service.export import encode_csv
 
 st.set_page_config(
     page_title="Bias Buster (Streamlit)",
@@ -39,12 +43,84 @@ with st.sidebar:
     st.write("3) Analyze Bias")
     st.write("4) Mitigate & Download")
 
+@st.cache_resource
+def report_cache() -> ReportCache:
+    # Shared by every session, keyed by file content and report parameters
+    return ReportCache(max_entries=256)
+
+
+@st.cache_resource(max_entries=4)
+def load_csv(content_hash: str, _data: bytes) -> pd.DataFrame:
+    # Parsed once per distinct file content; reruns reuse the frame read-only
+    return pd.read_csv(io.BytesIO(_data))
+
+
 # --- Upload ---
+# Frames larger than this get a sampled preview report while the exact one runs
+PREVIEW_ROWS = 20_000
+
+
+def render_report(report: dict) -> None:
+    if 'error' in report:
+        st.error(report['error'])
+        return
+    preview = report.get('preview')
+    if preview:
+        st.info(f"Preview from a random sample of {preview['sample_rows']:,} of {preview['population_rows']:,} rows; "
+                f"ranges are {preview['level']:.0%} error bounds. The exact report follows.")
+    if report.get('warnings'):
+        for w in report['warnings']:
+            st.warning(w)
+    # Summary metrics
+    if report.get('summary'):
+        s = report['summary']
+        ci = report.get('confidence_intervals') or {}
+
+        def ci_caption(metric_key):
+            if preview and preview.get(metric_key):
+                bounds = preview[metric_key]
+                st.caption(f"{preview['level']:.0%} bounds: [{bounds[0]}, {bounds[1]}]")
+                return
+            bounds = ci.get(metric_key)
+            if bounds:
+                st.caption(f"{ci['level']:.0%} CI: [{bounds[0]}, {bounds[1]}]")
+
+        c1, c2, c3, c4 = st.columns(4)
+        with c1:
+            st.metric("Overall Positive Rate", s.get('overall_positive_rate', '—'))
+        with c2:
+            st.metric("DP Diff", s.get('demographic_parity_diff', '—'))
+            ci_caption('demographic_parity_diff')
+        with c3:
+            st.metric("Disparate Impact", s.get('disparate_impact', '—'))
+            ci_caption('disparate_impact')
+        with c4:
+            st.metric("Imbalance Ratio", s.get('imbalance_ratio', '—'))
+    # Per-group table
+    if report.get('groups'):
+        g_rows = []
+        for g, m in report['groups'].items():
+            row = {
+                'group': g,
+                'n': m.get('n'),
+                'share': m.get('share'),
+                'positive_rate': m.get('positive_rate'),
+                'statistical_parity_diff': m.get('statistical_parity_diff'),
+            }
+            if preview:
+                row['sample_n'] = m.get('sample_n')
+                row['positive_rate_bounds'] = str(m.get('positive_rate_bounds'))
+            g_rows.append(row)
+        st.dataframe(pd.DataFrame(g_rows))
+
+
 uploaded = st.file_uploader("Upload CSV", type=["csv"], accept_multiple_files=False)
 
 if uploaded is not None:
+    data = uploaded.getvalue()
+    content_hash = hashlib.sha256(data).hexdigest()
     try:
-        df = pd.read_csv(uploaded)
+        df = load_csv(content_hash, data)
     except Exception as e:
         st.error(f"Failed to read CSV: {e}")
         st.stop()
@@ -74,49 +150,117 @@ if uploaded is not None:
             except Exception:
                 positive_label = positive_label_text
 
+        with_ci = st.checkbox("Bootstrap confidence intervals", value=False,
+                              help="Resamples per-group counts; requires a target column.")
+        ci_replicates, ci_seed = 0, None
+        if with_ci:
+            b1, b2 = st.columns(2)
+            with b1:
+                ci_replicates = int(st.number_input("Replicates", min_value=100, max_value=100000, value=10000, step=1000))
+            with b2:
+                ci_seed = int(st.number_input("Seed", min_value=0, value=42, step=1))
+
     # --- Analyze ---
     analyze = st.button("Analyze Bias", use_container_width=True, type="primary")
     if analyze:
         if not sensitive_col:
             st.error("Select a sensitive attribute.")
             st.stop()
+        key = report_key(content_hash, sensitive_col, target_col, positive_label,
+                         bootstrap=ci_replicates, ci_level=0.95, seed=ci_seed)
+        placeholder = st.empty()
+        if len(df) > PREVIEW_ROWS and report_cache().get(key) is None:
+            # Large frames: show a sampled preview while the exact report runs
+            preview = compute_bias_report(df, sensitive_col=sensitive_col, target_col=target_col,
+                                          positive_label=positive_label, preview=PREVIEW_ROWS, seed=0)
+            with placeholder.container():
+                render_report(preview)
         with st.spinner("Computing bias report..."):
-            report = compute_bias_report(df, sensitive_col=sensitive_col, target_col=target_col, positive_label=positive_label)
-        if 'error' in report:
-            st.error(report['error'])
-        else:
-            if report.get('warnings'):
-                for w in report['warnings']:
+            report = report_cache().get_or_compute(key, lambda: compute_bias_report(
+                df, sensitive_col=sensitive_col, target_col=target_col, positive_label=positive_label,
+                bootstrap=ci_replicates, seed=ci_seed))
+        with placeholder.container():
+            render_report(report)
+
+    # --- Threshold sweep ---
+    st.divider()
+    st.subheader("Threshold Sweep")
+    score_cols = [c for c in cols if pd.api.types.is_numeric_dtype(df[c])]
+    if score_cols:
+        s1, s2 = st.columns(2)
+        with s1:
+            score_col = st.selectbox("Score column", score_cols)
+        with s2:
+            sweep_points = int(st.number_input("Max thresholds", min_value=2, max_value=2000, value=200, step=50))
+        if st.button("Sweep Thresholds", use_container_width=True):
+            if not sensitive_col:
+                st.error("Select a sensitive attribute.")
+                st.stop()
+            with st.spinner("Sweeping thresholds..."):
+                key = report_key(content_hash, sensitive_col, score_col, None, sweep=True,
+                                 thresholds=None, points=sweep_points)
+                sweep = report_cache().get_or_compute(key, lambda: threshold_sweep(
+                    df, sensitive_col, score_col, max_points=sweep_points))
+            if 'error' in sweep:
+                st.error(sweep['error'])
+            else:
+                for w in sweep['warnings']:
+                    st.warning(w)
+                st.caption(f"A row counts as positive when {score_col} >= threshold.")
+                thresholds = pd.Index(sweep['thresholds'], name='threshold')
+                st.write("Positive rate by group")
+                st.line_chart(pd.DataFrame({g: e['positive_rate'] for g, e in sweep['groups'].items()},
+                                           index=thresholds))
+                st.write("Parity metrics")
+                st.line_chart(pd.DataFrame({
+                    'demographic_parity_diff': sweep['demographic_parity_diff'],
+                    'disparate_impact': sweep['disparate_impact'],
+                }, index=thresholds))
+    else:
+        st.info("No numeric columns to sweep.")
+
+    # --- Model fairness ---
+    st.divider()
+    st.subheader("Model Fairness")
+    if target_col:
+        pred_col = st.selectbox("Prediction column", [c for c in cols if c not in (sensitive_col, target_col)] or cols,
+                                help="A float column is a score, predicted positive at >= threshold; "
+                                     "anything else is a predicted label.")
+        pred_threshold = st.number_input("Score threshold", value=0.5, step=0.05)
+        if st.button("Evaluate Predictions", use_container_width=True):
+            with st.spinner("Computing prediction metrics..."):
+                key = report_key(content_hash, sensitive_col, target_col, positive_label, fairness=True,
+                                 prediction=pred_col, threshold=float(pred_threshold), bins=10)
+                fairness = report_cache().get_or_compute(key, lambda: compute_fairness_report(
+                    df, sensitive_col, target_col, pred_col, positive_label=positive_label,
+                    threshold=float(pred_threshold)))
+            if 'error' in fairness:
+                st.error(fairness['error'])
+            else:
+                for w in fairness['warnings']:
                     st.warning(w)
-            # Summary metrics
-            if report.get('summary'):
-                s = report['summary']
+                f = fairness['summary']
                 c1, c2, c3, c4 = st.columns(4)
                 with c1:
-                    st.metric("Overall Positive Rate", s.get('overall_positive_rate', '—'))
+                    st.metric("Equal Opportunity Diff", f['equal_opportunity_diff'])
                 with c2:
-                    st.metric("DP Diff", s.get('demographic_parity_diff', '—'))
+                    st.metric("Equalized Odds Diff", f['equalized_odds_diff'])
                 with c3:
-                    st.metric("Disparate Impact", s.get('disparate_impact', '—'))
+                    st.metric("Predictive Parity Diff", f['predictive_parity_diff'])
                 with c4:
-                    st.metric("Imbalance Ratio", s.get('imbalance_ratio', '—'))
-            # Per-group table
-            if report.get('groups'):
-                g_rows = []
-                for g, m in report['groups'].items():
-                    g_rows.append({
-                        'group': g,
-                        'n': m.get('n'),
-                        'share': m.get('share'),
-                        'positive_rate': m.get('positive_rate'),
-                        'statistical_parity_diff': m.get('statistical_parity_diff'),
-                    })
-                st.dataframe(pd.DataFrame(g_rows))
+                    st.metric("Max Group ECE", f.get('max_group_ece', '—'))
+                st.dataframe(pd.DataFrame([
+                    {'group': g, **{k: v for k, v in m.items() if k != 'calibration'}}
+                    for g, m in fairness['groups'].items()
+                ]))
+    else:
+        st.info("Select a target column to evaluate predictions against it.")
 
     # --- Mitigation ---
     st.divider()
     st.subheader("Mitigation")
     method = st.selectbox("Method", ["reweigh", "resample"])
+    compress_export = st.checkbox("Compress download (gzip)", value=False)
     do_mitigate = st.button("Mitigate & Prepare Download", use_container_width=True)
 
     if do_mitigate:
@@ -129,14 +273,13 @@ if uploaded is not None:
             else:
                 mitigated = resample_dataset(df, sensitive_col=sensitive_col, target_col=target_col, positive_label=positive_label)
         st.success(f"Mitigation complete using {method}.")
-        # Prepare download
-        buf = io.StringIO()
-        mitigated.to_csv(buf, index=False)
+        # Prepare download: CSV encoded in chunks, optionally gzip-compressed
+        encoding = 'gzip' if compress_export else 'identity'
         st.download_button(
             label="Download Mitigated CSV",
-            data=buf.getvalue(),
-            file_name=f"mitigated_{method}.csv",
-            mime="text/csv",
+            data=encode_csv(mitigated, encoding),
+            file_name=f"mitigated_{method}.csv" + ('.gz' if compress_export else ''),
+            mime="application/gzip" if compress_export else "text/csv",
             use_container_width=True,
         )
 else:
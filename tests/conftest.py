@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+# Import the app's packages (bias, service, app) from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def app_module(tmp_path_factory):
+    # app.py reads its data directory at import, so import it only once that
+    # points somewhere disposable
+    data_dir = tmp_path_factory.mktemp('data')
+    os.environ['BIAS_BUSTER_DATA_DIR'] = str(data_dir)
+    os.environ.pop('BIAS_BUSTER_REGISTRY_DB', None)
+    import app
+
+    return app
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
@@ -0,0 +1,125 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from service.cache import DatasetCache, ReportCache, frame_nbytes
+
+
+def block(rows):
+    return pd.DataFrame({'x': np.zeros(rows)})
+
+
+def test_dataset_cache_evicts_lru_past_budget():
+    size = frame_nbytes(block(100))
+    cache = DatasetCache(3 * size)
+    loads = []
+
+    def loader(key):
+        loads.append(key)
+        return block(100)
+
+    for key in 'abc':
+        cache.get_or_load(key, lambda: loader(key))
+    assert cache.stats()['bytes'] == 3 * size
+    assert cache.get('a') is not None
+    cache.put('d', block(100))
+    assert cache.get('b') is None
+    assert all(cache.get(key) is not None for key in 'acd')
+    # One frame twice the size evicts the two least recently used
+    cache.get('a')
+    cache.put('e', block(200))
+    assert [key for key in 'acde' if cache.get(key) is not None] == ['a', 'e']
+    stats = cache.stats()
+    assert stats['entries'] == 2 and stats['bytes'] == size + frame_nbytes(block(200))
+    assert stats['evictions'] == 3
+    assert loads == ['a', 'b', 'c']
+
+
+def test_dataset_cache_counters_and_oversize():
+    cache = DatasetCache(frame_nbytes(block(100)))
+    first = cache.get_or_load('a', lambda: block(100))
+    assert cache.get_or_load('a', lambda: block(50)) is first
+    big = cache.get_or_load('big', lambda: block(1000))
+    assert len(big) == 1000 and cache.get('big') is None
+    assert cache.get('a') is first
+    cache.invalidate('a')
+    assert cache.get('a') is None
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions']) == (2, 4, 0)
+    assert stats['bytes'] == 0 and stats['hit_rate'] == round(2 / 6, 6)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_report_cache_ttl_recomputes():
+    clock = Clock()
+    cache = ReportCache(max_entries=4, ttl_seconds=10, clock=clock)
+    calls = []
+
+    def compute():
+        calls.append(clock.now)
+        return {'n': len(calls)}
+
+    assert cache.get_or_compute('k', compute) == {'n': 1}
+    clock.now = 10.0
+    assert cache.get_or_compute('k', compute) == {'n': 1}
+    clock.now = 10.5
+    assert cache.get_or_compute('k', compute) == {'n': 2}
+    assert calls == [0.0, 10.5]
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['expirations']) == (1, 2, 1)
+
+
+def test_report_cache_lru_eviction():
+    cache = ReportCache(max_entries=2)
+    cache.put('a', {'v': 'a'})
+    cache.put('b', {'v': 'b'})
+    assert cache.get('a') == {'v': 'a'}
+    cache.put('c', {'v': 'c'})
+    assert cache.get('b') is None
+    assert cache.get('a') == {'v': 'a'} and cache.get('c') == {'v': 'c'}
+    assert cache.stats()['evictions'] == 1 and cache.stats()['entries'] == 2
+
+
+def test_report_cache_skips_errors():
+    cache = ReportCache(max_entries=2)
+    assert cache.get_or_compute('k', lambda: {'error': 'bad'}) == {'error': 'bad'}
+    assert cache.get_or_compute('k', lambda: {'ok': True}) == {'ok': True}
+
+
+def analyze(client, file_id, etag=None, **spec):
+    headers = {'If-None-Match': etag} if etag else {}
+    return client.post('/analyze', json={'file_id': file_id, 'sensitive': 'g', 'target': 'y', **spec},
+                       headers=headers)
+
+
+def test_analyze_etag_revalidates(client):
+    df = pd.DataFrame({'g': ['a', 'b', 'c'] * 20, 'y': [1, 0, 1, 1, 0] * 12, 'etag': range(60)})
+    resp = client.post('/upload', data={'file': (io.BytesIO(df.to_csv(index=False).encode()), 'etag.csv')},
+                       content_type='multipart/form-data')
+    file_id = resp.get_json()['file_id']
+
+    first = analyze(client, file_id)
+    etag = first.headers['ETag'].strip('"')
+    assert first.status_code == 200 and first.headers['Cache-Control'] == 'no-cache'
+    again = analyze(client, file_id)
+    assert again.headers['ETag'].strip('"') == etag and again.get_json() == first.get_json()
+
+    cached = analyze(client, file_id, etag=f'"{etag}"')
+    assert cached.status_code == 304 and cached.data == b''
+    assert cached.headers['ETag'].strip('"') == etag
+
+    for spec in ({'positive_label': 0}, {'sensitive': 'etag'}, {'bootstrap': 50, 'seed': 1}):
+        changed = analyze(client, file_id, etag=f'"{etag}"', **spec)
+        assert changed.status_code == 200
+        assert changed.headers['ETag'].strip('"') != etag
+    # An unseeded bootstrap is not reproducible: no ETag, never a 304
+    unseeded = analyze(client, file_id, etag=f'"{etag}"', bootstrap=50)
+    assert unseeded.status_code == 200 and 'ETag' not in unseeded.headers
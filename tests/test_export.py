@@ -0,0 +1,98 @@
+import gzip
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bias.mitigate import reweigh_dataset
+from service.export import count_csv_records, iter_csv_with_column, write_sidecar_csv
+
+
+def passthrough(tmp_path, text: str, values) -> bytes:
+    path = tmp_path / 'in.csv'
+    path.write_bytes(text.encode())
+    n_fields = len(pd.read_csv(io.StringIO(text), nrows=0).columns)
+    return b''.join(iter_csv_with_column(str(path), 'w', np.asarray(values, dtype=float), n_fields, chunk_rows=2))
+
+
+@pytest.mark.parametrize('text', [
+    'a,b\n1,x\n2,y\n3,z\n',
+    'a,b\n1,"two\nlines"\n2,"say ""hi"""\n3,z',
+    'a,b\r\n1,x\r\n\r\n2,y\r\n3,z\r\n',
+    '\ufeffa,b\n1,x\n2\n3,z\n',
+])
+def test_passthrough_matches_to_csv(tmp_path, text):
+    # Same table as appending the column to a full parse
+    values = [0.5, float('nan'), 1.25]
+    expected = pd.read_csv(io.StringIO(text)).assign(w=values)
+    out = pd.read_csv(io.BytesIO(passthrough(tmp_path, text, values)))
+    pd.testing.assert_frame_equal(out, expected)
+
+
+def test_passthrough_row_mismatch_raises(tmp_path):
+    with pytest.raises(ValueError):
+        passthrough(tmp_path, 'a,b\n1,x\n2,y\n', [1.0])
+    with pytest.raises(ValueError):
+        passthrough(tmp_path, 'a,b\n1,x\n', [1.0, 2.0])
+
+
+def test_cr_only_file_is_not_split(tmp_path):
+    # Old Mac line endings: read_csv sees three rows, the byte splitter one
+    path = tmp_path / 'cr.csv'
+    path.write_bytes(b'a,b\r1,x\r2,y\r3,z\r')
+    assert count_csv_records(str(path)) != len(pd.read_csv(path))
+
+
+def upload(client, text: str) -> str:
+    resp = client.post('/upload', data={'file': (io.BytesIO(text.encode()), 'data.csv')},
+                       content_type='multipart/form-data')
+    assert resp.status_code == 200, resp.get_json()
+    return resp.get_json()['file_id']
+
+
+def export(client, spec, encoding='identity'):
+    return client.get('/export', query_string={'spec': json.dumps(spec), 'encoding': encoding})
+
+
+@pytest.mark.parametrize('newline', ['\n', '\r'])
+def test_export_reweigh_streams_full_file(client, newline):
+    rows = ['g,y,x'] + [f'{"ab"[i % 2]},{int(i % 3 == 0)},{i}' for i in range(30)]
+    text = newline.join(rows) + newline
+    file_id = upload(client, text)
+    resp = export(client, {'file_id': file_id, 'sensitive': 'g', 'target': 'y', 'method': 'reweigh'}, 'gzip')
+    assert resp.status_code == 200
+    out = pd.read_csv(io.BytesIO(gzip.decompress(resp.data)))
+    expected = reweigh_dataset(pd.read_csv(io.StringIO(text)), 'g', 'y')
+    assert len(out) == 30
+    np.testing.assert_array_equal(out['sample_weight'].to_numpy(), expected['sample_weight'].to_numpy())
+
+
+def test_export_bad_spec(client):
+    assert client.get('/export', query_string={'spec': '{not json'}).status_code == 400
+    assert client.get('/export', query_string={'spec': '[1]'}).status_code == 400
+    resp = export(client, {'file_id': 'nope', 'sensitive': 'g', 'method': 'reweigh'})
+    assert resp.status_code == 400 and 'error' in resp.get_json()
+
+
+def test_sidecar_joins_back_by_row(tmp_path):
+    values = np.array([0.25, 1.5, float('nan'), 3.0, 0.125])
+    path = write_sidecar_csv(str(tmp_path / 'w.csv'), 'sample_weight', values, chunk_rows=2)
+    side = pd.read_csv(path, index_col='row', float_precision='round_trip')
+    assert side.index.tolist() == list(range(5))
+    np.testing.assert_array_equal(side['sample_weight'].to_numpy(), values)
+
+
+def test_mitigate_reweigh_sidecar(client):
+    text = 'g,y,x\n' + ''.join(f'{"abc"[i % 3]},{int(i % 4 == 0)},{i * 7}\n' for i in range(40))
+    file_id = upload(client, text)
+    resp = client.post('/mitigate', json={'file_id': file_id, 'sensitive': 'g', 'target': 'y',
+                                          'method': 'reweigh', 'reweigh_output': 'sidecar'})
+    assert resp.status_code == 200 and resp.get_json()['rows'] == 40
+    side = pd.read_csv(io.BytesIO(client.get(resp.get_json()['download']).data), index_col='row',
+                       float_precision='round_trip')
+    df = pd.read_csv(io.StringIO(text))
+    joined = df.join(side)
+    np.testing.assert_array_equal(joined['sample_weight'].to_numpy(),
+                                  reweigh_dataset(df, 'g', 'y')['sample_weight'].to_numpy())
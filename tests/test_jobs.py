@@ -0,0 +1,79 @@
+import io
+import threading
+import time
+
+import pytest
+
+from service.jobs import CANCELLED, SUCCEEDED, FINISHED_STATES, JobQueue
+from service.registry import DatasetRegistry
+
+
+@pytest.fixture
+def workers(tmp_path):
+    # Two worker processes' queues over one registry database
+    store = DatasetRegistry(str(tmp_path / 'registry.sqlite3'))
+    return JobQueue(1, store=store, sync_seconds=0), JobQueue(1, store=DatasetRegistry(store.db_path))
+
+
+def wait(queue, job_id, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        state = queue.state(job_id)
+        if state is not None and state['status'] in FINISHED_STATES:
+            return state
+        time.sleep(0.01)
+    raise AssertionError(f'job {job_id} did not finish')
+
+
+def test_state_visible_from_other_worker(workers):
+    owner, other = workers
+    release = threading.Event()
+
+    def work(data, job):
+        job.progress('work', 0.5)
+        release.wait(10)
+        return {'echo': data}, 200
+
+    job = owner.submit('analyze', work, {'x': 1})
+    assert other.get(job.id) is None
+    assert other.state(job.id)['status'] in ('queued', 'running')
+    release.set()
+    state = wait(other, job.id)
+    assert state['status'] == SUCCEEDED
+    assert state['result'] == {'echo': {'x': 1}}
+    assert other.state('no-such-job') is None
+
+
+def test_cancel_from_other_worker(workers):
+    owner, other = workers
+    started = threading.Event()
+
+    def work(data, job):
+        started.set()
+        while True:
+            job.progress('work', 0.1)
+            time.sleep(0.01)
+
+    job = owner.submit('mitigate', work, {})
+    assert started.wait(10)
+    assert other.request_cancel(job.id) is not None
+    assert wait(other, job.id)['status'] == CANCELLED
+
+
+def test_queue_without_store_is_local(tmp_path):
+    queue = JobQueue(1)
+    job = queue.submit('ingest', lambda job: ({}, 200))
+    assert wait(queue, job.id)['status'] == SUCCEEDED
+    assert queue.request_cancel('no-such-job') is None
+
+
+def test_async_job_polled_on_another_worker(client, app_module):
+    text = 'g,y\n' + ''.join(f'{"ab"[i % 2]},{i % 3 == 0:d}\n' for i in range(20))
+    file_id = client.post('/upload', data={'file': (io.BytesIO(text.encode()), 'data.csv')},
+                          content_type='multipart/form-data').get_json()['file_id']
+    resp = client.post('/analyze', json={'file_id': file_id, 'sensitive': 'g', 'target': 'y', 'async': True})
+    assert resp.status_code == 202
+    other = JobQueue(1, store=DatasetRegistry(app_module.REGISTRY.db_path))
+    state = wait(other, resp.get_json()['job_id'])
+    assert state['status'] == SUCCEEDED
+    assert state['result']['groups']
@@ -0,0 +1,80 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from bias.metrics import bootstrap_intervals, compute_bias_report, compute_fairness_report
+
+
+def test_bootstrap_all_sensitive_null():
+    # No groups at all: intervals are None rather than a crash in nanmax
+    df = pd.DataFrame({'g': [None] * 6, 'y': [1, 0, 1, 0, 1, 1]})
+    report = compute_bias_report(df, 'g', 'y', bootstrap=200, seed=0)
+    ci = report['confidence_intervals']
+    assert ci['demographic_parity_diff'] is None
+    assert ci['disparate_impact'] is None
+    assert ci['replicates'] == 200
+
+
+def test_bootstrap_no_rows():
+    ci = bootstrap_intervals([], [], 0, replicates=50, seed=0)
+    assert ci['demographic_parity_diff'] is None and ci['disparate_impact'] is None
+
+
+def test_bootstrap_seeded_and_bracketing():
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({'g': rng.choice(['a', 'b', None], 2000), 'y': rng.integers(0, 2, 2000)})
+    first = compute_bias_report(df, 'g', 'y', bootstrap=500, seed=7)
+    again = compute_bias_report(df, 'g', 'y', bootstrap=500, seed=7)
+    assert first['confidence_intervals'] == again['confidence_intervals']
+    lo, hi = first['confidence_intervals']['demographic_parity_diff']
+    assert 0 <= lo <= hi <= 1
+
+
+def fairness_frame():
+    return pd.DataFrame({
+        'g': ['a', 'a', 'a', 'b', 'b', 'b'],
+        'y': ['yes', 'no', 'yes', 'yes', 'no', 'no'],
+        'p': [1, 0, 0, 1, 1, 0],
+    })
+
+
+def test_fairness_prediction_labels_differ_from_target():
+    # 0/1 predictions of a yes/no target: 1 is the predicted positive, not 'yes'
+    report = compute_fairness_report(fairness_frame(), 'g', 'y', 'p')
+    assert report['prediction_positive_label'] == 1
+    assert report['warnings']
+    assert report['groups']['a']['tpr'] == 0.5
+    assert report['groups']['b']['tpr'] == 1.0
+    assert report['groups']['b']['fpr'] == 0.5
+
+
+def test_fairness_prediction_positive_label_given():
+    report = compute_fairness_report(fairness_frame(), 'g', 'y', 'p', prediction_positive_label=0)
+    assert report['prediction_positive_label'] == 0
+    assert not report['warnings']
+    assert report['groups']['a']['tp'] == 1
+
+
+def test_fairness_all_negative_predictions_use_target_label():
+    # Predictions share the target's labels but are never positive
+    df = fairness_frame().assign(p='no')
+    report = compute_fairness_report(df, 'g', 'y', 'p')
+    assert report['prediction_positive_label'] == 'yes'
+    assert report['summary']['overall_tpr'] == 0.0
+
+
+def test_fairness_unmatched_single_prediction_is_error():
+    df = fairness_frame().assign(p=0)
+    assert 'error' in compute_fairness_report(df, 'g', 'y', 'p')
+
+
+def test_fairness_endpoint_reports_prediction_label(client):
+    text = fairness_frame().to_csv(index=False)
+    resp = client.post('/upload', data={'file': (io.BytesIO(text.encode()), 'preds.csv')},
+                       content_type='multipart/form-data')
+    file_id = resp.get_json()['file_id']
+    resp = client.post('/analyze/fairness', json={'file_id': file_id, 'sensitive': 'g', 'target': 'y',
+                                                  'prediction': 'p'})
+    assert resp.status_code == 200
+    assert resp.get_json()['prediction_positive_label'] == 1
@@ -0,0 +1,125 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.legacy import legacy_adjusted, legacy_resample, legacy_weights
+from bias.mitigate import adjust_values, apply_quota_selection, resample_dataset, reweigh_dataset
+
+
+@pytest.fixture(params=['str', 'int'])
+def hiring(request):
+    rng = np.random.default_rng(5)
+    n = 3000
+    p = rng.dirichlet(np.ones(6) * 0.5)
+    group = rng.choice(6, size=n, p=p)
+    df = pd.DataFrame({
+        'group': group.astype(str) if request.param == 'str' else group.astype(float),
+        'hired': (rng.random(n) < rng.uniform(0.1, 0.9, 6)[group]).astype(np.int64),
+        'salary': rng.normal(50_000, 5_000, n).round(2),
+    })
+    df.loc[rng.choice(n, 30, replace=False), 'group'] = None
+    return df
+
+
+def test_reweigh_bit_identical_to_loop(hiring):
+    got = reweigh_dataset(hiring, 'group', 'hired')['sample_weight'].to_numpy()
+    assert np.array_equal(got, legacy_weights(hiring, 'group', 'hired'))
+
+
+@pytest.mark.parametrize('target', ['hired', None])
+def test_resample_identical_to_loop(hiring, target):
+    got = resample_dataset(hiring, 'group', target)
+    pd.testing.assert_frame_equal(got, legacy_resample(hiring, 'group', target))
+
+
+@pytest.mark.parametrize('factors, method', [
+    (None, 'multiply'),
+    (None, 'add'),
+    ({'0': 1.1, '1': 0.9, 0.0: 1.1, 1.0: 0.9, 'not-a-group': 3.0}, 'multiply'),
+    ({'2': 500.0, 2.0: 500.0}, 'add'),
+])
+def test_adjust_identical_to_loop(hiring, factors, method):
+    got = adjust_values(hiring, 'group', 'salary', adjustment_factors=factors, method=method)
+    assert np.array_equal(got['salary_adjusted'].to_numpy(),
+                          legacy_adjusted(hiring, 'group', 'salary', factors, method))
+
+
+@pytest.mark.parametrize('target', ['hired', None])
+def test_reweigh_outputs_agree(hiring, target):
+    frame_out = reweigh_dataset(hiring, 'group', target)
+    weights = reweigh_dataset(hiring, 'group', target, output='weights')
+    assert isinstance(weights, np.ndarray) and weights.dtype == np.float64
+    assert np.array_equal(weights, frame_out['sample_weight'].to_numpy(), equal_nan=True)
+    appended = reweigh_dataset(hiring, 'group', target, output='append')
+    pd.testing.assert_frame_equal(appended, frame_out)
+
+
+def test_reweigh_append_shares_input(hiring):
+    before = hiring.copy()
+    out = reweigh_dataset(hiring, 'group', 'hired', output='append')
+    pd.testing.assert_frame_equal(hiring, before)
+    assert 'sample_weight' not in hiring.columns
+    assert np.shares_memory(out['salary'].to_numpy(), hiring['salary'].to_numpy())
+    # An existing sample_weight column is replaced in the output only
+    weighted = hiring.assign(sample_weight=-1.0)
+    out = reweigh_dataset(weighted, 'group', 'hired', output='append')
+    assert list(out.columns) == list(weighted.columns)
+    assert (weighted['sample_weight'] == -1.0).all() and (out['sample_weight'] > 0).all()
+
+
+def frame(target):
+    return pd.DataFrame({'g': ['a', 'a', 'b', 'b'], 'y': target, 's': [0.9, 0.2, 0.8, 0.1]})
+
+
+@pytest.mark.parametrize('threshold, expected', [
+    (0.5, [1, 0, 1, 0]),
+    (0.1, [1, 1, 1, 1]),
+    (0.95, [0, 0, 0, 0]),
+])
+def test_modify_original_binarizes_at_threshold(threshold, expected):
+    # A rating target: its positives are the values above the threshold
+    out = adjust_values(frame([0.9, 0.3, 0.7, 0.2]), 'g', 'y', modify_original=True, threshold=threshold,
+                        score_cols=['s'])
+    assert out['y'].tolist() == expected
+
+
+def test_apply_quota_selection_summary():
+    df = frame([3, 5, 1, 0])
+    out, summary = apply_quota_selection(df, 'g', 'y', ['s'], threshold=2, keep_original=True)
+    assert df['y'].tolist() == [3, 5, 1, 0]
+    assert out['original_y'].tolist() == [3, 5, 1, 0]
+    assert out['y'].tolist() == [1, 0, 1, 0]
+    assert summary['total'] == 2 and summary['selected'] == 2
+    assert summary['groups']['a'] == {'n': 2, 'quota': 1, 'selected': 1, 'cutoff_score': 0.9, 'original_positive': 2}
+    labelled, by_label = apply_quota_selection(frame(['yes', 'yes', 'no', 'no']), 'g', 'y', ['s'],
+                                               positive_label='yes')
+    assert by_label['total'] == 2 and labelled['y'].tolist() == [1, 0, 1, 0]
+
+
+def test_modify_original_keeps_positive_count():
+    out = adjust_values(frame([1, 1, 0, 0]), 'g', 'y', modify_original=True, score_cols=['s'])
+    assert out['y'].tolist() == [1, 0, 1, 0]
+
+
+def test_adjust_equalizes_group_means():
+    out = adjust_values(frame([1.0, 3.0, 4.0, 4.0]), 'g', 'y')
+    means = out.groupby('g')['y_adjusted'].mean()
+    assert means['a'] == pytest.approx(3.0) and means['b'] == pytest.approx(3.0)
+
+
+def test_mitigate_modify_original_returns_selection(client):
+    text = frame([0.9, 0.3, 0.7, 0.2]).to_csv(index=False)
+    resp = client.post('/upload', data={'file': (io.BytesIO(text.encode()), 'scores.csv')},
+                       content_type='multipart/form-data')
+    resp = client.post('/mitigate', json={'file_id': resp.get_json()['file_id'], 'sensitive': 'g', 'target': 'y',
+                                          'method': 'adjust', 'modify_original': True, 'threshold': 0.5,
+                                          'score_columns': ['s']})
+    assert resp.status_code == 200
+    payload = resp.get_json()
+    assert payload['selection']['total'] == 2
+    assert payload['stats']['original_positive'] == payload['stats']['mitigated_positive'] == 2
+    out = pd.read_csv(io.BytesIO(client.get(payload['download']).data))
+    assert out['y'].tolist() == [1, 0, 1, 0]
+    assert out['original_y'].tolist() == [0.9, 0.3, 0.7, 0.2]
@@ -0,0 +1,53 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bias import parallel
+from bias.metrics import compute_bias_report
+from bias.mitigate import reweigh_dataset
+from bias.parallel import _use_serial, compute_bias_report_parallel, get_pool, reweigh_dataset_parallel, shutdown_pool
+
+
+@pytest.fixture
+def pooled(monkeypatch):
+    # Take the process-pool path even on a single-core machine
+    monkeypatch.setattr(parallel, 'default_workers', lambda: 2)
+    yield
+    shutdown_pool()
+
+
+@pytest.fixture(scope='module')
+def frame():
+    rng = np.random.default_rng(3)
+    n = 5000
+    df = pd.DataFrame({'g': rng.choice(['a', 'b', 'c', None], n), 'y': rng.choice([0, 1, None], n),
+                       'x': rng.normal(size=n)})
+    return df
+
+
+def test_workers_capped_at_cpu_count(monkeypatch):
+    monkeypatch.setattr(parallel, 'default_workers', lambda: 3)
+    assert _use_serial(10, 12, 1) == (False, 3)
+    monkeypatch.setattr(parallel, 'default_workers', lambda: 1)
+    # One core: the serial path, however many workers were asked for
+    assert _use_serial(10, 8, 1) == (True, 1)
+
+
+def test_report_matches_serial(frame, pooled):
+    parallel = compute_bias_report_parallel(frame, 'g', 'y', workers=2, partition_rows=700)
+    assert parallel == compute_bias_report(frame, 'g', 'y')
+
+
+def test_reweigh_weights_match_serial(frame, pooled):
+    parallel = reweigh_dataset_parallel(frame, 'g', 'y', workers=2, partition_rows=700, output='weights')
+    serial = reweigh_dataset(frame, 'g', 'y', output='weights')
+    assert np.array_equal(np.asarray(parallel), np.asarray(serial))
+
+
+def test_pool_does_not_fork(pooled):
+    # Workers must not inherit the server's threads and their held locks
+    pool = get_pool(2)
+    assert pool.submit(os.getpid).result() != os.getpid()
+    assert pool._mp_context.get_start_method() in ('forkserver', 'spawn')
@@ -0,0 +1,52 @@
+import io
+
+import pandas as pd
+import pytest
+
+from service.profiling import CsvProfiler
+
+
+def profile(text: str, batch_chars: int, feed_bytes: int = 5) -> CsvProfiler:
+    profiler = CsvProfiler(batch_chars=batch_chars)
+    data = text.encode()
+    for i in range(0, len(data), feed_bytes):
+        profiler.feed(data[i:i + feed_bytes])
+    profiler.close()
+    return profiler
+
+
+@pytest.mark.parametrize('batch_chars', [1, 8, 20, 1 << 20])
+def test_short_row_at_batch_start(batch_chars):
+    # A batch that opens with a short row must not fix its field count
+    text = 'a,b,c\n' + 'x,1,2\n' * 3 + 'y\n' + 'z,3,4\n' * 3
+    profiler = profile(text, batch_chars)
+    expected = pd.read_csv(io.StringIO(text))
+    assert profiler.error is None
+    assert profiler.n_rows == len(expected) == 7
+    assert profiler.profiles()['b']['nulls'] == int(expected['b'].isna().sum()) == 1
+    assert profiler.dtypes() == {'a': 'object', 'b': 'float64', 'c': 'float64'}
+
+
+@pytest.mark.parametrize('batch_chars', [1, 8, 1 << 20])
+def test_long_row_is_an_error(batch_chars):
+    text = 'a,b,c\n' + '1,2,3\n' * 3 + '1,2,3,4\n' + '1,2,3\n'
+    assert profile(text, batch_chars).error is not None
+
+
+@pytest.mark.parametrize('batch_chars', [1, 16, 1 << 20])
+def test_quoted_newlines_span_batches(batch_chars):
+    text = 'a,b\n' + '"line\none",1\n' * 4 + 'plain,2\n'
+    profiler = profile(text, batch_chars, feed_bytes=3)
+    assert profiler.error is None
+    assert profiler.n_rows == 5
+
+
+@pytest.mark.parametrize('batch_chars', [1, 32, 1 << 20])
+def test_dtypes_match_read_csv(batch_chars):
+    text = 'i,f,s,flag,n\n1,1.5,x,true,\n2,2.0,y,FALSE,3\n3,4,1_0,True,4\n'
+    profiler = profile(text, batch_chars)
+    expected = pd.read_csv(io.StringIO(text))
+    assert profiler.dtypes() == {'i': 'int64', 'f': 'float64', 's': 'object', 'flag': 'bool', 'n': 'float64'}
+    for col in ('i', 'f', 'flag', 'n'):
+        assert profiler.dtypes()[col] == str(expected[col].dtype)
+    assert profiler.profiles()['n']['min'] == 3.0
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bias.metrics import compute_bias_report
+from bias.sampling import Reservoir, reservoir_sample
+
+
+def stream(n, size):
+    rows = pd.DataFrame({'row': np.arange(n), 'g': np.arange(n) % 3})
+    return [rows.iloc[i:i + size] for i in range(0, n, size)]
+
+
+@pytest.mark.parametrize('n, size, chunk', [(10, 25, 4), (25, 25, 7), (1000, 25, 1), (1000, 25, 64), (1000, 25, 5000)])
+def test_reservoir_sample_size(n, size, chunk):
+    sample, seen = reservoir_sample(stream(n, chunk), size, seed=0)
+    assert seen == n and len(sample) == min(n, size)
+    rows = sample['row'].tolist()
+    assert rows == sorted(set(rows)) and all(0 <= r < n for r in rows)
+    assert list(sample.index) == list(range(len(sample)))
+    assert (sample['g'] == sample['row'] % 3).all()
+
+
+def test_reservoir_deterministic_with_seed():
+    first = reservoir_sample(stream(500, 32), 40, seed=9)[0]
+    again = reservoir_sample(stream(500, 32), 40, seed=9)[0]
+    other = reservoir_sample(stream(500, 32), 40, seed=10)[0]
+    pd.testing.assert_frame_equal(first, again)
+    assert first['row'].tolist() != other['row'].tolist()
+
+
+def test_reservoir_is_uniform():
+    # Every row is kept with probability size / n, whatever its position
+    hits = np.zeros(40)
+    for seed in range(400):
+        hits[reservoir_sample(stream(40, 8), 10, seed=seed)[0]['row']] += 1
+    rate = hits / 400
+    assert abs(rate.mean() - 0.25) < 1e-12
+    assert np.all(np.abs(rate - 0.25) < 0.09)
+    assert abs(rate[:20].mean() - rate[20:].mean()) < 0.04
+
+
+def test_reservoir_rejects_empty_size():
+    with pytest.raises(ValueError):
+        Reservoir(0)
+
+
+@pytest.fixture
+def population():
+    rng = np.random.default_rng(22)
+    n = 200_000
+    group = rng.choice(['a', 'b', 'c'], n, p=[0.55, 0.35, 0.1])
+    rate = np.select([group == 'a', group == 'b'], [0.40, 0.30], 0.20)
+    return pd.DataFrame({'group': group, 'hired': (rng.random(n) < rate).astype(np.int64)})
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_preview_bounds_contain_exact(population, seed):
+    exact = compute_bias_report(population, 'group', 'hired')
+    preview = compute_bias_report(population, 'group', 'hired', preview=5000, seed=seed)
+    info = preview['preview']
+    assert (info['sample_rows'], info['population_rows'], info['exact']) == (5000, len(population), False)
+    for g, entry in preview['groups'].items():
+        lo, hi = entry['positive_rate_bounds']
+        assert lo <= exact['groups'][g]['positive_rate'] <= hi, g
+        assert entry['n'] == pytest.approx(exact['groups'][g]['n'], rel=0.1)
+    for metric in ('demographic_parity_diff', 'disparate_impact'):
+        lo, hi = info[metric]
+        assert lo <= exact['summary'][metric] <= hi, metric
+
+
+def test_preview_of_whole_dataset_is_exact(population):
+    small = population.iloc[:3000]
+    exact = compute_bias_report(small, 'group', 'hired')
+    preview = compute_bias_report(small, 'group', 'hired', preview=5000, seed=0)
+    assert preview['preview']['exact']
+    for g, entry in preview['groups'].items():
+        rate = exact['groups'][g]['positive_rate']
+        assert entry['positive_rate_bounds'] == [rate, rate] and entry['n'] == exact['groups'][g]['n']
+    value = exact['summary']['demographic_parity_diff']
+    assert preview['preview']['demographic_parity_diff'] == [value, value]
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bias.selection import quota_selection, quota_selection_streaming
+
+
+@pytest.fixture(scope='module')
+def scored(tmp_path_factory):
+    rng = np.random.default_rng(11)
+    n = 5000
+    df = pd.DataFrame({
+        'g': rng.choice(['a', 'b', 'c', 'd'], n, p=[0.5, 0.3, 0.15, 0.05]),
+        'y': (rng.random(n) < 0.3).astype(np.int64),
+        'tech': rng.integers(0, 100, n).astype(float),
+        'interview': rng.integers(0, 10, n).astype(float),
+    })
+    df.loc[rng.choice(n, 40, replace=False), 'g'] = None
+    df.loc[rng.choice(n, 40, replace=False), 'tech'] = np.nan
+    path = tmp_path_factory.mktemp('selection') / 'scored.csv'
+    df.to_csv(path, index=False)
+    return df, str(path)
+
+
+@pytest.mark.parametrize('chunksize', [97, 700, 4999, 100_000])
+def test_streaming_matches_in_memory(scored, chunksize):
+    # Integer scores give many ties, which must still resolve in row order
+    df, path = scored
+    mask, expected = quota_selection(df, 'g', 'y', ['tech', 'interview'], [2.0, 1.0])
+    positions, summary = quota_selection_streaming(path, 'g', 'y', ['tech', 'interview'], [2.0, 1.0],
+                                                   chunksize=chunksize)
+    assert np.array_equal(np.flatnonzero(mask), positions)
+    assert summary == expected
+
+
+@pytest.mark.parametrize('chunksize', [333, 5000])
+def test_streaming_chunk_source_with_total(scored, chunksize):
+    df, _ = scored
+
+    def chunks():
+        return (df.iloc[start:start + chunksize] for start in range(0, len(df), chunksize))
+
+    mask, expected = quota_selection(df, 'g', score_cols=['tech'], total=900)
+    positions, summary = quota_selection_streaming(chunks, 'g', score_cols=['tech'], total=900)
+    assert np.array_equal(np.flatnonzero(mask), positions)
+    assert summary == expected
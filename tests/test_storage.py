@@ -0,0 +1,64 @@
+import io
+import os
+import time
+
+from service.ingest import IngestSink
+from service.registry import DatasetRegistry
+from service.storage import StorageManager
+
+
+def make_storage(tmp_path, **kwargs):
+    upload_dir = tmp_path / 'uploads'
+    upload_dir.mkdir()
+    registry = DatasetRegistry(str(tmp_path / 'registry.sqlite3'))
+    return StorageManager(registry, [str(upload_dir)], grace_seconds=60, **kwargs), str(upload_dir)
+
+
+def age(path: str, seconds: float) -> None:
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+def test_idle_upload_in_flight_is_not_evicted(tmp_path):
+    storage, upload_dir = make_storage(tmp_path, max_bytes=1)
+    sink = IngestSink(upload_dir)
+    try:
+        sink.write(b'a,b\n1,2\n')
+        sink.flush()
+        # A stalled client: nothing written for well past the grace period
+        age(sink.path, 3600)
+        storage.sweep()
+        assert os.path.exists(sink.path)
+    finally:
+        sink.close()
+    assert not os.path.exists(sink.path)
+
+
+def test_abandoned_part_is_evicted(tmp_path):
+    storage, upload_dir = make_storage(tmp_path, max_bytes=1)
+    path = os.path.join(upload_dir, '.incoming-abandoned.part')
+    with open(path, 'wb') as f:
+        f.write(b'a,b\n1,2\n')
+    age(path, 3600)
+    assert storage.sweep()['evicted'] == 1
+    assert not os.path.exists(path)
+
+
+def test_dataset_evicted_after_validation_is_404(client, app_module, monkeypatch):
+    # Content no other test uploads, so no cached report skips the load
+    text = 'g,y\n' + ''.join(f'{"abc"[i % 3]},{i % 2}\n' for i in range(31))
+    resp = client.post('/upload', data={'file': (io.BytesIO(text.encode()), 'data.csv')},
+                       content_type='multipart/form-data')
+    file_id = resp.get_json()['file_id']
+    parse = app_module.parse_analyze_request
+
+    def parse_then_evict(data):
+        # Another worker's sweep evicts the dataset once the request is validated
+        params = parse(data)
+        app_module.REGISTRY.delete(file_id)
+        return params
+
+    monkeypatch.setattr(app_module, 'parse_analyze_request', parse_then_evict)
+    resp = client.post('/analyze', json={'file_id': file_id, 'sensitive': 'g', 'target': 'y'})
+    assert resp.status_code == 404
+    assert 'error' in resp.get_json()
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bias.metrics import compute_bias_report
+from bias.streaming import GroupCounts, compute_bias_report_streaming
+
+
+def chunks(df, size):
+    return [df.iloc[i:i + size] for i in range(0, len(df), size)]
+
+
+@pytest.fixture
+def applicants():
+    rng = np.random.default_rng(11)
+    n = 1000
+    df = pd.DataFrame({
+        'group': rng.choice(['a', 'b', 'c', 'd'], n, p=[0.5, 0.3, 0.15, 0.05]),
+        'hired': rng.choice(['yes', 'no'], n, p=[0.3, 0.7]),
+    })
+    df.loc[rng.choice(n, 40, replace=False), 'group'] = None
+    df.loc[rng.choice(n, 25, replace=False), 'hired'] = None
+    return df
+
+
+CASES = {
+    'nulls': lambda df: (df, 'hired', None),
+    'label': lambda df: (df, 'hired', 'no'),
+    'no target': lambda df: (df, None, None),
+    'absent target': lambda df: (df.drop(columns='hired'), 'hired', None),
+    'single group': lambda df: (df.assign(group='a'), 'hired', None),
+}
+
+
+@pytest.mark.parametrize('case', list(CASES))
+@pytest.mark.parametrize('size', [7, 37, 1000])
+def test_merged_counts_match_full_report(applicants, case, size):
+    df, target, label = CASES[case](applicants)
+    expected = compute_bias_report(df, 'group', target, label)
+
+    merged = GroupCounts('group', target)
+    for part in chunks(df, size):
+        merged.merge(GroupCounts('group', target).update(part))
+    assert merged.total_n == len(df)
+    assert merged.report(label) == expected
+    assert compute_bias_report_streaming(chunks(df, size), 'group', target, label) == expected
+
+
+@pytest.mark.parametrize('chunksize', [64, 5000])
+def test_streaming_csv_matches_full_report(applicants, tmp_path, chunksize):
+    path = str(tmp_path / 'applicants.csv')
+    applicants.to_csv(path, index=False)
+    expected = compute_bias_report(pd.read_csv(path), 'group', 'hired')
+    assert compute_bias_report_streaming(path, 'group', 'hired', chunksize=chunksize) == expected
+
+
+def test_streaming_bootstrap_matches_full_report(applicants):
+    expected = compute_bias_report(applicants, 'group', 'hired', bootstrap=200, seed=3)
+    got = compute_bias_report_streaming(chunks(applicants, 100), 'group', 'hired', bootstrap=200, seed=3)
+    assert got == expected
+
+
+def test_merge_rejects_other_columns():
+    with pytest.raises(ValueError):
+        GroupCounts('group', 'hired').merge(GroupCounts('group', 'label'))
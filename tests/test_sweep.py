@@ -0,0 +1,70 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bias.metrics import compute_bias_report, threshold_sweep
+
+
+@pytest.fixture
+def scored():
+    rng = np.random.default_rng(19)
+    n = 2000
+    group = rng.choice(['a', 'b', 'c'], n, p=[0.6, 0.3, 0.1])
+    score = np.round(rng.beta(2, 5, n) + (group == 'a') * 0.1, 2)
+    df = pd.DataFrame({'group': group, 'score': score})
+    df.loc[rng.choice(n, 50, replace=False), 'group'] = None
+    df.loc[rng.choice(n, 50, replace=False), 'score'] = np.nan
+    return df
+
+
+def point(sweep, j):
+    return {
+        'overall_positive_rate': sweep['overall_positive_rate'][j],
+        'demographic_parity_diff': sweep['demographic_parity_diff'][j],
+        'disparate_impact': sweep['disparate_impact'][j],
+        'groups': {g: entry['positive_rate'][j] for g, entry in sweep['groups'].items()},
+    }
+
+
+def binarized(df, t):
+    hired = df.assign(score=(df['score'] >= t).astype(np.int64))
+    report = compute_bias_report(hired, 'group', 'score', positive_label=1)
+    return {
+        'overall_positive_rate': report['summary']['overall_positive_rate'],
+        'demographic_parity_diff': report['summary']['demographic_parity_diff'],
+        'disparate_impact': report['summary']['disparate_impact'],
+        'groups': {g: entry['positive_rate'] for g, entry in report['groups'].items()},
+    }
+
+
+@pytest.mark.parametrize('kwargs', [{}, {'max_points': 7}, {'thresholds': [-1.0, 0.2, 0.35, 0.5, 2.0]}])
+def test_sweep_points_match_binarized_reports(scored, kwargs):
+    sweep = threshold_sweep(scored, 'group', 'score', **kwargs)
+    if 'thresholds' in kwargs:
+        assert sweep['thresholds'] == kwargs['thresholds']
+    elif 'max_points' in kwargs:
+        assert len(sweep['thresholds']) == kwargs['max_points']
+    else:
+        assert sweep['thresholds'] == sorted(scored['score'].dropna().unique().tolist())
+    for j, t in enumerate(sweep['thresholds']):
+        assert point(sweep, j) == binarized(scored, t), t
+
+
+def test_sweep_limits(client, app_module, scored):
+    text = scored.assign(sweep_limits=1).to_csv(index=False)
+    resp = client.post('/upload', data={'file': (io.BytesIO(text.encode()), 'sweep.csv')},
+                       content_type='multipart/form-data')
+    spec = {'file_id': resp.get_json()['file_id'], 'sensitive': 'group', 'score': 'score'}
+    limit = app_module.MAX_SWEEP_POINTS
+
+    resp = client.post('/analyze/sweep', json={**spec, 'points': 5})
+    assert resp.status_code == 200 and len(resp.get_json()['thresholds']) == 5
+    for extra in ({'points': 1}, {'points': limit + 1}, {'thresholds': [0.5]},
+                  {'thresholds': list(np.linspace(0, 1, limit + 1))}):
+        resp = client.post('/analyze/sweep', json={**spec, **extra})
+        assert resp.status_code == 400, extra
+        assert str(limit) in resp.get_json()['error']
+    resp = client.post('/analyze/sweep', json={**spec, 'thresholds': list(np.linspace(0, 1, limit))})
+    assert resp.status_code == 200 and len(resp.get_json()['thresholds']) == limit
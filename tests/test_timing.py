@@ -0,0 +1,67 @@
+import io
+import os
+import re
+
+import pandas as pd
+
+from service.metrics import MetricsRegistry
+
+
+SAMPLE = re.compile(r'^[a-z_]+(\{[a-z_]+="[^"]*"(,[a-z_]+="[^"]*")*\})? [-+0-9.eInf]+$')
+
+
+def upload(client, text):
+    resp = client.post('/upload', data={'file': (io.BytesIO(text.encode()), 'timing.csv')},
+                       content_type='multipart/form-data')
+    return resp.get_json()['file_id']
+
+
+def test_server_timing_header(client):
+    df = pd.DataFrame({'g': ['a', 'b'] * 50, 'y': [1, 0, 0, 1] * 25, 'k': range(100)})
+    resp = client.post('/analyze', json={'file_id': upload(client, df.to_csv(index=False)),
+                                         'sensitive': 'g', 'target': 'y'})
+    assert resp.status_code == 200
+    entries = dict(part.split(';dur=') for part in resp.headers['Server-Timing'].split(', '))
+    assert list(entries)[-1] == 'total' and len(entries) > 1
+    durations = {name: float(ms) for name, ms in entries.items()}
+    # Stages may nest, so each one (not their sum) is bounded by the total
+    assert all(0 <= ms <= durations['total'] for ms in durations.values())
+
+
+def test_metrics_exposition_format(client):
+    upload(client, 'g,y\nmetrics,1\n')
+    resp = client.get('/metrics')
+    assert resp.status_code == 200
+    assert resp.content_type.startswith('text/plain; version=0.0.4')
+    lines = resp.get_data(as_text=True).splitlines()
+    pid = f'pid="{os.getpid()}"'
+    typed = set()
+    for line in lines:
+        if line.startswith('# HELP '):
+            continue
+        if line.startswith('# TYPE '):
+            name, kind = line.split()[2:]
+            assert kind in ('histogram', 'counter', 'gauge')
+            typed.add(name)
+            continue
+        assert SAMPLE.match(line), line
+        assert pid in line, line
+        name = re.split(r'[{ ]', line, maxsplit=1)[0]
+        assert name in typed or re.sub(r'_(bucket|sum|count)$', '', name) in typed
+    assert any(line.startswith('bias_buster_request_seconds_count{') and 'endpoint="upload"' in line
+               for line in lines)
+
+
+def test_histogram_buckets_cumulative():
+    registry = MetricsRegistry(worker_label='')
+    hist = registry.histogram('t_seconds', 'Test.', ('op',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 2.0):
+        hist.observe(value, op='x')
+    lines = registry.render().splitlines()
+    assert lines[2:] == [
+        't_seconds_bucket{op="x",le="0.1"} 1',
+        't_seconds_bucket{op="x",le="1"} 2',
+        't_seconds_bucket{op="x",le="+Inf"} 3',
+        't_seconds_sum{op="x"} 2.55',
+        't_seconds_count{op="x"} 3',
+    ]